@@ -1,6 +1,12 @@
 import sys
-from main import Application
+import multiprocessing
 
-app = Application(sys.argv)
-app.window.show()
-sys.exit(app.exec_())
+if __name__ == "__main__":
+    #   the worker processes (see: catalogr.py) of the frozen app start here, too
+    multiprocessing.freeze_support()
+    #   imported here, so the spawned worker processes don't import the UI
+    from main import Application
+
+    app = Application(sys.argv)
+    app.window.show()
+    sys.exit(app.exec_())
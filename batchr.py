@@ -0,0 +1,357 @@
+"""
+#
+#   BATCHR
+#   Batch export of invoice checks and overviews (e.g. at the end of a month),
+#   rendered in parallel worker processes.
+#
+#   The loaded project is encoded into a snapshot (see: AppData.get_export_snapshot),
+#   that every spawned worker process (see: catalogr.MP_CONTEXT) decodes once.
+#   Then the targets are rendered like the single exports of ui.helper
+#   (invoice_check, company_ov, ...): *.xlsx and *.pdf files in the app's
+#   invoice check and overview directories, invoice checks are copied to the
+#   invoice check and correspondence folders. The workers don't import the UI,
+#   only templatr, formatr and pdfexportr.
+#
+#   Usage:
+#       targets = [batchr.get_target(app_data, "invoice_check", invoice), ...]
+#       job = app_data.start_batch_export(targets)
+#       job.get_progress()  # (done, total), e.g. polled by a QTimer
+#       results = job.wait()
+#
+"""
+import debug
+
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import catalogr, templatr, formatr, pdfexportr
+
+#   kinds of targets -> attribute of the project listing the items
+TARGET_KINDS = {
+    "invoice_check": "invoices",
+    "company_ov": "companies",
+    "trades_ov": None,
+    "cost_groups_ov": None,
+    "pcc_overviews": "project_cost_calculations",
+}
+
+
+def get_uid(item):
+    return str(item.uid.uid)
+
+
+def get_target(app_data, kind, item=None, curr_job_only=False):
+    """Return a target of a batch export (only plain data, sent to the workers).
+
+    Args:
+        app_data (api.AppData): Application data containing the project data
+        kind (str): Key of TARGET_KINDS
+        item (optional): Invoice, company or project cost calculation of the kind
+        curr_job_only (bool, optional): Invoice checks only show the job of the
+            invoice in the overview of the company
+
+    Returns:
+        dict: Target with "kind", "uid", "name" and the paths to write to
+    """
+    if kind not in TARGET_KINDS:
+        raise Exception(f"Unknown kind of batch export target: {kind}")
+    if kind == "invoice_check":
+        folder_name = app_data.get_invoice_check_folder_name(item)
+        create_at_path = os.path.join(app_data.get_app_invoice_check_dir(), folder_name)
+        copy_to_paths = [
+            str(os.path.join(app_data.get_invoice_check_dir(), folder_name)),
+            str(os.path.join(app_data.get_client_correspondence_dir(), folder_name)),
+        ]
+    else:
+        if kind == "company_ov":
+            folder_name = app_data.get_company_overview_folder_name(item)
+        elif kind == "trades_ov":
+            folder_name = app_data.get_trades_overview_folder_name()
+        elif kind == "cost_groups_ov":
+            folder_name = app_data.get_cost_groups_overview_folder_name()
+        else:
+            folder_name = app_data.get_pcc_overview_folder_name(item)
+        create_at_path = os.path.join(app_data.get_app_overviews_dir(), folder_name)
+        copy_to_paths = list()
+    return {
+        "kind": kind,
+        "uid": get_uid(item) if item is not None else None,
+        "name": folder_name,
+        "curr_job_only": curr_job_only,
+        "create_at_path": str(create_at_path),
+        "copy_to_paths": copy_to_paths,
+    }
+
+
+"""
+#
+#   WORKER
+#   Runs in the worker processes, so it only uses the snapshot.
+#
+"""
+
+#   decoded snapshot of the worker process (see: init_worker)
+WORKER_APP_DATA = None
+
+
+class SnapshotAppData:
+    """Stand-in for the AppData in a worker process, as far as templatr uses it.
+
+    Attributes:
+        config (dict): App config
+        project (proj.Project): Project restored from the snapshot
+        streaming (bool): Stream the big overviews (see: AppData.is_streaming_export)
+    """
+
+    def __init__(self, snapshot):
+        self.config = snapshot["config"]
+        self.project = catalogr.restore_project(snapshot["members"])
+        self.streaming = snapshot["streaming"]
+        self._dir = snapshot["dir"]
+        self._titles = snapshot["titles"]
+
+    def get_dir(self):
+        return self._dir
+
+    def get_titles(self):
+        return self._titles
+
+    def get_item(self, target):
+        items = getattr(self.project, TARGET_KINDS[target["kind"]])
+        for item in items:
+            if get_uid(item) == target["uid"]:
+                return item
+        raise Exception(f"{target['name']}: not found in the project snapshot.")
+
+
+def init_worker(snapshot):
+    """Decode the snapshot once per worker process."""
+    global WORKER_APP_DATA
+    WORKER_APP_DATA = SnapshotAppData(snapshot)
+
+
+def make_xlsx_files(app_data, target):
+    """Write the *.xlsx files of a target.
+
+    Returns:
+        list: (save path, filename) of every file
+    """
+    kind = target["kind"]
+    path = target["create_at_path"]
+    project = app_data.project
+    if kind == "invoice_check":
+        invoice = app_data.get_item(target)
+        templates = [
+            templatr.InvoiceCheckExcelTemplate(app_data, invoice, path),
+            templatr.CompanyOVExcelTemplate(
+                app_data,
+                invoice.company,
+                path,
+                selected_job=invoice.job if target["curr_job_only"] else None,
+            ),
+        ]
+    elif kind == "company_ov":
+        templates = [
+            templatr.CompanyOVExcelTemplate(app_data, app_data.get_item(target), path)
+        ]
+    elif kind == "trades_ov":
+        templates = [templatr.TradesOVExcelTemplate(app_data, path)]
+    elif kind == "cost_groups_ov":
+        templates = [templatr.CostGroupsOVExcelTemplate(app_data, path)]
+    else:
+        pcc = app_data.get_item(target)
+        date = formatr.today_str()
+        templates = [
+            templatr.PCCCostGroupsOVExcelTemplate(
+                app_data,
+                pcc,
+                project.main_cost_groups,
+                path,
+                filename=f"{date}-costcalculation_overview-main-{project.identifier}",
+            ),
+            templatr.PCCCostGroupsOVExcelTemplate(
+                app_data,
+                pcc,
+                project.cost_groups,
+                path,
+                filename=f"{date}-costcalculation_overview-all-{project.identifier}",
+            ),
+            templatr.PCCTradesOVExcelTemplate(app_data, pcc, path),
+        ]
+    files = list()
+    for template in templates:
+        if kind in ["trades_ov", "cost_groups_ov"]:
+            template.make_file(streaming=app_data.streaming)
+        else:
+            template.make_file()
+        files.append((template.save_path, template.filename))
+    return files
+
+
+def render_target(target, pdf=True):
+    """Render a target in a worker process.
+
+    Args:
+        target (dict): See: get_target
+        pdf (bool, optional): Convert the *.xlsx files to *.pdf files
+
+    Returns:
+        dict: Result with the "target", the written "files", the "xlsx_files"
+            ((save path, filename), see: convert_target) and the "error" (None,
+            if it was rendered)
+    """
+    result = {"target": target, "files": list(), "xlsx_files": list(), "error": None}
+    try:
+        xlsx_files = make_xlsx_files(WORKER_APP_DATA, target)
+        result["files"] += [str(save_path) for save_path, _ in xlsx_files]
+        result["xlsx_files"] = [(str(path), filename) for path, filename in xlsx_files]
+        if pdf:
+            convert_target(result, WORKER_APP_DATA.config.get("pdf_backend"))
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+    return result
+
+
+def convert_target(result, backend=None):
+    """Convert the *.xlsx files of a rendered target to *.pdf files and copy
+    them to the "copy_to_paths" of the target.
+
+    Args:
+        result (dict): See: render_target, the PDFs are added to its "files"
+        backend (str, optional): PDF backend (see: pdfexportr.get_backend)
+    """
+    pdf_files = pdfexportr.xlsx2pdfs(result["xlsx_files"], backend=backend)
+    result["files"] += [str(save_path) for save_path, _ in pdf_files]
+    for copy_to_path in result["target"]["copy_to_paths"]:
+        os.makedirs(copy_to_path, exist_ok=True)
+        for save_path, filename in pdf_files:
+            shutil.copy(save_path, os.path.join(copy_to_path, filename))
+
+
+"""
+#
+#   JOB
+#
+"""
+
+
+class ExportJob:
+    """Batch export running in a process pool.
+
+    A backend converting one file at a time (Excel, see: pdfexportr.py) can't
+    convert in every worker at once, so the workers only render the *.xlsx
+    files and the job converts them one after another on a thread of its own.
+
+    Attributes:
+        results (list): Results of the targets (see: render_target), None while
+            a target is not rendered yet
+        targets (list): Targets to render (see: get_target)
+    """
+
+    def __init__(self, snapshot, targets, pdf=True, max_workers=None, on_progress=None):
+        """Start rendering the targets.
+
+        Args:
+            snapshot (dict): See: AppData.get_export_snapshot
+            targets (list): See: get_target
+            pdf (bool, optional): Convert the *.xlsx files to *.pdf files
+            max_workers (int, optional): Number of processes, default: number of CPUs
+            on_progress (callable, optional): Called with the job and the result
+                of every rendered target. Runs on a thread of the pool, so a GUI
+                has to pass it on to its own thread (or poll get_progress).
+        """
+        self.targets = targets
+        self.results = [None] * len(targets)
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._done = 0
+        self._finished = threading.Event()
+        self._futures = list()
+        self._pdf_backend = snapshot["config"].get("pdf_backend")
+        self._converter = None
+        if not targets:
+            self._finished.set()
+            return
+        if pdf and not pdfexportr.get_backend_class(self._pdf_backend).parallel:
+            self._converter = ThreadPoolExecutor(max_workers=1)
+            pdf = False
+        max_workers = min(len(targets), max_workers or os.cpu_count() or 1)
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=catalogr.MP_CONTEXT,
+            initializer=init_worker,
+            initargs=(snapshot,),
+        )
+        for index, target in enumerate(targets):
+            future = self._pool.submit(render_target, target, pdf)
+            future.add_done_callback(
+                lambda future, index=index: self.set_result(index, future)
+            )
+            self._futures.append(future)
+        #   the pool exits as soon as the last target is rendered
+        self._pool.shutdown(wait=False)
+
+    def set_result(self, index, future):
+        if future.cancelled():
+            result = {"target": self.targets[index], "files": list()}
+            result["error"] = "cancelled"
+        elif future.exception() is not None:
+            #   e.g. a worker process died
+            error = future.exception()
+            result = {"target": self.targets[index], "files": list()}
+            result["error"] = f"{type(error).__name__}: {error}"
+        else:
+            result = future.result()
+        if self._converter and not result["error"]:
+            self._converter.submit(self.convert_result, index, result)
+        else:
+            self.record_result(index, result)
+
+    def convert_result(self, index, result):
+        """Convert the *.xlsx files of a rendered target (on the converter thread)."""
+        try:
+            convert_target(result, self._pdf_backend)
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+        self.record_result(index, result)
+
+    def record_result(self, index, result):
+        with self._lock:
+            self.results[index] = result
+            self._done += 1
+            finished = self._done == len(self.targets)
+        if result["error"]:
+            debug.warning_msg(f"batch export of {result['target']['name']} failed...")
+        if self.on_progress:
+            self.on_progress(self, result)
+        #   after the last progress, so it has been reported when wait() returns
+        if finished:
+            if self._converter:
+                self._converter.shutdown(wait=False)
+            self._finished.set()
+
+    def get_progress(self):
+        """Return the number of rendered targets and the number of all targets."""
+        with self._lock:
+            return self._done, len(self.targets)
+
+    def done(self):
+        return self.get_progress()[0] == len(self.targets)
+
+    def cancel(self):
+        """Cancel the targets, that are not rendered yet."""
+        for future in self._futures:
+            future.cancel()
+
+    @debug.log
+    def wait(self):
+        """Wait until every target is rendered.
+
+        Returns:
+            list: Results of the targets (see: render_target)
+        """
+        #   not the futures, their results are recorded after they are done
+        self._finished.wait()
+        return self.results
@@ -0,0 +1,293 @@
+"""
+#
+#   BENCHMARK
+#   Time the hot paths (saving, loading, restoring, prev invoices, aggregates
+#   and the excel templates) and the archive compressions on generated
+#   projects (see: generatr.py).
+#   The results are written to a JSON file, that can be compared to the
+#   results of another version.
+#
+#   Usage (from the app directory, so the templates are found):
+#       python benchmark.py --size large --repeat 3 --output bench-new.json
+#       python benchmark.py --size large --compare bench-old.json
+#
+"""
+import debug
+
+#   before importing the modules to measure, so their @debug.timed() functions
+#   are measured as well
+debug.set_instrumentation(True)
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import generatr
+import zipr
+import templatr
+from core import api
+
+#   Prefix of the timers of the benchmarks in the debug report
+TIMER_PREFIX = "benchmark."
+
+
+def get_git_revision():
+    """Return the current git commit (None, if not in a git repository)."""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+"""
+#
+#   BENCHMARKS
+#   Every benchmark gets the AppData (with the generated project loaded) and
+#   a temporary directory. They are timed via debug.timer.
+#
+"""
+
+
+def bench_save_project(app_data, tmp_dir):
+    with debug.timer(TIMER_PREFIX + "zipr.save_project"):
+        zipr.save_project(Path(tmp_dir, "benchmark.project"), app_data)
+
+
+def bench_open_project(app_data, tmp_dir):
+    with debug.timer(TIMER_PREFIX + "zipr.open_project"):
+        zipr.open_project(Path(tmp_dir, "benchmark.project"))
+
+
+def bench_load_project(app_data, tmp_dir):
+    """Load incl. restoring the pointers (see: Project.restore in the report)."""
+    with debug.timer(TIMER_PREFIX + "AppData.load_project"):
+        app_data.load_project(Path(tmp_dir, "benchmark.project"), lazy=False)
+
+
+def bench_load_project_lazy(app_data, tmp_dir):
+    """Until the window can be shown and until the deferred members are loaded."""
+    with debug.timer(TIMER_PREFIX + "AppData.load_project.lazy"):
+        app_data.load_project(Path(tmp_dir, "benchmark.project"), lazy=True)
+    with debug.timer(TIMER_PREFIX + "AppData.load_deferred_members"):
+        app_data.load_deferred_members()
+
+
+def bench_update_all_prev_invoices(app_data, tmp_dir):
+    with debug.timer(TIMER_PREFIX + "Project.update_all_prev_invoices"):
+        app_data.project.update_all_prev_invoices()
+
+
+def query_aggregates(project):
+    """Query the sums shown in the cost-stand views."""
+    project.get_job_sums_total()
+    project.get_approved_amounts_total()
+    project.get_psds_total()
+    for trade in project.trades:
+        project.get_job_sums_of_trade(trade)
+        project.get_approved_amounts_of_trade(trade)
+        project.get_psds_of_trade(trade)
+    for cost_group in project.cost_groups:
+        project.get_job_sums_of_sub_cost_groups(cost_group)
+        project.get_approved_amounts_of_sub_cost_groups(cost_group)
+        project.get_psds_of_sub_cost_groups(cost_group)
+
+
+def bench_aggregates(app_data, tmp_dir):
+    project = app_data.project
+    project.clear_aggregates()
+    with debug.timer(TIMER_PREFIX + "aggregates.cold"):
+        query_aggregates(project)
+    with debug.timer(TIMER_PREFIX + "aggregates.warm"):
+        query_aggregates(project)
+    #   a single edit, followed by the queries of update_ui()
+    job = project.jobs[0]
+    job.add_job_addition(generatr.START_DATE, "benchmark", 1, "")
+    project.refresh_job(job)
+    with debug.timer(TIMER_PREFIX + "aggregates.after_edit"):
+        query_aggregates(project)
+
+
+def bench_templates(app_data, tmp_dir):
+    project = app_data.project
+    invoice = max(project.invoices, key=lambda invoice: len(invoice.prev_invoices))
+    company = max(
+        project.companies,
+        key=lambda company: len(project.get_jobs_of_company(company)),
+    )
+    pcc = max(project.project_cost_calculations, key=lambda pcc: len(pcc.inventory))
+    templates = {
+        "invoice_check": lambda: app_data.output_invoice_check(invoice, tmp_dir),
+        "ov_by_trades": lambda: app_data.output_ov_by_trades(tmp_dir),
+        "ov_by_cost_groups": lambda: app_data.output_ov_by_cost_groups(tmp_dir),
+        "ov_of_company": lambda: app_data.output_ov_of_company(company, tmp_dir),
+        "pcc_ov_cost_groups": lambda: app_data.output_pcc_ov_cost_groups(
+            pcc, project.cost_groups, tmp_dir
+        ),
+        "pcc_ov_trades": lambda: app_data.output_pcc_ov_trades(pcc, tmp_dir),
+        "ov_by_trades.streamed": lambda: templatr.TradesOVExcelTemplate(
+            app_data, tmp_dir
+        ).make_file(streaming=True),
+        "ov_by_cost_groups.streamed": lambda: templatr.CostGroupsOVExcelTemplate(
+            app_data, tmp_dir
+        ).make_file(streaming=True),
+    }
+    for name, output in templates.items():
+        with debug.timer(TIMER_PREFIX + "templatr." + name):
+            output()
+
+
+#   (label, archive options) of the settings compared by bench_compression
+COMPRESSION_SETTINGS = [
+    ("stored.indent4", {"compression": "stored", "indent": 4}),
+    ("stored", {"compression": "stored", "indent": None}),
+    ("deflate1", {"compression": "deflate", "compresslevel": 1, "indent": None}),
+    ("deflate6", {"compression": "deflate", "compresslevel": 6, "indent": None}),
+    ("bzip2", {"compression": "bzip2", "compresslevel": 9, "indent": None}),
+    ("lzma", {"compression": "lzma", "indent": None}),
+] + (
+    [("zstd", {"compression": "zstd", "compresslevel": 3, "indent": None})]
+    if "zstd" in zipr.COMPRESSIONS
+    else []
+)
+
+#   label -> file size [bytes] of the last run of bench_compression
+FILE_SIZES = dict()
+
+
+def bench_compression(app_data, tmp_dir):
+    """Save and open with every compression setting (see: zipr.DEFAULT_COMPRESSION)."""
+    for label, archive_options in COMPRESSION_SETTINGS:
+        path = Path(tmp_dir, f"compression-{label}.project")
+        with debug.timer(TIMER_PREFIX + f"compression.{label}.save"):
+            zipr.save_project(path, app_data, **archive_options)
+        with debug.timer(TIMER_PREFIX + f"compression.{label}.open"):
+            zipr.open_project(path)
+        FILE_SIZES[label] = path.stat().st_size
+
+
+BENCHMARKS = {
+    "save": bench_save_project,
+    "open": bench_open_project,
+    "load": bench_load_project,
+    "load_lazy": bench_load_project_lazy,
+    "prev_invoices": bench_update_all_prev_invoices,
+    "aggregates": bench_aggregates,
+    "templates": bench_templates,
+    "compression": bench_compression,
+}
+
+"""
+#
+#   RUN, SAVE AND COMPARE
+#
+"""
+
+
+@debug.log
+def run(size="medium", seed=0, repeat=3, benchmarks=None):
+    """Generate a project and run the benchmarks repeat times.
+
+    Args:
+        size (str, optional): Key of generatr.SIZE_PRESETS
+        seed (int, optional): Seed of the generated project
+        repeat (int, optional): Number of runs of every benchmark
+        benchmarks (list, optional): Keys of BENCHMARKS to run, default: all
+
+    Returns:
+        dict: Results containing "meta" and the "report" of debug.get_report()
+    """
+    sizes = generatr.SIZE_PRESETS[size]
+    benchmarks = benchmarks if benchmarks else list(BENCHMARKS)
+    debug.reset_instrumentation()
+    FILE_SIZES.clear()
+
+    app_data = api.AppData()
+    with debug.timer(TIMER_PREFIX + "generatr.generate_project"):
+        app_data.project = generatr.generate_project(seed=seed, **sizes)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        #   "open" and "load" need a saved project
+        zipr.save_project(Path(tmp_dir, "benchmark.project"), app_data)
+        for i in range(repeat):
+            for name in benchmarks:
+                BENCHMARKS[name](app_data, tmp_dir)
+
+    return {
+        "meta": {
+            "datetime": datetime.now().isoformat(),
+            "git_revision": get_git_revision(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "size": size,
+            "sizes": sizes,
+            "seed": seed,
+            "repeat": repeat,
+            "benchmarks": benchmarks,
+        },
+        "report": debug.get_report(),
+        "file_sizes": dict(FILE_SIZES),
+    }
+
+
+def compare(results, old_results):
+    """Print the p50 of the benchmark timers of two results side by side."""
+    timers = results["report"]["timers"]
+    old_timers = old_results["report"]["timers"]
+    print(f"{'benchmark':<50} {'old p50 [ms]':>14} {'new p50 [ms]':>14} {'ratio':>8}")
+    for name in sorted(set(timers) | set(old_timers)):
+        if not name.startswith(TIMER_PREFIX):
+            continue
+        new = timers.get(name, {}).get("p50")
+        old = old_timers.get(name, {}).get("p50")
+        old_str = f"{old:.2f}" if old is not None else "-"
+        new_str = f"{new:.2f}" if new is not None else "-"
+        ratio = f"{new / old:.2f}" if new and old else "-"
+        print(f"{name[len(TIMER_PREFIX):]:<50} {old_str:>14} {new_str:>14} {ratio:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths.")
+    parser.add_argument("--size", default="medium", choices=generatr.SIZE_PRESETS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--only", nargs="+", choices=BENCHMARKS, help="run only these benchmarks"
+    )
+    parser.add_argument("--output", help="write the results to this *.json file")
+    parser.add_argument("--compare", help="compare to the results in this *.json file")
+    args = parser.parse_args(argv)
+
+    results = run(
+        size=args.size, seed=args.seed, repeat=args.repeat, benchmarks=args.only
+    )
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(results, json.load(file))
+    else:
+        for name, timing in results["report"]["timers"].items():
+            print(
+                f"{name:<60} n={timing['count']:<4} p50={timing['p50']:10.2f} ms "
+                f"p95={timing['p95']:10.2f} ms max={timing['max']:10.2f} ms"
+            )
+    for label, size in results["file_sizes"].items():
+        print(f"{'file size ' + label:<60} {size / 1e6:10.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
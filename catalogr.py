@@ -0,0 +1,205 @@
+"""
+#
+#   CATALOGR
+#   Catalog of the saved projects: metadata (identifier, client, totals, last
+#   saved, size, ...) of every *.project file, cached by the modification time
+#   and size of the file.
+#
+#   Only new and changed files are opened when refreshing, in parallel worker
+#   processes (decoding is CPU bound). The cache is a JSON file in the app data
+#   directory (see: AppData.get_catalog_path):
+#       {"version": 1, "projects": {path: {"mtime_ns", "size", "metadata"}}}
+#
+"""
+import debug
+
+import os
+import json
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import zipr, packr, journalr
+
+CATALOG_VERSION = 1
+
+#   The worker processes are always spawned (like on Windows), never forked: a
+#   fork of the GUI process would copy its threads' locks and its Qt state. The
+#   workers only import this module and the modules of the saved objects, no UI.
+#   The entry scripts have to call multiprocessing.freeze_support() first.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+#   loaded args -> the project's lists (set in this order, see: AppData.load_project)
+PROJECT_LISTS = [
+    "project_cost_calculations",
+    "companies",
+    "trades",
+    "invoices",
+    "jobs",
+    "cost_groups",
+]
+
+
+"""
+#
+#   METADATA
+#   Runs in the worker processes, so it only uses the files.
+#
+"""
+
+
+def restore_project(members):
+    """Decode and restore a project without the AppData.
+
+    Args:
+        members (dict): Member name -> encoded data (see: packr.encode_members)
+
+    Returns:
+        proj.Project: Restored project
+    """
+    loaded_args = packr.decode_members(members)
+    project = loaded_args["project"]
+    project.config = loaded_args["project_config"]
+    for name in PROJECT_LISTS:
+        setattr(project, name, loaded_args[name])
+    project.restore()
+    return project
+
+
+def open_project_file(path):
+    """Open and restore a saved project without the AppData.
+
+    Args:
+        path (Path): Path to the *.project file (an autosave's journal is replayed)
+
+    Returns:
+        proj.Project: Restored project
+    """
+    return restore_project(journalr.read_project_members(path))
+
+
+def get_project_metadata(project):
+    """Return the metadata of a project shown in the catalog.
+
+    Args:
+        project (proj.Project): Restored project
+
+    Returns:
+        dict: Metadata (JSON serializable)
+    """
+    client = project.client
+    client_name = f"{client.first_name} {client.last_name}".strip() if client else ""
+    return {
+        "identifier": project.identifier,
+        "construction_scheme": project.construction_scheme,
+        "client": client_name,
+        "planning_status": project.planning_status,
+        "last_saved": project.config.get("user_save", dict()).get("datetime"),
+        "number_of_companies": len(project.companies),
+        "number_of_jobs": len(project.jobs),
+        "number_of_invoices": len(project.invoices),
+        "job_sums_total": project.get_job_sums_total(),
+        "approved_amounts_total": project.get_approved_amounts_total(),
+        "psds_total": project.get_psds_total(),
+    }
+
+
+def read_project_metadata(path):
+    """Open a project file and return its catalog entry (in a worker process)."""
+    stat = os.stat(path)
+    entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    try:
+        entry["metadata"] = get_project_metadata(open_project_file(path))
+    except Exception as error:
+        #   listed anyway, so a broken file does not hide from the catalog
+        entry["metadata"] = None
+        entry["error"] = f"{type(error).__name__}: {error}"
+    return entry
+
+
+"""
+#
+#   CACHE
+#
+"""
+
+
+def read_catalog(catalog_path):
+    """Read the cached catalog (empty, if it is missing, broken or outdated)."""
+    try:
+        with open(catalog_path, "r") as file:
+            catalog = json.load(file)
+        if catalog.get("version") == CATALOG_VERSION:
+            return catalog["projects"]
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, AttributeError):
+        debug.warning_msg(f"{catalog_path} not valid, rebuilding the catalog...")
+    return dict()
+
+
+def write_catalog(catalog_path, projects):
+    data = json.dumps({"version": CATALOG_VERSION, "projects": projects}, indent=4)
+    zipr.write_atomic(catalog_path, data.encode("utf-8"))
+
+
+def is_up_to_date(entry, path):
+    """Check whether the cached entry belongs to the current file."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+
+"""
+#
+#   REFRESH
+#
+"""
+
+
+def read_projects_metadata(paths, max_workers=None):
+    """Read the catalog entries of the project files, in parallel processes.
+
+    Args:
+        paths (list): Paths to the *.project files
+        max_workers (int, optional): Number of processes, default: number of CPUs
+
+    Returns:
+        list: Entries (in the order of paths)
+    """
+    if len(paths) < 2 or max_workers == 1:
+        return [read_project_metadata(path) for path in paths]
+    max_workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=MP_CONTEXT) as pool:
+        return list(pool.map(read_project_metadata, paths))
+
+
+@debug.log
+@debug.timed()
+def refresh_catalog(catalog_path, project_paths, max_workers=None):
+    """Bring the cached catalog up to date with the project files.
+
+    Only new and changed files are opened, entries of removed files are
+    dropped.
+
+    Args:
+        catalog_path (Path): Path to the cached catalog
+        project_paths (list): Paths to the *.project files to list
+        max_workers (int, optional): Number of processes (see: read_projects_metadata)
+
+    Returns:
+        dict: Path (str) -> entry, in the order of project_paths
+    """
+    cached = read_catalog(catalog_path)
+    keys = [str(Path(path).resolve()) for path in project_paths]
+    stale = [
+        key for key in keys if key not in cached or not is_up_to_date(cached[key], key)
+    ]
+    debug.count("catalog.stale", len(stale))
+    entries = dict(zip(stale, read_projects_metadata(stale, max_workers)))
+    projects = {key: entries[key] if key in entries else cached[key] for key in keys}
+    if stale or len(projects) != len(cached):
+        write_catalog(catalog_path, projects)
+    return projects
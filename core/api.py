@@ -18,21 +18,36 @@ DEFAULT_TEMPLATE_SUBDIR = "templates"
 DEFAULT_INVOICE_CHECK_SUBDIR = "invoice_check"
 DEFAULT_OVERVIEWS_SUBDIR = "overviews"
 DEFAULT_LOG_FILENAME = "log.log"
+DEFAULT_SAVE_FORMAT = "zip"
+DEFAULT_AUTOSAVE_FORMAT = "binary"
+DEFAULT_MAX_JOURNAL_ENTRIES = 10
+DEFAULT_LAZY_LOADING = True
+DEFAULT_AUTOSAVE_RETENTION = {"hourly": 0, "daily": 0}
+DEFAULT_STREAMING_EXPORT_MIN_JOBS = 500
 import main  # just for app directory
 
 APP_DIRECTORY = main.APP_DIRECTORY
 del main
 
 import os
+import copy
 import json
+from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import webbrowser  # for opening directory windows
 import appdirs  # for user data/app config paths
 
-import zipr, importr, templatr, pdfexportr, encoder, decoder
+import zipr, packr, journalr, rotatr, catalogr, portfolr
+import importr, templatr, formatr, pdfexportr, batchr, encoder, decoder
 from ui import helper
 from core.obj import proj, corp, arch
 
+#   Members of a save file decoded before the window is shown, when loading lazily
+#   (see: AppData.load_project), the others are decoded in the background.
+EAGER_MEMBERS = [name for name, member in zipr.MEMBERS.items() if not member.deferred]
+DEFERRED_MEMBERS = [name for name, member in zipr.MEMBERS.items() if member.deferred]
+
 
 class AppData:
     """Contains the project (if one is loaded) and is basically the interface
@@ -49,6 +64,13 @@ class AppData:
         self.load_app_config()
         # project
         self._project = project
+        # last full autosave of the project, the next autosaves are journaled
+        self.autosave_checkpoint = None
+        # fingerprints of the project as last written (any save) and user saved
+        self.saved_fingerprint = None
+        self.usersaved_fingerprint = None
+        # decodes the deferred members of a lazily loaded project
+        self.loading_executor = ThreadPoolExecutor(max_workers=1)
 
     #   Project
     #   The loaded project. Setter to make sure its a proj.Project object.
@@ -60,6 +82,9 @@ class AppData:
     def project(self, project):
         if isinstance(project, proj.Project):
             self._project = project
+            self.autosave_checkpoint = None
+            self.saved_fingerprint = None
+            self.usersaved_fingerprint = None
         else:
             raise TypeError("project is not an proj.Project type.")
 
@@ -94,70 +119,378 @@ class AppData:
         return new_project
 
     @debug.log
+    @debug.timed()
     def save_project(self, save_path):
-        """Save loaded project."""
-        zipr.save_project(save_path, self)
+        """Save loaded project, unless it is unchanged and already saved there."""
+        fingerprint = self.project.get_fingerprint()
+        if self.is_saved_to(save_path, fingerprint):
+            debug.info_msg("Project unchanged since the last save, skipping save...")
+            return
+        save_format = self.config.get("save_format", DEFAULT_SAVE_FORMAT)
+        self.write_project(save_path, save_format)
         self.set_usersave_path(save_path)
         self.save_app_config()
+        self.saved_fingerprint = self.usersaved_fingerprint = fingerprint
+
+    def is_saved_to(self, save_path, fingerprint):
+        """Check whether the project with this fingerprint is saved to save_path.
+
+        Args:
+            save_path (Path): Path of the save
+            fingerprint (tuple): Current fingerprint (see: Project.get_fingerprint)
+
+        Returns:
+            bool: True, if the user save at save_path is up to date
+        """
+        return (
+            fingerprint == self.usersaved_fingerprint
+            and self.project.has_been_saved()
+            and self.project.get_usersave_path() == Path(save_path)
+            and Path(save_path).is_file()
+        )
+
+    def has_unsaved_changes(self):
+        """Check whether the project changed since it was last saved or autosaved."""
+        if self.project.has_deferred_members():
+            #   it cannot be edited, before it is loaded completely
+            return False
+        return self.project.get_fingerprint() != self.saved_fingerprint
+
+    def write_project(self, save_path, save_format):
+        """Write the loaded project to a file.
+
+        Args:
+            save_path (Path): Path to save to
+            save_format (str): "zip" (zipped JSON) or "binary" (see: packr.py)
+        """
+        if save_format == "binary":
+            packr.save_project(save_path, self)
+        else:
+            zipr.save_project(save_path, self, **self.get_archive_options())
+
+    def get_archive_options(self):
+        """Return the options of zipped JSON saves (see: zipr.write_json_members)."""
+        return {
+            "compression": self.config.get(
+                "archive_compression", zipr.DEFAULT_COMPRESSION
+            ),
+            "compresslevel": self.config.get(
+                "archive_compresslevel", zipr.DEFAULT_COMPRESSLEVEL
+            ),
+            "indent": self.config.get("archive_indent", zipr.DEFAULT_INDENT),
+        }
+
+    def get_autosave_retention(self):
+        """Return the hours/days to keep an autosave of (see: rotatr.py)."""
+        return self.config.get("autosave_retention", DEFAULT_AUTOSAVE_RETENTION)
+
+    """
+    #   AUTOSAVING IN THE BACKGROUND
+    #   An autosave is split up, so the slow part can run on a worker thread:
+    #   1. take_autosave_snapshot:  copy the objects of the project (on the GUI thread)
+    #   2. write_autosave:          encode, write and rotate the files (on any thread)
+    #   3. finish_autosave:         update the configs (on the GUI thread)
+    #   An autosave is either a full checkpoint or, if there is a checkpoint
+    #   of the project, an entry of its journal with the edited objects only
+    #   (see: journalr.py). Every max_journal_entries a new checkpoint is written.
+    """
 
     @debug.log
-    def autosave_project(self):
-        """Create an autosave of the loaded project."""
+    @debug.timed()
+    def take_autosave_snapshot(self):
+        """Take a consistent snapshot of the loaded project for an autosave.
+
+        A checkpoint copies the objects of the project (see: packr.snapshot_members),
+        that are encoded when the autosave is written, so it can be written while
+        the project is edited. A journal entry only encodes the few edited objects.
+
+        Returns:
+            dict: Autosave containing the path, datetime, format and the data
+        """
         autosave_path, autosave_datetime = self.get_autosave_path_datetime()
+        #   edits from now on go into the next autosave
+        since = datetime.now()
+        checkpoint = self.autosave_checkpoint
+        max_journal_entries = self.config.get(
+            "max_journal_entries", DEFAULT_MAX_JOURNAL_ENTRIES
+        )
+        if (
+            checkpoint
+            and checkpoint["journal_entries"] < max_journal_entries
+            and checkpoint["path"].is_file()
+        ):
+            objects = None
+            members = journalr.encode_changes(self.project, checkpoint["since"])
+            checkpoint_path = checkpoint["path"]
+            autosave_path = journalr.get_journal_path(checkpoint_path)
+            kind = "journal"
+        else:
+            objects = packr.snapshot_members(self.project)
+            members = None
+            checkpoint_path = autosave_path
+            kind = "checkpoint"
+        return {
+            "kind": kind,
+            #   its journal is complete, once the new checkpoint is written
+            "previous_checkpoint_path": checkpoint["path"]
+            if checkpoint and kind == "checkpoint"
+            else None,
+            "fingerprint": self.project.get_fingerprint(),
+            "path": autosave_path,
+            "checkpoint_path": checkpoint_path,
+            "project": self.project,
+            "since": since,
+            "datetime": autosave_datetime,
+            "format": self.config.get("autosave_format", DEFAULT_AUTOSAVE_FORMAT),
+            "archive_options": self.get_archive_options(),
+            "objects": objects,
+            "members": members,
+            "filename_suffix": self.get_autosave_filename_suffix(),
+            "max_autosaves": self.config["max_autosaves"],
+            "retention": self.get_autosave_retention(),
+        }
+
+    def encode_project_snapshot(self):
+        """Encode the loaded project into plain data, not shared with the project.
+
+        Returns:
+            dict: Member name -> encoded data (see: packr.encode_members)
+        """
+        members = packr.encode_members(self.project)
+        #   the configs are the only members referencing the project's data
+        members["project_config"] = copy.deepcopy(members["project_config"])
+        members["project"] = copy.deepcopy(members["project"])
+        return members
+
+    @debug.log
+    @debug.timed()
+    def write_autosave(self, autosave):
+        """Write an autosave snapshot and delete the old autosaves.
+
+        Writing a checkpoint compacts the journal of the previous one (see:
+        journalr.compact), so the older autosaves are single files. Only uses the
+        snapshot and the file system, so it is safe to call this from a worker
+        thread.
+
+        Args:
+            autosave (dict): Snapshot (see: take_autosave_snapshot)
+        """
+        autosave_path = autosave["path"]
+        if autosave["kind"] == "journal":
+            journalr.append_entry(
+                autosave_path, autosave["members"], autosave["datetime"]
+            )
+            return
+        previous_checkpoint_path = autosave["previous_checkpoint_path"]
+        if previous_checkpoint_path == autosave_path:
+            #   replaced within the same second, its journal would be replayed
+            #   onto the new checkpoint
+            journalr.get_journal_path(autosave_path).unlink(missing_ok=True)
+        members = packr.encode_member_objects(autosave["objects"])
         #   Create directory if non-existing
         if not autosave_path.parent.exists():
             autosave_path.parent.mkdir()
         #   Save project
-        zipr.save_project(autosave_path, self)
+        if autosave["format"] == "binary":
+            packr.write_members(autosave_path, members)
+        else:
+            packr.write_zip_members(
+                autosave_path, members, **autosave["archive_options"]
+            )
+        rotatr.rotate(
+            autosave_path.parent,
+            autosave["filename_suffix"],
+            autosave["max_autosaves"],
+            autosave["retention"],
+            autosave_path=autosave_path,
+            datetime_str=autosave["datetime"],
+        )
+        if (
+            previous_checkpoint_path
+            and previous_checkpoint_path != autosave_path
+            and previous_checkpoint_path.is_file()
+        ):
+            #   unless it was rotated out
+            journalr.compact(previous_checkpoint_path)
+
+    @debug.log
+    def finish_autosave(self, autosave):
+        """Set the path of a written autosave in the configs and save them.
+
+        Args:
+            autosave (dict): Snapshot (see: take_autosave_snapshot)
+        """
+        #   The journal is replayed when loading its checkpoint
+        checkpoint_path = autosave["checkpoint_path"]
+        #   the project might have been replaced in the meantime
+        same_project = autosave["project"] is self.project
+        if same_project and autosave["kind"] == "checkpoint":
+            self.autosave_checkpoint = {
+                "path": checkpoint_path,
+                "journal_entries": 0,
+                "since": autosave["since"],
+            }
+        elif same_project and self.autosave_checkpoint:
+            self.autosave_checkpoint["journal_entries"] += 1
+            self.autosave_checkpoint["since"] = autosave["since"]
+        if same_project:
+            self.saved_fingerprint = autosave["fingerprint"]
         #   Set the save path in the app and project config
-        self.set_last_autosave_path_(autosave_path, autosave_datetime)
+        self.set_last_autosave_path_(checkpoint_path, autosave["datetime"])
         #   Save the app config
         self.save_app_config()
 
     @debug.log
-    def delete_old_autosaves(self):
-        """Delete autosaves of loaded project, if the number of autosaves
-        exceeds the max_autosaves value defined in the config.
+    @debug.timed()
+    def load_project(self, file_path, lazy=None):
+        """Load a saved project from file (zipped JSON or binary).
+
+        If there is a journal next to the file (an autosave), it is replayed.
+        Loading lazily only decodes the small members (project, config, companies,
+        trades and cost groups) right away. The project cost calculations, jobs
+        and invoices are decoded and restored in the background and have to be
+        attached, once they are loaded (see: load_deferred_members).
+
+        Args:
+            file_path (Path): Path to the saved project
+            lazy (bool, optional): Load lazily, default: "lazy_loading" of the config
         """
-        max_autosaves = self.config["max_autosaves"]
-        debug.debug_msg(f"deleting old autosaves (max_autosaves={max_autosaves})...")
-        autosave_dir_path = self.get_autosave_dir()
-        file_suffix = self.get_autosave_filename_suffix()
-        if autosave_dir_path.is_dir():
-            autosaves = [
-                f
-                for f in autosave_dir_path.iterdir()
-                if f.suffix == file_suffix and (autosave_dir_path / f).is_file()
-            ]
-            autosaves.sort(reverse=True)  # reversed, so the oldest save(s) gets deleted
-            for autosave in autosaves[max_autosaves:]:
-                (autosave_dir_path / autosave).unlink()
-            debug.debug_msg(f"...{len(autosaves[max_autosaves:])} file(s) deleted...")
-        else:
-            debug.debug_msg("autosave dir does not exist. Nothing to delete...")
+        if lazy is None:
+            lazy = self.config.get("lazy_loading", DEFAULT_LAZY_LOADING)
+        members = journalr.read_project_members(file_path)
+        names = EAGER_MEMBERS if lazy else None
+        loaded_args = packr.decode_members(members, names)
 
-    @debug.log
-    def load_project(self, file_path):
-        """Load a saved project from file."""
-        loaded_args = zipr.open_project(file_path)
         self.config["loaded_save_path"] = str(Path(file_path))
         self.project = loaded_args["project"]
         self.project.config = loaded_args["project_config"]
-        self.project.project_cost_calculations = loaded_args[
-            "project_cost_calculations"
-        ]
         self.project.companies = loaded_args["companies"]
         self.project.trades = loaded_args["trades"]
-        self.project.invoices = loaded_args["invoices"]
-        self.project.jobs = loaded_args["jobs"]
         self.project.cost_groups = loaded_args["cost_groups"]
+        if not lazy:
+            self.project.project_cost_calculations = loaded_args[
+                "project_cost_calculations"
+            ]
+            self.project.invoices = loaded_args["invoices"]
+            self.project.jobs = loaded_args["jobs"]
 
         #   Restore the pointers.
         #   These are lost when saving and recreated using uids
         self.restore_pointers()
 
+        if lazy:
+            self.project.defer_members(
+                self.loading_executor.submit(
+                    self.prepare_deferred_members, self.project, members
+                )
+            )
+        else:
+            self.set_loaded_fingerprints(self.project, file_path)
+
         return self.project
 
+    @debug.log
+    @debug.timed()
+    def prepare_deferred_members(self, project, members):
+        """Decode and restore the deferred members of a project (on a worker thread).
+
+        See: proj.Project.prepare_deferred_members
+        """
+        deferred_members = packr.decode_members(members, DEFERRED_MEMBERS)
+        return project.prepare_deferred_members(deferred_members)
+
+    @debug.log
+    @debug.timed()
+    def load_deferred_members(self, project=None):
+        """Attach the deferred members of a lazily loaded project (see: load_project).
+
+        Waits for them, if they are still loading. Once the future of the project
+        is done, only the cheap attaching is left, so call it from the GUI thread
+        then (see: MainWindow.show_loading_project).
+
+        Args:
+            project (proj.Project, optional): Project that was loaded, default: the
+                loaded project. Ignored, if another project was loaded meanwhile.
+
+        Raises:
+            proj.ProjectLoadingError: If they could not be loaded
+        """
+        project = self.project if project is None else project
+        if project is not self.project or not project.has_deferred_members():
+            return
+        project.load_deferred_members()
+        self.set_loaded_fingerprints(project, self.config["loaded_save_path"])
+
+    def set_loaded_fingerprints(self, project, file_path):
+        """The loaded state is saved already (see: has_unsaved_changes)."""
+        if project is not self.project:
+            return
+        self.saved_fingerprint = project.get_fingerprint()
+        if project.has_been_saved() and project.get_usersave_path() == Path(file_path):
+            self.usersaved_fingerprint = self.saved_fingerprint
+
+    """
+    #   PROJECT CATALOG AND PORTFOLIO
+    #   Metadata and cost rollups of the saved projects, computed in worker
+    #   processes without loading them into the app (see: catalogr.py, portfolr.py).
+    """
+
+    def get_project_paths(self):
+        """Get the paths of the saved projects in the save directory (no autosaves)."""
+        save_dir = self.get_save_dir()
+        autosave_dir = self.get_autosave_dir()
+        if not save_dir.is_dir():
+            return list()
+        return sorted(
+            path
+            for path in save_dir.rglob("*.project")
+            if autosave_dir not in path.parents and path.is_file()
+        )
+
+    @debug.log
+    def get_project_catalog(self, project_paths=None):
+        """Get the catalog entries of the saved projects, refreshing stale ones.
+
+        Args:
+            project_paths (list, optional): Paths of the projects, default: all
+                saved projects (see: get_project_paths)
+
+        Returns:
+            dict: Path (str) -> entry with "metadata" (see: catalogr.py)
+        """
+        project_paths = (
+            self.get_project_paths() if project_paths is None else project_paths
+        )
+        catalog_path = self.get_catalog_path()
+        catalog_path.parent.mkdir(parents=True, exist_ok=True)
+        return catalogr.refresh_catalog(
+            catalog_path,
+            project_paths,
+            max_workers=self.config.get("catalog_max_workers"),
+        )
+
+    @debug.log
+    def get_portfolio_rollup(self, project_paths=None, only_active=True):
+        """Get the costs per company, trade and cost group across the saved
+        projects (see: portfolr.py).
+
+        Args:
+            project_paths (list, optional): Paths of the projects, default: all
+                saved projects (see: get_project_paths)
+            only_active (bool, optional): Skip billed projects
+
+        Returns:
+            dict: Rollup of the projects
+        """
+        project_paths = (
+            self.get_project_paths() if project_paths is None else project_paths
+        )
+        return portfolr.get_portfolio_rollup(
+            project_paths,
+            only_active=only_active,
+            max_workers=self.config.get("catalog_max_workers"),
+        )
+
     """
     #   RESTORING A PROJECT
     #
@@ -281,6 +614,7 @@ class AppData:
         #   once the import is complete
         for cost_group in self.project.cost_groups:
             cost_group.restore_after_import(self.project)
+        self.project.clear_aggregates()
 
     """
     #
@@ -296,6 +630,7 @@ class AppData:
     def output_cost_stand_trades_ov(self, app_data):
         pass
 
+    @debug.timed()
     def output_invoice_check(self, invoice, create_at_path):
         """Output an invoice check of a given invoice as *.xlsx file.
 
@@ -310,6 +645,23 @@ class AppData:
         invoice_check_xlsx.make_file()
         return (invoice_check_xlsx.save_path, invoice_check_xlsx.filename)
 
+    def is_streaming_export(self):
+        """Check whether the overviews are big enough to be streamed.
+
+        Streamed overviews are written row by row (see:
+        templatr.Template.stream_cells), which needs less memory but is a bit
+        slower for small projects.
+        """
+        min_jobs = self.config.get(
+            "streaming_export_min_jobs", DEFAULT_STREAMING_EXPORT_MIN_JOBS
+        )
+        return min_jobs is not None and len(self.project.jobs) >= min_jobs
+
+    def get_pdf_backend(self):
+        """Return the name of the backend exporting the PDFs (see: pdfexportr.py)."""
+        return self.config.get("pdf_backend", pdfexportr.DEFAULT_BACKEND)
+
+    @debug.timed()
     def output_ov_by_trades(self, create_at_path):
         """Output an overview of the project costs ordered by trades of the loaded project as *.xlsx file.
 
@@ -320,9 +672,10 @@ class AppData:
             app_data=self, save_dir=create_at_path
         )
         # Create xlsx-File
-        overview_xlsx.make_file()
+        overview_xlsx.make_file(streaming=self.is_streaming_export())
         return (overview_xlsx.save_path, overview_xlsx.filename)
 
+    @debug.timed()
     def output_ov_by_cost_groups(self, create_at_path):
         """Output an overview of the project costs ordered by cost groups of the loaded project as *.xlsx file.
 
@@ -333,9 +686,10 @@ class AppData:
             app_data=self, save_dir=create_at_path
         )
         # Create xlsx-File
-        overview_xlsx.make_file()
+        overview_xlsx.make_file(streaming=self.is_streaming_export())
         return (overview_xlsx.save_path, overview_xlsx.filename)
 
+    @debug.timed()
     def output_ov_of_company(self, company, create_at_path, selected_job=None):
         """Output an overview of the invoices of a company ordered by job of a given company as *.xlsx file.
 
@@ -354,6 +708,7 @@ class AppData:
         overview_xlsx.make_file()
         return (overview_xlsx.save_path, overview_xlsx.filename)
 
+    @debug.timed()
     def output_pcc_ov_cost_groups(
         self, pcc, cost_groups, create_at_path, filename=None
     ):
@@ -376,6 +731,7 @@ class AppData:
         overview_xlsx.make_file()
         return (overview_xlsx.save_path, overview_xlsx.filename)
 
+    @debug.timed()
     def output_pcc_ov_trades(self, pcc, create_at_path, filename=None):
         """Output an overview of a project cost calculation ordered by trades as *.xlsx file.
 
@@ -391,6 +747,50 @@ class AppData:
         overview_xlsx.make_file()
         return (overview_xlsx.save_path, overview_xlsx.filename)
 
+    """
+    #   BATCH EXPORT
+    #   Invoice checks and overviews rendered in worker processes (see: batchr.py)
+    """
+
+    @debug.log
+    @debug.timed()
+    def get_export_snapshot(self):
+        """Take a snapshot of the loaded project for the workers of a batch export.
+
+        Returns:
+            dict: Encoded project ("members"), app config, app directory, titles
+                and whether to stream the big overviews
+        """
+        return {
+            "members": self.encode_project_snapshot(),
+            "config": copy.deepcopy(self.config),
+            "dir": self.get_dir(),
+            "titles": self.get_titles(),
+            "streaming": self.is_streaming_export(),
+        }
+
+    @debug.log
+    def start_batch_export(self, targets, pdf=True, on_progress=None):
+        """Start rendering invoice checks and overviews in worker processes.
+
+        Args:
+            targets (list): Targets of the loaded project (see: batchr.get_target)
+            pdf (bool, optional): Also write the *.pdf files (and copy the ones
+                of the invoice checks to the invoice check and correspondence
+                folders, see: helper.invoice_check)
+            on_progress (callable, optional): See: batchr.ExportJob
+
+        Returns:
+            batchr.ExportJob: Running batch export, wait() returns the results
+        """
+        return batchr.ExportJob(
+            self.get_export_snapshot(),
+            targets,
+            pdf=pdf,
+            max_workers=self.config.get("export_max_workers"),
+            on_progress=on_progress,
+        )
+
     """
     #
     #   UTILITY FUNCTIONS
@@ -559,6 +959,10 @@ class AppData:
         filename = "app_config.json"
         return Path(dir, filename)
 
+    def get_catalog_path(self):
+        """Get the path of the cached project catalog (next to the app config)."""
+        return self.get_app_config_path().with_name("project_catalog.json")
+
     def get_dir(self):
         """Get the app directory."""
         return Path(APP_DIRECTORY)
@@ -621,7 +1025,7 @@ class AppData:
 
     def get_autosave_path_datetime(self):
         """Get the path (as Path) and date (as string) for an autosave."""
-        autosave_datetime = helper.now_str()
+        autosave_datetime = formatr.now_str()
         autosave_filename = f"{autosave_datetime}-{self.get_autosave_filename_suffix()}"
         autosave_path = Path(self.get_dir(), self.get_autosave_dir(), autosave_filename)
         return autosave_path, autosave_datetime
@@ -629,19 +1033,19 @@ class AppData:
     def get_invoice_check_folder_name(self, invoice):
         """Get the foldername (w/ date and invoice id) for an invoice check."""
         if self.project_loaded():
-            dir_name = f"{helper.now_str()}-{self.project.identifier}-{invoice.id}"
+            dir_name = f"{formatr.now_str()}-{self.project.identifier}-{invoice.id}"
             return dir_name
 
     def get_company_overview_folder_name(self, company):
         """Get the foldername (w/ project id and company name) for a project cost overview of a company."""
         if self.project_loaded():
-            dir_name = f"{helper.now_str()}-{self.project.identifier}-{company.name.replace(' ', '_').replace('.', '')}"
+            dir_name = f"{formatr.now_str()}-{self.project.identifier}-{company.name.replace(' ', '_').replace('.', '')}"
             return dir_name
 
     def get_trades_overview_folder_name(self, trade=None):
         """Get the foldername (w/ project id) for a project cost overview by trades."""
         if self.project_loaded():
-            dir_name = f"{helper.now_str()}-{self.project.identifier}-trades"
+            dir_name = f"{formatr.now_str()}-{self.project.identifier}-trades"
             if trade:
                 dir_name += f"-{trade.name.replace(' ', '_')}"
             return dir_name
@@ -649,7 +1053,7 @@ class AppData:
     def get_cost_groups_overview_folder_name(self, cost_group=None):
         """Get the foldername (w/ project id) for a project cost overview by cost_groups."""
         if self.project_loaded():
-            dir_name = f"{helper.now_str()}-{self.project.identifier}-cost_groups"
+            dir_name = f"{formatr.now_str()}-{self.project.identifier}-cost_groups"
             if cost_group:
                 dir_name += f"-{cost_group.id}"
             return dir_name
@@ -657,19 +1061,19 @@ class AppData:
     def get_pcc_overview_folder_name(self, pcc):
         """Get the foldername (w/ project id and pcc name) for a project cost calculation overview by cost_groups."""
         if self.project_loaded():
-            dir_name = f"{helper.now_str()}-{self.project.identifier}-{pcc.name}"
+            dir_name = f"{formatr.now_str()}-{self.project.identifier}-{pcc.name}"
             return dir_name
 
     def get_loaded_save_path(self):
         """Get the path of the loaded project."""
         return Path(self.config["loaded_save_path"])
 
-    def set_usersave_path(self, save_path, datetime_str=helper.now_str()):
+    def set_usersave_path(self, save_path, datetime_str=formatr.now_str()):
         """Set the path of the usersave in the configs."""
         self.project.set_save_path(save_path, datetime_str)
         self.config["loaded_save_path"] = str(save_path)
 
-    def set_last_autosave_path_(self, save_path, datetime_str=helper.now_str()):
+    def set_last_autosave_path_(self, save_path, datetime_str=formatr.now_str()):
         """Set the path of the autosave in the configs."""
         self.project.set_autosave_path(save_path, datetime_str)
         self.config["last_auto_save"]["datetime"] = datetime_str
@@ -736,7 +1140,19 @@ class AppData:
             "loaded_save_path": None,
             "last_auto_save": {"datetime": None, "path": None},
             "autosave_time": 240000,
+            "save_format": DEFAULT_SAVE_FORMAT,
+            "autosave_format": DEFAULT_AUTOSAVE_FORMAT,
+            "max_journal_entries": DEFAULT_MAX_JOURNAL_ENTRIES,
+            "lazy_loading": DEFAULT_LAZY_LOADING,
+            "archive_compression": zipr.DEFAULT_COMPRESSION,
+            "archive_compresslevel": zipr.DEFAULT_COMPRESSLEVEL,
+            "archive_indent": zipr.DEFAULT_INDENT,
+            "catalog_max_workers": None,
+            "streaming_export_min_jobs": DEFAULT_STREAMING_EXPORT_MIN_JOBS,
+            "export_max_workers": None,
+            "pdf_backend": pdfexportr.DEFAULT_BACKEND,
             "max_autosaves": 5,
+            "autosave_retention": dict(DEFAULT_AUTOSAVE_RETENTION),
             "window_size": {"height": None, "width": None},
             "building_classes": ["GK 1a", "GK 1b", "GK 2", "GK 3", "GK 5"],
             "planning_phases": [
@@ -752,6 +1168,8 @@ class AppData:
             ],
             "log_filename": DEFAULT_LOG_FILENAME,
             "debug": False,
+            "profile": False,
+            "instrumentation": False,
         }
         return default_config
 
@@ -0,0 +1,66 @@
+"""
+#
+#   AGGREGATE
+#   Cache for the aggregated amounts of a project (job sums, approved amounts
+#   and paid safety deposits per job, trade, cost group and in total).
+#   The entries are calculated on first access and dropped by the project,
+#   when an edit touches the amounts they contain.
+#
+"""
+import debug
+
+#   Amounts that are aggregated for every entry
+AGGREGATE_FIELDS = ["job_sum", "approved_amount", "psd"]
+
+
+def get_empty_aggregates():
+    """Return aggregates with every amount set to zero."""
+    return {field: 0 for field in AGGREGATE_FIELDS}
+
+
+def sum_aggregates(aggregates_list):
+    """Return the field-wise sum of a list of aggregates."""
+    aggregates_sum = get_empty_aggregates()
+    for aggregates in aggregates_list:
+        for field in AGGREGATE_FIELDS:
+            aggregates_sum[field] += aggregates[field]
+    return aggregates_sum
+
+
+class AggregateCache:
+
+    """Cache of aggregates with per-entry invalidation.
+
+    Entries are keyed by a tuple of the kind of the entry and the id() of
+    the object it belongs to, e.g. ("trade", id(trade)) or ("total",).
+    """
+
+    def __init__(self):
+        self._entries = dict()
+
+    def get(self, key, calculate):
+        """Return the cached entry of key. If it is missing (or invalidated), calculate it.
+
+        Args:
+            key (tuple): Key of the entry
+            calculate (callable): Function returning the aggregates of the entry
+
+        Returns:
+            dict: Aggregates
+        """
+        if key not in self._entries:
+            debug.count("aggregates.miss")
+            self._entries[key] = calculate()
+        else:
+            debug.count("aggregates.hit")
+        return self._entries[key]
+
+    def invalidate(self, keys):
+        """Drop the entries with the given keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries."""
+        debug.debug_msg(f"clearing {len(self._entries)} aggregate entries...")
+        self._entries = dict()
@@ -138,6 +138,7 @@ class ArchJob(corp.Job):
         self._job_additions.append(
             {"date": date, "name": name, "amount": amount, "comment": comment}
         )
+        self.edited()
 
     def remove_job_addition(self, job_addition):
         """Remove a job addition of the job.
@@ -146,6 +147,7 @@ class ArchJob(corp.Job):
             job_addition (dict): Job addition to remove
         """
         self._job_additions.remove(job_addition)
+        self.edited()
 
     @property
     def paid_safety_deposits(self):
@@ -182,6 +184,7 @@ class ArchJob(corp.Job):
         self._paid_safety_deposits.append(
             {"date": date, "amount": amount, "comment": comment}
         )
+        self.edited()
 
     def remove_psd(self, psd):
         """Remove paid safety deposit.
@@ -190,6 +193,7 @@ class ArchJob(corp.Job):
             psd (dict): Paid safety deposit to remove
         """
         self._paid_safety_deposits.remove(psd)
+        self.edited()
 
     """
     #
@@ -230,9 +234,13 @@ class ArchJob(corp.Job):
             project (proj.Project): Embedding project
         """
         super(ArchJob, self).restore(project)
-        self.trade = restore.restore_by(self.trade, self._trade_ref, project.trades)
+        self.trade = restore.restore_by(
+            self.trade, self._trade_ref, project.get_restore_lookup("trades")
+        )
         self.cost_group = restore.restore_by(
-            self.cost_group, self._cost_group_ref, project.cost_groups
+            self.cost_group,
+            self._cost_group_ref,
+            project.get_restore_lookup("cost_groups"),
         )
 
     @debug.log
@@ -244,10 +252,14 @@ class ArchJob(corp.Job):
         """
         super(ArchJob, self).restore_after_import(project)
         self.trade = restore.restore_by(
-            self.trade, self._trade_ref, project.trades, by=["name"]
+            self.trade,
+            self._trade_ref,
+            project.get_restore_lookup("trades", by=["name"]),
         )
         self.cost_group = restore.restore_by(
-            self.cost_group, self._cost_group_ref, project.cost_groups, by=["id"]
+            self.cost_group,
+            self._cost_group_ref,
+            project.get_restore_lookup("cost_groups", by=["id"]),
         )
 
 
@@ -331,7 +343,9 @@ class Trade(IdObject):
             project (proj.Project): Embedding project
         """
         self.cost_group = restore.restore_by(
-            self.cost_group, self._cost_group_ref, project.cost_groups
+            self.cost_group,
+            self._cost_group_ref,
+            project.get_restore_lookup("cost_groups"),
         )
 
     @debug.log
@@ -342,7 +356,9 @@ class Trade(IdObject):
             project (proj.Project): Embedding project
         """
         self.cost_group = restore.restore_by(
-            self.cost_group, self._cost_group_ref, project.cost_groups, by=["id"]
+            self.cost_group,
+            self._cost_group_ref,
+            project.get_restore_lookup("cost_groups", by=["id"]),
         )
 
     """
@@ -561,7 +577,7 @@ class CostGroup(IdObject):
             project (proj.Project): Embedding project
         """
         self.parent = restore.restore_by(
-            self.parent, self._parent_ref, project.cost_groups
+            self.parent, self._parent_ref, project.get_restore_lookup("cost_groups")
         )
 
     @debug.log
@@ -572,7 +588,9 @@ class CostGroup(IdObject):
             project (proj.Project): Embedding project
         """
         self.parent = restore.restore_by(
-            self.parent, self._parent_ref, project.cost_groups, by=["id"]
+            self.parent,
+            self._parent_ref,
+            project.get_restore_lookup("cost_groups", by=["id"]),
         )
 
     """
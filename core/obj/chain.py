@@ -0,0 +1,160 @@
+"""
+#
+#   CHAIN
+#   Invoices of the same company and job form a chain of cumulative invoices.
+#   The chains are kept sorted by invoice date (and date created, for invoices with
+#   the same date), so the previous invoices of an invoice are simply the cumulative
+#   invoices in front of it. When an invoice is added, edited or deleted, only its
+#   chain needs to be recalculated.
+#
+"""
+import debug
+
+import bisect
+
+
+def get_chain_key(company, job):
+    """Return the key of the chain of invoices of a company and job."""
+    return (id(company), id(job))
+
+
+def get_sort_key(invoice_date, invoice_created_date):
+    """Return the position of an invoice in its chain."""
+    return (invoice_date.toJulianDay(), invoice_created_date)
+
+
+class InvoiceChain:
+
+    """Invoices of a company and job, sorted by date (oldest first).
+
+    Attributes:
+        invoices (list): Sorted invoices of the chain
+        sort_keys (list): Sort keys of the invoices (same order)
+    """
+
+    def __init__(self):
+        self.invoices = list()
+        self.sort_keys = list()
+
+    def insert(self, invoice, sort_key):
+        """Insert an invoice at its position in the chain."""
+        index = bisect.bisect_right(self.sort_keys, sort_key)
+        self.sort_keys.insert(index, sort_key)
+        self.invoices.insert(index, invoice)
+
+    def remove(self, invoice, sort_key):
+        """Remove an invoice, that was inserted with sort_key."""
+        start = bisect.bisect_left(self.sort_keys, sort_key)
+        end = bisect.bisect_right(self.sort_keys, sort_key)
+        for index in range(start, end):
+            if self.invoices[index] is invoice:
+                del self.sort_keys[index]
+                del self.invoices[index]
+                return
+
+    def get_prev_invoices(self, sort_key, invoice_uid=None):
+        """Return the cumulative invoices in front of sort_key."""
+        index = bisect.bisect_left(self.sort_keys, sort_key)
+        return [
+            invoice
+            for invoice in self.invoices[:index]
+            if invoice.cumulative and invoice.uid is not invoice_uid
+        ]
+
+    def update_prev_invoices(self):
+        """Set the previous invoices and their amount of every invoice in the chain."""
+        prev_invoices = list()
+        start = 0
+        while start < len(self.invoices):
+            #   invoices with the same date and date created are not previous to each other
+            end = bisect.bisect_right(self.sort_keys, self.sort_keys[start], lo=start)
+            same_date_invoices = self.invoices[start:end]
+            for invoice in same_date_invoices:
+                #   only older invoices of the chain, so there can't be any recursion
+                invoice.set_prev_invoices(list(prev_invoices), acyclic=True)
+                invoice.update_prev_invoices_amount()
+            prev_invoices.extend(
+                invoice for invoice in same_date_invoices if invoice.cumulative
+            )
+            start = end
+
+    def __len__(self):
+        return len(self.invoices)
+
+
+class InvoiceChains:
+
+    """All invoice chains of a project, keyed by company and job."""
+
+    def __init__(self):
+        #   chain key -> InvoiceChain
+        self._chains = dict()
+        #   id(invoice) -> (chain key, sort key), as the invoice was inserted
+        self._entries = dict()
+
+    def add(self, invoice):
+        """Add an invoice to its chain.
+
+        Returns:
+            tuple: Key of the chain of the invoice
+        """
+        chain_key = get_chain_key(invoice.company, invoice.job)
+        sort_key = get_sort_key(invoice.invoice_date, invoice.uid.created_date)
+        self._chains.setdefault(chain_key, InvoiceChain()).insert(invoice, sort_key)
+        self._entries[id(invoice)] = (chain_key, sort_key)
+        return chain_key
+
+    def remove(self, invoice):
+        """Remove an invoice from its chain.
+
+        Returns:
+            tuple: Key of the chain the invoice was in (None, if not found)
+        """
+        entry = self._entries.pop(id(invoice), None)
+        if entry is None:
+            return None
+        chain_key, sort_key = entry
+        chain = self._chains[chain_key]
+        chain.remove(invoice, sort_key)
+        if not chain:
+            del self._chains[chain_key]
+        return chain_key
+
+    def update(self, invoice):
+        """Move an edited invoice to its (new) position.
+
+        Returns:
+            set: Keys of the chains that changed
+        """
+        old_chain_key = self.remove(invoice)
+        new_chain_key = self.add(invoice)
+        return {key for key in (old_chain_key, new_chain_key) if key is not None}
+
+    def rebuild(self, invoices):
+        """Clear the chains and add all invoices."""
+        debug.debug_msg(f"rebuilding invoice chains of {len(invoices)} invoices...")
+        self._chains = dict()
+        self._entries = dict()
+        for invoice in invoices:
+            self.add(invoice)
+
+    def get_prev_invoices(
+        self, company, job, invoice_date, invoice_created_date, invoice_uid=None
+    ):
+        """Return the previous cumulative invoices of the given company, job and date."""
+        chain = self._chains.get(get_chain_key(company, job))
+        if chain is None:
+            return list()
+        sort_key = get_sort_key(invoice_date, invoice_created_date)
+        return chain.get_prev_invoices(sort_key, invoice_uid)
+
+    def update_prev_invoices(self, chain_key):
+        """Recalculate the previous invoices of the chain with the given key."""
+        chain = self._chains.get(chain_key)
+        if chain is not None:
+            chain.update_prev_invoices()
+
+    def update_all_prev_invoices(self):
+        """Recalculate the previous invoices of all chains."""
+        for chain in self._chains.values():
+            chain.update_prev_invoices()
@@ -197,7 +197,7 @@ class Person(IdObject):
     @debug.log
     def restore(self, project):
         self.company = restore.restore_by(
-            self.company, self._company_ref, project.companies
+            self.company, self._company_ref, project.get_restore_lookup("companies")
         )
 
     """
@@ -305,13 +305,15 @@ class Job(IdObject):
     @debug.log
     def restore(self, project):
         self.company = restore.restore_by(
-            self.company, self._company_ref, project.companies
+            self.company, self._company_ref, project.get_restore_lookup("companies")
         )
 
     @debug.log
     def restore_after_import(self, project):
         self.company = restore.restore_by(
-            self.company, self._company_ref, project.companies, by=["name"]
+            self.company,
+            self._company_ref,
+            project.get_restore_lookup("companies", by=["name"]),
         )
 
     """
@@ -389,8 +391,10 @@ class Invoice(IdObject):
         """ for restoration only """
         self._company_ref = company_ref
         self._job_ref = job_ref
+        #   set, so the membership checks in no_recursion() are hash lookups,
+        #   only used until the previous invoices are restored (see: uid.UID.reset_uid)
         self._prev_invoices_uids = (
-            prev_invoices_uids if prev_invoices_uids is not None else list()
+            set(prev_invoices_uids) if prev_invoices_uids is not None else set()
         )
 
     """
@@ -458,6 +462,20 @@ class Invoice(IdObject):
 
     @prev_invoices.setter
     def prev_invoices(self, invoices):
+        self.set_prev_invoices(invoices)
+
+    def set_prev_invoices(self, invoices, acyclic=False):
+        """Set the previous invoices.
+
+        Args:
+            invoices (list): Previous invoices
+            acyclic (bool, optional): True, if the invoices are known to be older than
+                this invoice (e.g. taken from its chain, see: core.obj.chain), then the
+                recursion check is skipped
+        """
+        if acyclic:
+            self._prev_invoices = invoices
+            return
         self._prev_invoices = [
             invoice for invoice in invoices if self.no_recursion(invoice)
         ]
@@ -685,27 +703,40 @@ class Invoice(IdObject):
 
     @debug.log
     def restore(self, project):
-        self.restore_prev_invoices(project.invoices)
+        self.restore_prev_invoices(project.get_restore_lookup("invoices"))
         self.company = restore.restore_by(
-            self.company, self._company_ref, project.companies
+            self.company, self._company_ref, project.get_restore_lookup("companies")
+        )
+        self.job = restore.restore_by(
+            self.job, self._job_ref, project.get_restore_lookup("jobs")
         )
-        self.job = restore.restore_by(self.job, self._job_ref, project.jobs)
 
     @debug.log
     def restore_after_import(self, project):
         self.company = restore.restore_by(
-            self.company, self._company_ref, project.companies, by=["name"]
+            self.company,
+            self._company_ref,
+            project.get_restore_lookup("companies", by=["name"]),
         )
         self.job = restore.restore_by(
-            self.job, self._job_ref, project.jobs, by=["id", "company.name"]
+            self.job,
+            self._job_ref,
+            project.get_restore_lookup("jobs", by=["id", "company.name"]),
         )
 
     def restore_prev_invoices(self, invoices):
+        """Restore the previous invoices from their UIDs.
+
+        Args:
+            invoices (list or restore.Lookup): Invoices of the project, or a Lookup of them
+        """
         if self._prev_invoices_uids and len(self.prev_invoices) == 0:
+            if not isinstance(invoices, restore.Lookup):
+                invoices = restore.Lookup(invoices)
             self.prev_invoices = [
                 invoice
-                for invoice in invoices
-                if invoice.uid in self._prev_invoices_uids
+                for uid in self._prev_invoices_uids
+                for invoice in invoices.find({"uid": uid})
             ]
             self._prev_invoices_uids = None
         elif self._prev_invoices_uids and len(self.prev_invoices) > 0:
@@ -6,12 +6,19 @@
 """
 import debug
 
+import copy
+import operator
 from datetime import datetime
+from pathlib import Path
 from PyQt5.QtCore import QDate
 
 from core.obj import corp, arch, proj
 from core.obj import IdObject
-from core.obj import restore
+from core.obj import restore, registry, chain, aggregate
+
+
+class ProjectLoadingError(Exception):
+    """Raised, if the deferred members of a project could not be loaded."""
 
 
 class Project(IdObject):
@@ -104,6 +111,30 @@ class Project(IdObject):
             if project_cost_calculations is not None
             else list()
         )
+        #   Registries
+        #       Secondary indexes of the jobs and invoices (see: core.obj.registry).
+        #       They are kept up to date by the add_*, update_* and delete_* functions,
+        #       so the get_*_of_* lookups do not have to scan all jobs/invoices.
+        self.init_registries()
+        self.update_registries()
+        #   InvoiceChains
+        #       The invoices grouped by company and job and sorted by date
+        #       (see: core.obj.chain). Used to calculate the previous invoices.
+        self._invoice_chains = chain.InvoiceChains()
+        #   AggregateCache
+        #       Cached job sums, approved amounts and paid safety deposits per job,
+        #       trade, cost group and in total (see: core.obj.aggregate).
+        #       Edits only drop the entries of the jobs they touch
+        #       (see: invalidate_aggregates_of_job).
+        self._aggregates = aggregate.AggregateCache()
+        #   Restore lookups
+        #       Lookup tables of the objects by uid/name/id/..., only kept
+        #       while restoring the pointers (see: get_restore_lookup).
+        self._restore_lookups = None
+        #   Deferred members
+        #       Future of the jobs and invoices, while a lazily loaded project
+        #       is loading them (see: defer_members).
+        self._deferred = None
 
     """
     #
@@ -288,6 +319,7 @@ class Project(IdObject):
         if not (self._invoices):
             self._invoices = invoices
             self.sort_invoices()
+            self.update_invoice_registries()
         else:
             raise Exception("Existing list of invoices is non-empty.")
 
@@ -295,37 +327,48 @@ class Project(IdObject):
         return [invoice for invoice in self._invoices if invoice.is_deleted()]
 
     def get_invoices_of_job(self, job):
-        return [invoice for invoice in self.invoices if invoice.job is job]
+        if job is None:
+            return [invoice for invoice in self.invoices if invoice.job is None]
+        return [
+            invoice
+            for invoice in self._registries["invoices_by_job"].get(job)
+            if invoice.job is job
+        ]
 
     def get_invoices_of_company(self, company):
-        return [invoice for invoice in self.invoices if invoice.company is company]
+        if company is None:
+            return [invoice for invoice in self.invoices if invoice.company is None]
+        return [
+            invoice
+            for invoice in self._registries["invoices_by_company"].get(company)
+            if invoice.company is company
+        ]
 
     def get_invoices_of_trade(self, trade):
-        return [invoice for invoice in self.invoices if invoice.trade is trade]
+        if trade is None:
+            return [invoice for invoice in self.invoices if invoice.trade is None]
+        #   collected job by job, sorted back into the order of the invoices
+        return self._registries["invoices_by_job"].sort(
+            invoice
+            for job in self.get_jobs_of_trade(trade)
+            for invoice in self.get_invoices_of_job(job)
+        )
 
     def get_invoices_of_cost_group(self, cost_group):
-        return [
+        return self._registries["invoices_by_job"].sort(
             invoice
-            for invoice in self.invoices
-            if invoice.cost_group and invoice.cost_group.is_sub_group_of(cost_group)
-        ]
+            for job in self.get_jobs_of_sub_cost_groups(cost_group)
+            for invoice in self.get_invoices_of_job(job)
+        )
 
     def get_approved_amounts_of_trade(self, trade):
-        return sum(
-            invoice.approved_amount
-            for invoice in self.invoices
-            if invoice.trade is trade
-        )
+        return self.get_aggregates_of_trade(trade)["approved_amount"]
 
     def get_approved_amounts_of_sub_cost_groups(self, cost_group):
-        return sum(
-            invoice.approved_amount
-            for invoice in self.invoices
-            if invoice.cost_group and invoice.cost_group.is_sub_group_of(cost_group)
-        )
+        return self.get_aggregates_of_sub_cost_groups(cost_group)["approved_amount"]
 
     def get_approved_amounts_total(self):
-        return sum(invoice.approved_amount for invoice in self.invoices)
+        return self.get_aggregates_total()["approved_amount"]
 
     """ properties
     #
@@ -341,6 +384,7 @@ class Project(IdObject):
     def jobs(self, jobs):
         if not (self._jobs):
             self._jobs = jobs
+            self.update_job_registries()
         else:
             raise Exception("Existing jobs of companies is non-empty.")
 
@@ -348,75 +392,151 @@ class Project(IdObject):
         return [job for job in self._jobs if job.is_deleted()]
 
     def get_job(self, company, id):
-        return [job for job in self.jobs if job.company is company and job.id == id][0]
+        return [job for job in self.get_jobs_of_company(company) if job.id == id][0]
 
     def get_jobs_of_company(self, company):
-        return [job for job in self.jobs if job.company is company]
+        return [
+            job
+            for job in self._registries["jobs_by_company"].get(company)
+            if job.company is company
+        ]
 
     def get_jobs_of_trade(self, trade):
         return [
             job
-            for job in self.jobs
+            for job in self._registries["jobs_by_trade"].get(trade)
             if isinstance(job, arch.ArchJob) and job.trade is trade
         ]
 
     def get_jobs_of_cost_group(self, cost_group):
         return [
             job
-            for job in self.jobs
+            for job in self._registries["jobs_by_cost_group"].get(cost_group)
             if isinstance(job, arch.ArchJob) and job.cost_group is cost_group
         ]
 
     def get_jobs_of_sub_cost_groups(self, cost_group):
-        return [
+        #   deleted cost groups are included, since jobs can still be linked to them
+        return self._registries["jobs_by_cost_group"].sort(
             job
-            for job in self.jobs
-            if isinstance(job, arch.ArchJob)
-            and job.cost_group
-            and job.cost_group.is_sub_group_of(cost_group)
-        ]
+            for sub_cost_group in self._cost_groups
+            if sub_cost_group.is_sub_group_of(cost_group)
+            for job in self.get_jobs_of_cost_group(sub_cost_group)
+        )
 
     def get_max_job_number(self, company):
-        return max([job.id for job in self.jobs if job.company is company] + [0])
+        return max([job.id for job in self.get_jobs_of_company(company)] + [0])
 
     def get_job_sums_of_trade(self, trade):
-        return sum([job.job_sum_w_additions for job in self.get_jobs_of_trade(trade)])
+        return self.get_aggregates_of_trade(trade)["job_sum"]
 
     def get_job_sums_of_cost_group(self, cost_group):
-        return sum(
-            [job.job_sum_w_additions for job in self.get_jobs_of_cost_group(cost_group)]
-        )
+        return self.get_aggregates_of_cost_group(cost_group)["job_sum"]
 
     def get_job_sums_of_sub_cost_groups(self, cost_group):
-        return sum(
-            [
-                job.job_sum_w_additions
-                for job in self.get_jobs_of_sub_cost_groups(cost_group)
-            ]
-        )
+        return self.get_aggregates_of_sub_cost_groups(cost_group)["job_sum"]
 
     def get_job_sums_total(self):
-        return sum(job.job_sum_w_additions for job in self.jobs)
+        return self.get_aggregates_total()["job_sum"]
 
     def get_psds_of_trade(self, trade):
-        return sum(
-            [job.paid_safety_deposits_sum for job in self.get_jobs_of_trade(trade)]
-        )
+        return self.get_aggregates_of_trade(trade)["psd"]
 
     def get_psds_of_cost_group(self, cost_group):
-        return sum(
-            job.paid_safety_deposits_sum
-            for job in self.get_jobs_of_cost_group(cost_group)
-        )
+        return self.get_aggregates_of_cost_group(cost_group)["psd"]
 
     def get_psds_of_sub_cost_groups(self, cost_group):
-        return sum(
-            job.paid_safety_deposits_sum
-            for job in self.get_jobs_of_sub_cost_groups(cost_group)
-        )
+        return self.get_aggregates_of_sub_cost_groups(cost_group)["psd"]
 
     def get_psds_total(self):
-        return sum(job.paid_safety_deposits_sum for job in self.jobs)
+        return self.get_aggregates_total()["psd"]
+
+    """ properties
+    #
+    #   Aggregates
+    #       Sums of the jobs and their invoices, cached in self._aggregates.
+    #       The entries of a trade/cost group are summed up from the entries
+    #       of their jobs. Invoices without a job are collected in the entry
+    #       of the job None, which counts for the trade None and the total.
+    #
+    """
+
+    def get_aggregates_of_job(self, job):
+        return self._aggregates.get(
+            ("job", id(job)), lambda: self.calculate_aggregates_of_job(job)
+        )
+
+    def calculate_aggregates_of_job(self, job):
+        aggregates = aggregate.get_empty_aggregates()
+        aggregates["approved_amount"] = sum(
+            invoice.approved_amount for invoice in self.get_invoices_of_job(job)
+        )
+        if job is not None:
+            aggregates["job_sum"] = job.job_sum_w_additions
+            aggregates["psd"] = job.paid_safety_deposits_sum
+        return aggregates
+
+    def get_aggregates_of_jobs(self, jobs):
+        return aggregate.sum_aggregates(self.get_aggregates_of_job(job) for job in jobs)
+
+    def get_aggregates_of_trade(self, trade):
+        def calculate():
+            jobs = self.get_jobs_of_trade(trade)
+            if trade is None:
+                jobs.append(None)
+            return self.get_aggregates_of_jobs(jobs)
+
+        return self._aggregates.get(("trade", id(trade)), calculate)
+
+    def get_aggregates_of_cost_group(self, cost_group):
+        return self._aggregates.get(
+            ("cost_group", id(cost_group)),
+            lambda: self.get_aggregates_of_jobs(
+                self.get_jobs_of_cost_group(cost_group)
+            ),
+        )
+
+    def get_aggregates_of_sub_cost_groups(self, cost_group):
+        return self._aggregates.get(
+            ("sub_cost_groups", id(cost_group)),
+            lambda: self.get_aggregates_of_jobs(
+                self.get_jobs_of_sub_cost_groups(cost_group)
+            ),
+        )
+
+    def get_aggregates_total(self):
+        return self._aggregates.get(
+            ("total",), lambda: self.get_aggregates_of_jobs(self.jobs + [None])
+        )
+
+    def invalidate_aggregates_of_job(self, job):
+        """Drop the cached entries containing the amounts of the job.
+
+        Has to be called with the links of the job before and after an edit,
+        since the job might have changed its trade or cost group.
+        """
+        trade = getattr(job, "trade", None)
+        cost_group = getattr(job, "cost_group", None)
+        keys = [
+            ("job", id(job)),
+            ("trade", id(trade)),
+            ("cost_group", id(cost_group)),
+            ("total",),
+        ]
+        #   the job counts for every (strict) parent of its cost group
+        parent = cost_group.parent if cost_group else None
+        while parent:
+            keys.append(("sub_cost_groups", id(parent)))
+            parent = parent.parent
+        self._aggregates.invalidate(keys)
+
+    def invalidate_aggregates_of_invoices(self, invoices):
+        for job in {id(invoice.job): invoice.job for invoice in invoices}.values():
+            self.invalidate_aggregates_of_job(job)
+
+    def clear_aggregates(self):
+        """Drop all cached entries, e.g. after the tree of cost groups changed."""
+        self._aggregates.clear()
 
     """ properties
     #
@@ -573,11 +693,21 @@ class Project(IdObject):
 
     @debug.log
     def apply_cost_group_budget(self, pcc, cost_group):
-        cost_group.budget = pcc.get_cost_group_prognosis(cost_group)
+        self.set_budget(cost_group, pcc.get_cost_group_prognosis(cost_group))
 
     @debug.log
     def apply_trade_budget(self, pcc, trade):
-        trade.budget = pcc.get_trade_prognosis(trade)
+        self.set_budget(trade, pcc.get_trade_prognosis(trade))
+
+    def set_budget(self, o, budget):
+        """Set the budget of a trade or cost group.
+
+        Stamps the edited date, if it changed, so the change is saved and
+        autosaved (see: get_fingerprint, journalr.is_edited_since).
+        """
+        if o.budget != budget:
+            o.budget = budget
+            o.edited()
 
     """ func
     #
@@ -595,21 +725,47 @@ class Project(IdObject):
     def add_job(self, job):
         if isinstance(job, corp.Job):
             self._jobs.append(job)
+            self.register_job(job)
+            self.invalidate_aggregates_of_job(job)
         else:
             raise TypeError("job is not an corp.Job type.")
 
+    @debug.log
+    def update_job(self, job, job_args):
+        #   the old trade and cost group lose the amounts of the job
+        self.invalidate_aggregates_of_job(job)
+        job.update(**job_args)
+        self.refresh_job(job)
+        return job
+
     @debug.log
     def delete_job(self, job):
+        invoices_of_job = self.get_invoices_of_job(job)
+        self.invalidate_aggregates_of_job(job)
         job.delete()
+        self.unregister_job(job)
+        #   invoices of a deleted job have no job anymore, hence their chains changed
+        self.update_invoice_chains(invoices_of_job)
+        self.invalidate_aggregates_of_job(None)
         # TODO: What happens with linked objects?
         return job
 
     def job_exists(self, id, company):
-        exists = [job for job in self.jobs if job.id == id and job.company is company]
+        exists = [job for job in self.get_jobs_of_company(company) if job.id == id]
         if exists:
             return True
         return False
 
+    @debug.log
+    def refresh_job(self, job):
+        """Update the registries and aggregates after a job was edited in place.
+
+        E.g. after paying a safety deposit or adding a job addition.
+        """
+        for job_registry in self.get_job_registries():
+            job_registry.update(job)
+        self.invalidate_aggregates_of_job(job)
+
     """ func
     #
     #   Invoices
@@ -626,20 +782,31 @@ class Project(IdObject):
     def add_invoice(self, invoice):
         if isinstance(invoice, corp.Invoice):
             self._invoices.append(invoice)
-            self.update_all_prev_invoices()
+            self.register_invoice(invoice)
+            chain_key = self._invoice_chains.add(invoice)
+            self._invoice_chains.update_prev_invoices(chain_key)
+            self.invalidate_aggregates_of_job(invoice.job)
         else:
             raise TypeError("invoice is not an corp.Invoice type.")
 
     @debug.log
     def update_invoice(self, invoice, invoice_args):
+        #   the invoice might move to another job
+        self.invalidate_aggregates_of_job(invoice.job)
         invoice.update(**invoice_args)
-        self.update_all_prev_invoices()
+        for invoice_registry in self.get_invoice_registries():
+            invoice_registry.update(invoice)
+        self.update_invoice_chains([invoice])
+        self.invalidate_aggregates_of_job(invoice.job)
         return invoice
 
     @debug.log
     def delete_invoice(self, invoice):
+        self.invalidate_aggregates_of_job(invoice.job)
         invoice.delete()
-        self.update_all_prev_invoices()
+        self.unregister_invoice(invoice)
+        chain_key = self._invoice_chains.remove(invoice)
+        self._invoice_chains.update_prev_invoices(chain_key)
         return invoice
 
     @debug.log
@@ -647,22 +814,34 @@ class Project(IdObject):
         self.invoices.sort(key=lambda invoice: invoice.invoice_date, reverse=True)
 
     @debug.log
+    def update_invoice_chains(self, invoices):
+        """Move the given invoices to their (new) chains and recalculate the changed chains."""
+        chain_keys = set()
+        for invoice in invoices:
+            chain_keys |= self._invoice_chains.update(invoice)
+        for chain_key in chain_keys:
+            self._invoice_chains.update_prev_invoices(chain_key)
+
+    @debug.log
+    @debug.timed()
     def update_all_prev_invoices(self):
-        # sort_invoices needed here, because we dont know if an invoice was edited
-        self.sort_invoices()
-        for invoice in self.invoices:
-            prev_invoices = self.get_prev_invoices(invoice=invoice)
-            invoice.prev_invoices = prev_invoices
-            invoice.update_prev_invoices_amount()
+        """Regroup all invoices into chains and recalculate their previous invoices.
+
+        Adding, editing or deleting a single invoice only updates its chain
+        (see: add_invoice, update_invoice, delete_invoice). Use this function
+        after the links of many invoices changed, e.g. after restoring.
+        """
+        self._invoice_chains.rebuild(self.invoices)
+        self._invoice_chains.update_all_prev_invoices()
+        self.clear_aggregates()
 
     """
     #
     #   get_prev_invoices
     #       Get the previous invoices based on either an invoice, or the info
     #       of company, job, date and (for same date invoices) date of the creation
-    #       The invoices MUST be sorted reversely by date (see: sort_invoices()).
-    #       For perfomance's sake, the invoices are not sorted everytime, but only
-    #       at the points, after the invoices-list got edited.
+    #       The previous invoices are looked up in the chain of the company and job
+    #       (see: core.obj.chain), sorted by date (oldest first).
     #
     """
 
@@ -680,34 +859,15 @@ class Project(IdObject):
     ):
         prev_invoices = list()
         if cumulative:
-            invoices = [invoice for invoice in self.invoices if invoice.cumulative]
             if isinstance(invoice, corp.Invoice):
                 invoice_uid = invoice.uid
                 company = invoice.company
                 job = invoice.job
                 invoice_date = invoice.invoice_date
                 invoice_created_date = invoice.uid.created_date
-            if [company, job, invoice_date, invoice_created_date]:
-                """company and job have to be the same"""
-                prev_invoices_company_job = [
-                    prev_invoice
-                    for prev_invoice in invoices
-                    if prev_invoice.uid is not invoice_uid
-                    and prev_invoice.company is company
-                    and prev_invoice.job is job
-                ]
-                """ invoice date must be earlier or IF same date, date_created must be earlier """
-                prev_invoices = [
-                    prev_invoice
-                    for prev_invoice in prev_invoices_company_job
-                    if prev_invoice.invoice_date.toJulianDay()
-                    < invoice_date.toJulianDay()
-                    or (
-                        prev_invoice.invoice_date.toJulianDay()
-                        == invoice_date.toJulianDay()
-                        and prev_invoice.uid.created_date < invoice_created_date
-                    )
-                ]
+            prev_invoices = self._invoice_chains.get_prev_invoices(
+                company, job, invoice_date, invoice_created_date, invoice_uid
+            )
         return prev_invoices
 
     """ func
@@ -731,9 +891,13 @@ class Project(IdObject):
 
     @debug.log
     def delete_company(self, company):
+        invoices_of_company = self.get_invoices_of_company(company)
         company.delete()
         if company.contact_person:
             company.contact_person.delete()
+        #   invoices of a deleted company have no company anymore, hence their chains changed
+        self.update_invoice_chains(invoices_of_company)
+        self.invalidate_aggregates_of_invoices(invoices_of_company)
         return company
 
     """ func
@@ -780,6 +944,13 @@ class Project(IdObject):
         else:
             raise TypeError("cost_group is not an arch.CostGroup type.")
 
+    @debug.log
+    def update_cost_group(self, cost_group, cost_group_args):
+        cost_group.update(**cost_group_args)
+        #   a new parent changes the sums of the sub cost groups of the old and new parents
+        self.clear_aggregates()
+        return cost_group
+
     @debug.log
     def delete_cost_group(self, cost_group):
         cost_group.delete()
@@ -809,7 +980,7 @@ class Project(IdObject):
 
     @debug.log
     def set_cost_group_budget(self, cost_group):
-        cost_group.budget = self.get_cost_group_budget(cost_group)
+        self.set_budget(cost_group, self.get_cost_group_budget(cost_group))
 
     @debug.log
     def get_cost_group_budget(self, cost_group):
@@ -872,6 +1043,7 @@ class Project(IdObject):
         self.edited()
 
     @debug.log
+    @debug.timed()
     def restore(self):
         """Restore pointers from UID.
 
@@ -880,16 +1052,122 @@ class Project(IdObject):
         created in the same project and hence the UIDs are known. If that
         is not the case, use restore_after_import().
         """
-        self.restore_people()
-        self.restore_cost_groups()
-        self.restore_project_cost_calculations()
-        self.restore_trades()
-        self.restore_companies()
-        self.restore_jobs()
-        self.restore_invoices()
+        self._restore_lookups = dict()
+        try:
+            self.restore_people()
+            self.restore_cost_groups()
+            self.restore_trades()
+            self.restore_companies()
+            self.restore_project_cost_calculations()
+            self.restore_jobs()
+            self.restore_invoices()
+        finally:
+            self._restore_lookups = None
+        self.update_registries()
         self.update_all_prev_invoices()
 
+    """
+    #   DEFERRED MEMBERS
+    #       A lazily loaded project (see: AppData.load_project) gets its project
+    #       cost calculations, jobs and invoices after the window is shown. They
+    #       are decoded and restored on a worker thread into a staging copy of the
+    #       project (see: prepare_deferred_members), the project itself only
+    #       changes, when they are attached (see: attach_deferred_members).
+    #       Until then, the project has none of them and cannot be saved.
+    """
+
+    DEFERRED_ATTRIBUTES = [
+        "_project_cost_calculations",
+        "_jobs",
+        "_invoices",
+        "_registries",
+        "_invoice_chains",
+    ]
+
+    def defer_members(self, loading):
+        """Mark the project cost calculations, jobs and invoices as loading.
+
+        Args:
+            loading (concurrent.futures.Future): Returns the prepared attributes
+                (see: prepare_deferred_members)
+        """
+        self._deferred = loading
+
+    def has_deferred_members(self):
+        return self._deferred is not None
+
+    def call_when_loaded(self, callback):
+        """Call callback() once the deferred members are loaded or failed to load.
+
+        It is called on the loading thread (or right away, if they are loaded).
+        """
+        self._deferred.add_done_callback(lambda loading: callback())
+
     @debug.log
+    @debug.timed()
+    def prepare_deferred_members(self, members):
+        """Restore the deferred members into a staging copy of the project.
+
+        The project is only read (to look up the companies, trades and cost
+        groups), so this can run on a worker thread.
+
+        Args:
+            members (dict): The decoded "project_cost_calculations", "jobs"
+                and "invoices"
+
+        Returns:
+            dict: Attribute name -> value of the DEFERRED_ATTRIBUTES
+        """
+        staging = copy.copy(self)
+        staging._project_cost_calculations = list()
+        staging._jobs = list()
+        staging._invoices = list()
+        staging.init_registries()
+        staging._invoice_chains = chain.InvoiceChains()
+        staging._aggregates = aggregate.AggregateCache()
+        staging.project_cost_calculations = members["project_cost_calculations"]
+        staging.jobs = members["jobs"]
+        staging.invoices = members["invoices"]
+
+        staging._restore_lookups = dict()
+        try:
+            staging.restore_project_cost_calculations()
+            staging.restore_jobs()
+            staging.restore_invoices()
+        finally:
+            staging._restore_lookups = None
+        staging.update_registries()
+        staging.update_all_prev_invoices()
+        return {name: getattr(staging, name) for name in Project.DEFERRED_ATTRIBUTES}
+
+    def attach_deferred_members(self, attributes):
+        """Attach the prepared deferred members (see: prepare_deferred_members)."""
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        self._deferred = None
+        self.clear_aggregates()
+
+    @debug.log
+    @debug.timed()
+    def load_deferred_members(self):
+        """Wait for the deferred members and attach them (no-op, if there are none).
+
+        Raises:
+            ProjectLoadingError: If they could not be loaded. The project is left
+                unchanged, i.e. without them, and still cannot be saved.
+        """
+        if self._deferred is None:
+            return
+        try:
+            attributes = self._deferred.result()
+        except Exception as e:
+            raise ProjectLoadingError(
+                f"The jobs and invoices of {self.identifier} could not be loaded: {e}"
+            ) from e
+        self.attach_deferred_members(attributes)
+
+    @debug.log
+    @debug.timed()
     def restore_after_import(self):
         """Restore pointers from name/id/... .
 
@@ -898,15 +1176,41 @@ class Project(IdObject):
         like name, id, etc. to restore the links.
         If UID is known, use restore().
         """
-        self.restore_after_import_people()
-        self.restore_after_import_cost_groups()
-        self.restore_after_import_project_cost_calculations()
-        self.restore_after_import_trades()
-        self.restore_after_import_companies()
-        self.restore_after_import_jobs()
-        self.restore_after_import_invoices()
+        self._restore_lookups = dict()
+        try:
+            self.restore_after_import_people()
+            self.restore_after_import_cost_groups()
+            self.restore_after_import_project_cost_calculations()
+            self.restore_after_import_trades()
+            self.restore_after_import_companies()
+            self.restore_after_import_jobs()
+            self.restore_after_import_invoices()
+        finally:
+            self._restore_lookups = None
+        self.update_registries()
         self.update_all_prev_invoices()
 
+    def get_restore_lookup(self, objects_name, by=["uid"]):
+        """Return a lookup table of the objects to restore pointers to.
+
+        While restoring the project (see: restore, restore_after_import), every
+        table is built once and then reused for all pointers, which keeps
+        restoring linear in the size of the project.
+
+        Args:
+            objects_name (str): Name of the list of objects, e.g. "jobs"
+            by (list, optional): Properties to use for lookup
+
+        Returns:
+            restore.Lookup: Lookup table of the objects
+        """
+        if self._restore_lookups is None:
+            return restore.Lookup(getattr(self, objects_name), by)
+        key = (objects_name, tuple(by))
+        if key not in self._restore_lookups:
+            self._restore_lookups[key] = restore.Lookup(getattr(self, objects_name), by)
+        return self._restore_lookups[key]
+
     """
     #   AFTER LOADING
     """
@@ -971,6 +1275,71 @@ class Project(IdObject):
         for cost_group in self.cost_groups:
             cost_group.restore_after_import(self)
 
+    """
+    #
+    #   Registries
+    #       Keep the secondary indexes of jobs and invoices up to date.
+    #       Only non-deleted objects are registered.
+    #
+    """
+
+    def get_job_registries(self):
+        return [
+            self._registries["jobs_by_company"],
+            self._registries["jobs_by_trade"],
+            self._registries["jobs_by_cost_group"],
+        ]
+
+    def get_invoice_registries(self):
+        return [
+            self._registries["invoices_by_company"],
+            self._registries["invoices_by_job"],
+        ]
+
+    def register_job(self, job):
+        for job_registry in self.get_job_registries():
+            job_registry.add(job)
+
+    def unregister_job(self, job):
+        for job_registry in self.get_job_registries():
+            job_registry.remove(job)
+
+    def register_invoice(self, invoice):
+        for invoice_registry in self.get_invoice_registries():
+            invoice_registry.add(invoice)
+
+    def unregister_invoice(self, invoice):
+        for invoice_registry in self.get_invoice_registries():
+            invoice_registry.remove(invoice)
+
+    @debug.log
+    def update_job_registries(self):
+        jobs = self.jobs
+        for job_registry in self.get_job_registries():
+            job_registry.rebuild(jobs)
+
+    @debug.log
+    def update_invoice_registries(self):
+        invoices = self.invoices
+        for invoice_registry in self.get_invoice_registries():
+            invoice_registry.rebuild(invoices)
+
+    def init_registries(self):
+        """Create the empty registries of the jobs and invoices by their links."""
+        self._registries = {
+            "jobs_by_company": registry.Registry(operator.attrgetter("company")),
+            "jobs_by_trade": registry.Registry(operator.attrgetter("trade")),
+            "jobs_by_cost_group": registry.Registry(operator.attrgetter("cost_group")),
+            "invoices_by_company": registry.Registry(operator.attrgetter("_company")),
+            "invoices_by_job": registry.Registry(operator.attrgetter("_job")),
+        }
+
+    @debug.log
+    def update_registries(self):
+        """Rebuild all registries, e.g. after the pointers got restored."""
+        self.update_job_registries()
+        self.update_invoice_registries()
+
     """
     #
     #   Utility
@@ -981,6 +1350,53 @@ class Project(IdObject):
     def has_been_saved(self):
         return True if self.config["user_save"]["path"] else False
 
+    """
+    #   Fingerprint
+    #   Cheap check, whether the project has changed since it was saved.
+    """
+
+    def get_id_objects(self):
+        """Return all objects of the project that are saved, incl. the deleted ones."""
+        id_objects = [self]
+        id_objects += [
+            o for o in [self.address, self.client, self.project_data] if o is not None
+        ]
+        for company in self._companies:
+            id_objects.append(company)
+            if company.contact_person:
+                id_objects.append(company.contact_person)
+        for pcc in self._project_cost_calculations:
+            id_objects.append(pcc)
+            id_objects += pcc._inventory
+        id_objects += self._trades
+        id_objects += self._cost_groups
+        id_objects += self._jobs
+        id_objects += self._invoices
+        return id_objects
+
+    @debug.timed()
+    def get_fingerprint(self):
+        """Get a fingerprint of the content of the project.
+
+        Objects are never removed (only marked deleted) and every edit stamps
+        the edited date of the object (see: IdObject.edited), so the number of
+        objects and the latest created/edited date change with every edit.
+
+        Returns:
+            tuple: Fingerprint, compare with == to a previous one
+        """
+        id_objects = self.get_id_objects()
+        latest_date = max(
+            max(o.uid.created_date, o.uid.edited_date or o.uid.created_date)
+            for o in id_objects
+        )
+        config = {
+            key: value
+            for key, value in self.config.items()
+            if key not in ["user_save", "last_auto_save"]
+        }
+        return (len(id_objects), latest_date, repr(sorted(config.items())))
+
 
 class ProjectData(IdObject):
     """Encapsulates the advanced project data.
@@ -1290,9 +1706,13 @@ class InventoryItem(IdObject):
     @debug.log
     def restore(self, project):
         self.cost_group = restore.restore_by(
-            self.cost_group, self._cost_group_ref, project.cost_groups
+            self.cost_group,
+            self._cost_group_ref,
+            project.get_restore_lookup("cost_groups"),
+        )
+        self.trade = restore.restore_by(
+            self.trade, self._trade_ref, project.get_restore_lookup("trades")
         )
-        self.trade = restore.restore_by(self.trade, self._trade_ref, project.trades)
 
     """
     #
@@ -0,0 +1,105 @@
+"""
+#
+#   REGISTRY
+#   Secondary indexes of the project objects (i.e. jobs by company, invoices by job).
+#   The Project keeps one Registry per relation and updates it, whenever an object
+#   is added, edited or deleted. Lookups are then dictionary hits instead of scanning
+#   the whole list of jobs or invoices.
+#
+"""
+import debug
+
+
+class Registry:
+
+    """Index of objects by a linked object, e.g. the jobs of a company.
+
+    The linked object is used as key via its identity (id()), since the lookups
+    in the project compare links with "is" and not all objects are hashable.
+    Every object keeps its position of the project's list (the order of adding),
+    so the lookups return the objects in the same order as the list.
+
+    Attributes:
+        key (callable): Function returning the linked object of an object
+    """
+
+    def __init__(self, key):
+        """Initialize Registry.
+
+        Args:
+            key (callable): Function returning the linked object of an object,
+                            e.g. operator.attrgetter("company")
+        """
+        self.key = key
+        #   id(link) -> {id(o): o}, dicts keep the order of insertion
+        self._buckets = dict()
+        #   id(o) -> id(link), to find the bucket of an object after its link changed
+        self._links = dict()
+        #   id(o) -> position in the order of adding
+        self._positions = dict()
+        self._next_position = 0
+
+    def get_link(self, o):
+        """Return the linked object of o (None, if o has no such attribute)."""
+        try:
+            return self.key(o)
+        except AttributeError:
+            return None
+
+    def add_to_bucket(self, o):
+        link_id = id(self.get_link(o))
+        bucket = self._buckets.setdefault(link_id, dict())
+        bucket[id(o)] = o
+        self._links[id(o)] = link_id
+        return bucket
+
+    def add(self, o):
+        """Add an object to the index (after the objects added before)."""
+        self._positions[id(o)] = self._next_position
+        self._next_position += 1
+        self.add_to_bucket(o)
+
+    def remove_from_bucket(self, o):
+        link_id = self._links.pop(id(o), None)
+        if link_id is not None:
+            bucket = self._buckets[link_id]
+            del bucket[id(o)]
+            if not bucket:
+                del self._buckets[link_id]
+
+    def remove(self, o):
+        """Remove an object from the index."""
+        self.remove_from_bucket(o)
+        self._positions.pop(id(o), None)
+
+    def update(self, o):
+        """Move an object to its new bucket, if its link changed."""
+        if id(o) not in self._positions:
+            self.add(o)
+        elif self._links[id(o)] != id(self.get_link(o)):
+            self.remove_from_bucket(o)
+            bucket = self.add_to_bucket(o)
+            #   an object added earlier belongs before the others of its new bucket
+            if any(self._positions[key] > self._positions[id(o)] for key in bucket):
+                link_id = self._links[id(o)]
+                self._buckets[link_id] = {
+                    key: bucket[key] for key in sorted(bucket, key=self._positions.get)
+                }
+
+    def get(self, link):
+        """Return the indexed objects linked to link."""
+        return list(self._buckets.get(id(link), dict()).values())
+
+    def sort(self, objects):
+        """Sort indexed objects (e.g. of several links) into the order of adding."""
+        return sorted(objects, key=lambda o: self._positions[id(o)])
+
+    def rebuild(self, objects):
+        """Clear the index and add all objects."""
+        debug.debug_msg(f"rebuilding registry of {len(objects)} objects...")
+        self._buckets = dict()
+        self._links = dict()
+        self._positions = dict()
+        self._next_position = 0
+        for o in objects:
+            self.add(o)
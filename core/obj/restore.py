@@ -8,28 +8,97 @@
 import debug
 import operator  # operator.attrgetter needed for second depth access like invoice.company.name
 
+from core.obj import uid
+
+
+class Lookup:
+
+    """Index of objects by the values of some of their attributes.
+
+    Restoring the links of a whole project looks up every reference in the same
+    few lists of objects. Instead of scanning the list for every reference, the
+    list is indexed once and every lookup is a dictionary hit.
+
+    A Lookup is only valid within the restore pass, that built it: resetting a
+    UID changes its hash (see: uid.UID.reset_uid), so find() raises, if a UID
+    was reset since then.
+
+    Attributes:
+        by (list): Properties used for lookup, e.g. ["id", "company.name"]
+    """
+
+    def __init__(self, objects, by=["uid"]):
+        """Initialize Lookup.
+
+        Args:
+            objects (list): List of objects to look in
+            by (list, optional): Properties to use for lookup
+        """
+        self.by = by
+        self._uid_resets = uid.UID.resets
+        self._getters = [operator.attrgetter(attr) for attr in by]
+        #   key (tuple of the values) -> list of objects, in the order of objects
+        self._index = dict()
+        #   objects with unhashable values, these are compared one by one
+        self._unhashable = list()
+        for o in objects:
+            try:
+                key = tuple(getter(o) for getter in self._getters)
+            except AttributeError:
+                #   e.g. "company.name" of a job without company, can never match
+                continue
+            try:
+                self._index.setdefault(key, list()).append(o)
+            except TypeError:
+                self._unhashable.append(o)
+
+    def find(self, ref):
+        """Return the objects matching the reference.
+
+        Args:
+            ref (dict): Reference to the object
+
+        Returns:
+            list: Objects with the referenced values
+
+        Raises:
+            Exception: If a UID was reset since the Lookup was built
+        """
+        if self._uid_resets != uid.UID.resets:
+            raise Exception("Lookup is outdated: a UID was reset since it was built.")
+        key = tuple(ref[attr] for attr in self.by)
+        try:
+            found = list(self._index.get(key, list()))
+        except TypeError:
+            found = list()
+        found += [
+            o
+            for o in self._unhashable
+            if all(getter(o) == value for getter, value in zip(self._getters, key))
+        ]
+        return found
+
 
 def restore_by(link, ref, set, by=["uid"]):
     """Restore the pointer/link to an object.
 
     Usage:
         o.link = restore_by(o.link, o.link_ref, project.set)
+        o.link = restore_by(o.link, o.link_ref, project.get_restore_lookup("set"))
 
     Args:
         link (TYPE): Link to the object
         ref (dict): Reference to the object
-        set (list): List of objects to look in
+        set (list or Lookup): List of objects to look in, or a Lookup of them
+                              (then by is taken from the Lookup)
         by (list, optional): Properties to use for lookup
 
     Returns:
         TYPE: Referenced object
     """
     if ref and not (link):
-        new_link = [
-            o
-            for o in set
-            if all(operator.attrgetter(attr)(o) == ref[attr] for attr in by)
-        ]
+        lookup = set if isinstance(set, Lookup) else Lookup(set, by)
+        new_link = lookup.find(ref)
         if len(new_link) == 1:
             # Found exactly one link, linking
             del ref
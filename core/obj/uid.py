@@ -86,8 +86,18 @@ class UID:
     #
     """
 
+    #   number of resets, to detect lookups built before a reset (see: restore.Lookup)
+    resets = 0
+
     def reset_uid(self):
-        """Reset the UID."""
+        """Reset the UID.
+
+        The hash changes with the UID, so a reset UID cannot be found anymore in
+        dicts and sets built before the reset (e.g. restore.Lookup). Reset only
+        objects, that are not restored yet, e.g. imported ones before their links
+        are restored.
+        """
+        UID.resets += 1
         created_date = datetime.now()
         edited_date = None
         self.uid = uuid.uuid4()
@@ -110,27 +120,30 @@ class UID:
             + ">"
         )
 
+    def __hash__(self):
+        """Hash the same attributes, that are compared in __eq__.
+
+        This allows to use UIDs as keys of dicts, e.g. when restoring pointers.
+        The edited date is left out on purpose, since it changes on every edit.
+        The hash changes, if the UID is reset (see: reset_uid).
+        """
+        return hash((self.class_name, self.uid, self.created_date))
+
     def __eq__(self, other):
-        """Define two UID objects to be the same, if the uid is the same"""
+        """Define two UID objects to be the same, if the uid is the same.
+
+        The edited date is not compared, an older and a newer state of the same
+        object are equal.
+        """
+        if self is other:
+            return True
         if isinstance(other, UID):
-            if (
+            return (
                 self.class_name == other.class_name
                 and self.uid == other.uid
                 and self.created_date == other.created_date
-            ):
-                if self.edited_date is not None and other.edited_date is not None:
-                    if self.edited_date < other.edited_date:
-                        print("left side uid is older!")
-                        return True
-                    elif self.edited_date > other.edited_date:
-                        print("left side uid is newer!")
-                        return True
-                    else:
-                        return True
-                else:
-                    return True
-            else:
-                return False
+            )
+        return False
 
 
 class IdObject:
@@ -5,71 +5,116 @@
 #
 """
 import time
+import math
+import random
 import functools
+import contextlib
+import collections
 import logging
+import cProfile
+import json
+import csv
+from pathlib import Path
 
 """
 #
-#   LOGGING DECORATOR
-#
+#   DEBUG MODE
+#   Read the "debug" flag of the app config when this module is imported.
+#   If debug is off, @log returns the undecorated function, so calls of
+#   decorated functions don't pay anything for logging.
 #
 """
 
 
-def log(func):
-    level = logging.DEBUG
+def load_config_flag(key):
+    """Read a flag (e.g. "debug") from the app config file.
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.log(level, f">> starting {func.__name__} with args: {args} - {kwargs}")
-        output = func(*args, **kwargs)
-        logger.log(level, f"|| completed {func.__name__} returned: {output}")
-        return output
+    The path is the same as in core.api.AppData.get_app_config_path(). This
+    module is imported before the app config is loaded, hence it reads the file
+    itself. If the file (or appdirs) is missing, the flag is off.
 
-    return wrapper
+    Args:
+        key (str): Key of the flag in the app config
 
+    Returns:
+        bool: True, if the flag is on
+    """
+    try:
+        import appdirs
 
-def log_info(func):
-    level = logging.INFO
+        dir = appdirs.user_data_dir("SYP-Kostenfortschreibung", "Timo_Yu")
+        with open(Path(dir, "app_config.json"), "r") as file:
+            return bool(json.load(file).get(key, False))
+    except (ImportError, OSError, ValueError, AttributeError):
+        return False
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.log(level, f">> starting {func.__name__} with args: {args} - {kwargs}")
-        output = func(*args, **kwargs)
-        logger.log(level, f"|| completed {func.__name__} returned: {output}")
-        return output
 
-    return wrapper
+#   BIND_UNDECORATED
+#       If True, @log binds the undecorated function. The higher levels
+#       (@log_info, @log_warning, @log_error) are always wrapped, since
+#       they are written to the log in the default logging config.
+BIND_UNDECORATED = not load_config_flag("debug")
 
+"""
+#
+#   LOGGING DECORATOR
+#   The messages are only formatted, if the logger is enabled for the level.
+#
+"""
 
-def log_warning(func):
-    level = logging.WARNING
+
+def log_calls(func, level, start_prefix="", end_prefix=""):
+    """Wrap func, so its calls and return values are logged with the given level.
+
+    Args:
+        func (callable): Function to wrap
+        level (int): Logging level, e.g. logging.DEBUG
+        start_prefix (str, optional): Prefix of the message before the call
+        end_prefix (str, optional): Prefix of the message after the call
+
+    Returns:
+        callable: Wrapped function
+    """
+    # not everything passed to the decorators is a function, i.e. debug.log("message")
+    logger = logging.getLogger(getattr(func, "__module__", None) or __name__)
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.log(level, f"starting {func.__name__} with args: {args} - {kwargs}")
+        if not logger.isEnabledFor(level):
+            return func(*args, **kwargs)
+        logger.log(
+            level,
+            "%sstarting %s with args: %s - %s",
+            start_prefix,
+            func.__name__,
+            args,
+            kwargs,
+        )
         output = func(*args, **kwargs)
-        logger.log(level, f"completed {func.__name__} returned: {output}")
+        logger.log(
+            level, "%scompleted %s returned: %s", end_prefix, func.__name__, output
+        )
         return output
 
     return wrapper
 
 
-def log_error(func):
-    level = logging.ERROR
+def log(func):
+    if BIND_UNDECORATED:
+        return func
+    return log_calls(func, logging.DEBUG, ">> ", "|| ")
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.log(level, f"starting {func.__name__} with args: {args} - {kwargs}")
-        output = func(*args, **kwargs)
-        logger.log(level, f"completed {func.__name__} returned: {output}")
-        return output
 
-    return wrapper
+def log_info(func):
+    return log_calls(func, logging.INFO, ">> ", "|| ")
+
+
+def log_warning(func):
+    return log_calls(func, logging.WARNING)
+
+
+def log_error(func):
+    return log_calls(func, logging.ERROR)
 
 
 """
@@ -120,3 +165,230 @@ def timeit(func):
         return result
 
     return wrapper
+
+
+"""
+#
+#   INSTRUMENTATION
+#   Named timers and counters for the hot paths (loading, saving, restoring,
+#   rendering, exporting), switched on by "instrumentation" in the app config.
+#   If it is off, @timed returns the undecorated function and timer() measures
+#   nothing. Per name only streaming aggregates are kept (count, total, max and
+#   a bounded reservoir of samples for p50/p95), so a long session doesn't grow.
+#
+"""
+
+#   INSTRUMENTED
+#       Read when this module is imported, like BIND_UNDECORATED. Functions
+#       decorated while it is off stay undecorated (see: set_instrumentation).
+INSTRUMENTED = load_config_flag("instrumentation")
+#   number of durations kept per name for the percentiles
+RESERVOIR_SIZE = 1024
+RESERVOIR_RANDOM = random.Random(0)
+
+
+class Timing:
+
+    """Streaming aggregate of the durations of an operation.
+
+    Attributes:
+        count (int): Number of durations
+        total (float): Sum of the durations in seconds
+        max (float): Longest duration in seconds
+        samples (list): Uniform sample of at most RESERVOIR_SIZE durations
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = list()
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(duration)
+        else:
+            #   reservoir sampling: every duration is kept with the same chance
+            index = RESERVOIR_RANDOM.randrange(self.count)
+            if index < RESERVOIR_SIZE:
+                self.samples[index] = duration
+
+
+#   name -> Timing
+TIMINGS = collections.defaultdict(Timing)
+#   name -> count
+COUNTERS = collections.Counter()
+#   cProfile.Profile, while profiling (see: start_profiling)
+PROFILER = None
+
+
+def set_instrumentation(enabled):
+    """Switch the instrumentation on or off, e.g. for the benchmarks.
+
+    Only affects timer() and the functions decorated afterwards, so switch it
+    on before importing the modules to measure.
+
+    Args:
+        enabled (bool): True, to measure
+    """
+    global INSTRUMENTED
+    INSTRUMENTED = enabled
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Measure the time of a block of code (if the instrumentation is on).
+
+    Usage:
+        with debug.timer("zipr.save_project"):
+            ...
+
+    Args:
+        name (str): Name of the operation
+    """
+    if not INSTRUMENTED:
+        yield
+        return
+    ts = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIMINGS[name].add(time.perf_counter() - ts)
+
+
+def timed(name=None):
+    """Decorator measuring every call of a function (if the instrumentation is on).
+
+    Usage:
+        @debug.timed()
+        def restore(self): ...
+
+    Args:
+        name (str, optional): Name of the operation, defaults to module.qualname
+
+    Returns:
+        callable: Decorator
+    """
+
+    def decorator(func):
+        if not INSTRUMENTED:
+            return func
+        timer_name = name if name else f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ts = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                TIMINGS[timer_name].add(time.perf_counter() - ts)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name, n=1):
+    """Increase the counter of name by n (if the instrumentation is on)."""
+    if INSTRUMENTED:
+        COUNTERS[name] += n
+
+
+def get_percentile(sorted_values, percent):
+    """Return the percentile of sorted values (nearest rank)."""
+    if not sorted_values:
+        return 0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def get_report():
+    """Return the timings (in ms) and counters collected so far.
+
+    p50 and p95 are taken from the reservoir of the samples (exact up to
+    RESERVOIR_SIZE calls).
+
+    Returns:
+        dict: {"timers": {name: {count, total, p50, p95, max}}, "counters": {name: count}}
+    """
+    timers = dict()
+    for name, timing in sorted(TIMINGS.items()):
+        samples_ms = sorted(duration * 1000 for duration in timing.samples)
+        timers[name] = {
+            "count": timing.count,
+            "total": timing.total * 1000,
+            "p50": get_percentile(samples_ms, 50),
+            "p95": get_percentile(samples_ms, 95),
+            "max": timing.max * 1000,
+        }
+    return {"timers": timers, "counters": dict(sorted(COUNTERS.items()))}
+
+
+def export_report(path):
+    """Write the report to a *.json or *.csv file (chosen by the suffix).
+
+    Args:
+        path (str or Path): Path of the report file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = get_report()
+    if path.suffix == ".csv":
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ["type", "name", "count", "total_ms", "p50_ms", "p95_ms", "max_ms"]
+            )
+            for name, timing in report["timers"].items():
+                writer.writerow(
+                    ["timer", name]
+                    + [timing[key] for key in ["count", "total", "p50", "p95", "max"]]
+                )
+            for name, counter in report["counters"].items():
+                writer.writerow(["counter", name, counter, "", "", "", ""])
+    else:
+        with open(path, "w") as file:
+            json.dump(report, file, indent=4)
+    info_msg(f"instrumentation report written to {path}")
+
+
+def reset_instrumentation():
+    """Clear all timings and counters."""
+    TIMINGS.clear()
+    COUNTERS.clear()
+
+
+"""
+#
+#   PROFILING
+#   Capture a cProfile of the running app, switched on by "profile" in the app config.
+#
+"""
+
+
+def start_profiling():
+    """Start capturing a cProfile (does nothing, if already profiling)."""
+    global PROFILER
+    if PROFILER is None:
+        PROFILER = cProfile.Profile()
+        PROFILER.enable()
+        info_msg("profiling started")
+
+
+def stop_profiling(path=None):
+    """Stop capturing and optionally dump the stats to path (open with pstats/snakeviz).
+
+    Args:
+        path (str or Path, optional): Path of the *.prof file
+    """
+    global PROFILER
+    if PROFILER is not None:
+        PROFILER.disable()
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            PROFILER.dump_stats(str(path))
+            info_msg(f"profile written to {path}")
+        PROFILER = None
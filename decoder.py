@@ -5,6 +5,7 @@
 #
 """
 import uuid
+import functools
 
 #   ULTRA JSON
 #   More performance de- and encoding
@@ -84,9 +85,9 @@ class UIDDecoder(JSONDecoder):
         if "UID" in dct:
             args = {
                 "class_name": dct["class_name"],
-                "uid": uuid.UUID(dct["uid"]),
-                "created_date": datetime.fromisoformat(dct["created_date"]),
-                "edited_date": datetime.fromisoformat(dct["edited_date"])
+                "uid": parse_uuid(dct["uid"]),
+                "created_date": parse_datetime(dct["created_date"]),
+                "edited_date": parse_datetime(dct["edited_date"])
                 if dct["edited_date"]
                 else None,
             }
@@ -112,29 +113,25 @@ class ProjectDecoder(JSONDecoder):
         """
         if "Project" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "config": dct["config"],
                 "identifier": dct["identifier"],
                 "construction_scheme": dct["construction_scheme"],
-                "address": AddressDecoder().object_hook(dct["address"])
+                "address": decode("Address", dct["address"])
                 if dct["address"]
                 else None,
-                "client": PersonDecoder().object_hook(dct["client"])
-                if dct["client"]
-                else None,
-                "project_data": ProjectDataDecoder().object_hook(dct["project_data"])
+                "client": decode("Person", dct["client"]) if dct["client"] else None,
+                "project_data": decode("ProjectData", dct["project_data"])
                 if dct["project_data"]
                 else None,
-                "commissioned_date": QDate.fromString(dct["commissioned_date"])
+                "commissioned_date": decode_date(dct["commissioned_date"])
                 if dct["commissioned_date"]
                 else None,
-                "planning_finished_date": QDate.fromString(
-                    dct["planning_finished_date"]
-                )
+                "planning_finished_date": decode_date(dct["planning_finished_date"])
                 if dct["planning_finished_date"]
                 else None,
-                "billed_date": QDate.fromString(dct["billed_date"])
+                "billed_date": decode_date(dct["billed_date"])
                 if dct["billed_date"]
                 else None,
                 "planning_status": dct["planning_status"],
@@ -161,7 +158,7 @@ class ProjectDataDecoder(JSONDecoder):
         """
         if "ProjectData" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "commissioned_services": dct["commissioned_services"],
                 "property_size": dct["property_size"],
@@ -175,8 +172,8 @@ class ProjectDataDecoder(JSONDecoder):
                 "production_costs": dct["production_costs"],
                 "contract_fee": dct["contract_fee"],
                 "execution_period": (
-                    QDate.fromString(dct["execution_period"][0]),
-                    QDate.fromString(dct["execution_period"][1]),
+                    decode_date(dct["execution_period"][0]),
+                    decode_date(dct["execution_period"][1]),
                 )
                 if dct["execution_period"]
                 else None,
@@ -203,14 +200,13 @@ class ProjectCostCalculationDecoder(JSONDecoder):
         """
         if "ProjectCostCalculation" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "name": dct["name"],
                 "type": dct["type"] if "type" in dct else None,
-                "date": QDate.fromString(dct["date"]),
+                "date": decode_date(dct["date"]),
                 "inventory": [
-                    InventoryItemDecoder().object_hook(item)
-                    for item in dct["inventory"]
+                    decode("InventoryItem", item) for item in dct["inventory"]
                 ],
             }
             return proj.ProjectCostCalculation(**args)
@@ -235,7 +231,7 @@ class InventoryItemDecoder(JSONDecoder):
         """
         if "InventoryItem" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "name": dct["name"],
                 "description": dct["description"],
@@ -246,13 +242,13 @@ class InventoryItemDecoder(JSONDecoder):
                 "unit_type": dct["unit_type"],
                 "is_active": dct["is_active"],
                 "cost_group_ref": {
-                    "uid": UIDDecoder().object_hook(dct["cost_group_ref"]["uid"]),
+                    "uid": decode("UID", dct["cost_group_ref"]["uid"]),
                     "id": dct["cost_group_ref"]["id"],
                 }
                 if dct["cost_group_ref"]
                 else None,
                 "trade_ref": {
-                    "uid": UIDDecoder().object_hook(dct["trade_ref"]["uid"]),
+                    "uid": decode("UID", dct["trade_ref"]["uid"]),
                     "name": dct["trade_ref"]["name"],
                 }
                 if dct["trade_ref"]
@@ -280,13 +276,13 @@ class CompanyDecoder(JSONDecoder):
         """
         if "Company" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "name": dct["name"],
                 "service": dct["service"],
                 "service_type": dct["service_type"],
                 "budget": dct["budget"],
-                "contact_person": PersonDecoder().object_hook(dct["contact_person"])
+                "contact_person": decode("Person", dct["contact_person"])
                 if dct["contact_person"]
                 else None,
             }
@@ -312,7 +308,7 @@ class TradeDecoder(JSONDecoder):
         """
         if "Trade" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "name": dct["name"],
                 "budget": dct["budget"],
@@ -340,14 +336,14 @@ class CostGroupDecoder(JSONDecoder):
         """
         if "CostGroup" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "id": dct["id"],
                 "name": dct["name"],
                 "description": dct["description"],
                 "budget": dct["budget"],
                 "parent_ref": {
-                    "uid": UIDDecoder().object_hook(dct["parent_ref"]["uid"]),
+                    "uid": decode("UID", dct["parent_ref"]["uid"]),
                     "id": dct["parent_ref"]["id"],
                 }
                 if dct["parent_ref"]
@@ -375,11 +371,11 @@ class PersonDecoder(JSONDecoder):
         """
         if "Person" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "first_name": dct["first_name"],
                 "last_name": dct["last_name"],
-                "address": AddressDecoder().object_hook(dct["address"])
+                "address": decode("Address", dct["address"])
                 if dct["address"]
                 else None,
                 "telephone": dct["telephone"],
@@ -387,7 +383,7 @@ class PersonDecoder(JSONDecoder):
                 "mobile": dct["mobile"],
                 "email": dct["email"],
                 "company_ref": {
-                    "uid": UIDDecoder().object_hook(dct["company_ref"]["uid"]),
+                    "uid": decode("UID", dct["company_ref"]["uid"]),
                     "name": dct["company_ref"]["name"],
                 }
                 if dct["company_ref"]
@@ -415,7 +411,7 @@ class AddressDecoder(JSONDecoder):
         """
         if "Address" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "street": dct["street"],
                 "house_number": dct["house_number"],
@@ -446,11 +442,11 @@ class JobDecoder(JSONDecoder):
         """
         if "Job" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "id": dct["id"],
                 "company_ref": {
-                    "uid": UIDDecoder().object_hook(dct["company_ref"]["uid"]),
+                    "uid": decode("UID", dct["company_ref"]["uid"]),
                     "name": dct["company_ref"]["name"],
                 }
                 if dct["company_ref"]
@@ -479,31 +475,31 @@ class ArchJobDecoder(JSONDecoder):
         """
         if "ArchJob" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "id": dct["id"],
                 "company_ref": {
-                    "uid": UIDDecoder().object_hook(dct["company_ref"]["uid"]),
+                    "uid": decode("UID", dct["company_ref"]["uid"]),
                     "name": dct["company_ref"]["name"],
                 }
                 if dct["company_ref"]
                 else None,
                 "job_sum": dct["job_sum"],
                 "trade_ref": {
-                    "uid": UIDDecoder().object_hook(dct["trade_ref"]["uid"]),
+                    "uid": decode("UID", dct["trade_ref"]["uid"]),
                     "name": dct["trade_ref"]["name"],
                 }
                 if dct["trade_ref"]
                 else None,
                 "cost_group_ref": {
-                    "uid": UIDDecoder().object_hook(dct["cost_group_ref"]["uid"]),
+                    "uid": decode("UID", dct["cost_group_ref"]["uid"]),
                     "id": dct["cost_group_ref"]["id"],
                 }
                 if "cost_group_ref" in dct.keys() and dct["cost_group_ref"]
                 else None,
                 "job_additions": [
                     {
-                        "date": QDate.fromString(job_addition["date"]),
+                        "date": decode_date(job_addition["date"]),
                         "name": job_addition["name"],
                         "amount": job_addition["amount"],
                         "comment": job_addition["comment"],
@@ -512,7 +508,7 @@ class ArchJobDecoder(JSONDecoder):
                 ],
                 "paid_safety_deposits": [
                     {
-                        "date": QDate.fromString(psd["date"]),
+                        "date": decode_date(psd["date"]),
                         "amount": psd["amount"],
                         "comment": psd["comment"],
                     }
@@ -541,30 +537,30 @@ class InvoiceDecoder(JSONDecoder):
         """
         if "Invoice" in dct:
             args = {
-                "uid": UIDDecoder().object_hook(dct["uid"]),
+                "uid": decode("UID", dct["uid"]),
                 "deleted": dct["deleted"],
                 "id": dct["id"],
                 "company_ref": {
-                    "uid": UIDDecoder().object_hook(dct["company_ref"]["uid"]),
+                    "uid": decode("UID", dct["company_ref"]["uid"]),
                     "name": dct["company_ref"]["name"],
                 }
                 if dct["company_ref"]
                 else None,
                 "job_ref": {
-                    "uid": UIDDecoder().object_hook(dct["job_ref"]["uid"]),
+                    "uid": decode("UID", dct["job_ref"]["uid"]),
                     "id": dct["job_ref"]["id"],
                     "company.name": dct["job_ref"]["company.name"],
                 }
                 if dct["job_ref"]
                 else None,
                 "cumulative": dct["cumulative"],
-                "invoice_date": QDate.fromString(dct["invoice_date"])
+                "invoice_date": decode_date(dct["invoice_date"])
                 if dct["invoice_date"]
                 else None,
-                "inbox_date": QDate.fromString(dct["inbox_date"])
+                "inbox_date": decode_date(dct["inbox_date"])
                 if dct["inbox_date"]
                 else None,
-                "checked_date": QDate.fromString(dct["checked_date"])
+                "checked_date": decode_date(dct["checked_date"])
                 if dct["checked_date"]
                 else None,
                 "amount": dct["amount"],
@@ -574,7 +570,7 @@ class InvoiceDecoder(JSONDecoder):
                 "reduction_usage_costs": dct["reduction_usage_costs"],
                 "reduce_prev_invoices": dct["reduce_prev_invoices"],
                 "prev_invoices_uids": [
-                    UIDDecoder().object_hook(uid) for uid in dct["prev_invoices_uids"]
+                    decode("UID", uid) for uid in dct["prev_invoices_uids"]
                 ]
                 if dct["prev_invoices_uids"]
                 else None,
@@ -585,12 +581,126 @@ class InvoiceDecoder(JSONDecoder):
                 if dct["safety_deposit_amount"]
                 else None,
                 "discount": dct["discount"],
-                "due_date": QDate.fromString(dct["due_date"])
-                if dct["due_date"]
-                else None,
-                "due_date_discount": QDate.fromString(dct["due_date_discount"])
+                "due_date": decode_date(dct["due_date"]) if dct["due_date"] else None,
+                "due_date_discount": decode_date(dct["due_date_discount"])
                 if dct["due_date_discount"]
                 else None,
             }
             return corp.Invoice(**args)
         return dct
+
+
+"""
+#
+#   SINGLE-PASS DECODING
+#   The JSON is parsed without an object_hook and decoded top-down: every object
+#   carries its class name as a type tag (the first key, see: encoder.py), which
+#   picks the decoder. The decoders are shared instead of created for every
+#   nested object.
+#
+"""
+
+#   type tag -> shared decoder
+DECODERS = {
+    "UID": UIDDecoder(),
+    "Project": ProjectDecoder(),
+    "ProjectData": ProjectDataDecoder(),
+    "ProjectCostCalculation": ProjectCostCalculationDecoder(),
+    "InventoryItem": InventoryItemDecoder(),
+    "Company": CompanyDecoder(),
+    "Trade": TradeDecoder(),
+    "CostGroup": CostGroupDecoder(),
+    "Person": PersonDecoder(),
+    "Address": AddressDecoder(),
+    "Job": JobDecoder(),
+    "ArchJob": ArchJobDecoder(),
+    "Invoice": InvoiceDecoder(),
+}
+
+
+def get_type_tag(dct):
+    """Return the type tag of a JSON-encoded object.
+
+    Args:
+        dct (dict): JSON formatted input
+
+    Returns:
+        str: Type tag (key of DECODERS) or None, if it is no encoded object
+    """
+    tag = next(iter(dct), None)
+    if tag in DECODERS:
+        return tag
+    #   older or hand-edited files might not have the tag as first key
+    return next((key for key in dct if key in DECODERS), None)
+
+
+def decode(type_tag, dct):
+    """Decode a JSON-encoded object with the shared decoder of the type.
+
+    Args:
+        type_tag (str): Type tag (key of DECODERS), None to read it from dct
+        dct (dict): JSON formatted input
+
+    Returns:
+        Restored object (or dct, if it is no encoded object)
+    """
+    type_tag = type_tag if type_tag else get_type_tag(dct)
+    if type_tag is None:
+        return dct
+    return DECODERS[type_tag].dict_to_object(dct)
+
+
+#   The same uids are referenced over and over again (refs, prev invoices) and a
+#   project contains the same dates many times. The parsed values are immutable
+#   and can be shared, only QDate is copied.
+@functools.lru_cache(maxsize=65536)
+def parse_uuid(uuid_string):
+    return uuid.UUID(uuid_string)
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_datetime(datetime_string):
+    return datetime.fromisoformat(datetime_string)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(date_string):
+    return QDate.fromString(date_string)
+
+
+def decode_date(date_string):
+    """Decode a date.
+
+    Args:
+        date_string (str): Date as written by QDate.toString()
+
+    Returns:
+        QDate: Decoded date (a copy, QDate is mutable)
+    """
+    return QDate(parse_date(date_string))
+
+
+def load(file):
+    """Parse a JSON file and decode the objects in it.
+
+    Args:
+        file (file): Opened file containing an encoded object or a list of them
+
+    Returns:
+        Restored object or list of restored objects
+    """
+    return decode_data(json.load(file))
+
+
+def parse(s):
+    """Parse JSON (str or bytes) with the fastest installed JSON library."""
+    return json.loads(s)
+
+
+def decode_data(data):
+    """Decode the parsed JSON of a file, an encoded object or a list of them."""
+    if isinstance(data, list):
+        return [decode(None, dct) if isinstance(dct, dict) else dct for dct in data]
+    if isinstance(data, dict):
+        return decode(None, data)
+    return data
@@ -0,0 +1,56 @@
+"""
+#
+#   FORMATR
+#   Strings of dates, e.g. for the names of the exported files and the dates
+#   in the templates. No Qt imports, so the worker processes of the batch
+#   export can use it (see: batchr.py).
+#
+"""
+import datetime
+
+
+"""
+#   QDate to String
+"""
+
+
+def qdate_to_str(qdate, format="%d.%m.%Y"):
+    """Convert a QDate to a datetime.Date.
+
+    Args:
+        qdate (QDate): Date to convert
+        format (str, optional): format of the target date
+
+    Returns:
+        datetime.Date: Converted date
+    """
+    return qdate.toPyDate().strftime(format)
+
+
+"""
+#   datetime.now() string
+"""
+
+
+def now_str(format="%Y-%m-%d_%H%M%S"):
+    """Get a string of the current timestamp.
+
+    Args:
+        format (str, optional): Format of the string
+
+    Returns:
+        str: String of the timestamp
+    """
+    return datetime.datetime.now().strftime(format)
+
+
+def today_str(format="%Y-%m-%d"):
+    """Get a string of the current date.
+
+    Args:
+        format (str, optional): Format of the string
+
+    Returns:
+        str: String of the date today
+    """
+    return datetime.datetime.today().strftime(format)
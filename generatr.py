@@ -0,0 +1,416 @@
+"""
+#
+#   GENERATR
+#   Generate random projects of configurable size without the GUI.
+#   With a seed, the same sizes always give the same project (apart from
+#   UIDs and dates created), so benchmarks can be compared across versions.
+#   Used by the debug buttons of the main window and by benchmark.py.
+#
+"""
+import debug
+
+import string
+import random
+import datetime
+from PyQt5.QtCore import QDate
+
+from core.obj import proj, corp, arch
+
+#   Sizes of a generated project (number of objects)
+DEFAULT_SIZES = {
+    "companies": 50,
+    "trades": 30,
+    "cost_groups": 500,
+    "jobs": 1000,
+    "invoices": 10000,
+    "psds": 2000,
+    "job_additions": 2000,
+    "pccs": 100,
+    "inventory_items": 10000,
+}
+
+#   Presets for the benchmarks (see: benchmark.py)
+SIZE_PRESETS = {
+    "small": {
+        "companies": 10,
+        "trades": 10,
+        "cost_groups": 50,
+        "jobs": 50,
+        "invoices": 500,
+        "psds": 100,
+        "job_additions": 100,
+        "pccs": 5,
+        "inventory_items": 500,
+    },
+    "medium": {
+        "companies": 25,
+        "trades": 20,
+        "cost_groups": 200,
+        "jobs": 300,
+        "invoices": 3000,
+        "psds": 600,
+        "job_additions": 600,
+        "pccs": 30,
+        "inventory_items": 3000,
+    },
+    "large": DEFAULT_SIZES,
+}
+
+#   First day of the generated invoices, payments, ...
+START_DATE = QDate(2018, 1, 1)
+#   Number of days after START_DATE, the generated dates are spread over
+DATE_RANGE_DAYS = 5 * 365
+
+
+def rnd(amount):
+    """Round a number to two decimals."""
+    return round(amount, 2)
+
+
+def get_project_config():
+    """Return a project config for generated projects.
+
+    Same structure as core.api.AppData.get_init_proj_config().
+    """
+    return {
+        "currency": "€",
+        "default_vat": corp.DEFAULT_VAT,
+        "user_save": {"datetime": None, "path": None},
+        "last_auto_save": {"datetime": None, "path": None},
+    }
+
+
+@debug.log
+@debug.timed()
+def generate_project(seed=0, config=None, **sizes):
+    """Generate a project with random companies, jobs, invoices, ...
+
+    Usage:
+        project = generatr.generate_project(seed=1, invoices=20000)
+
+    Args:
+        seed (int, optional): Seed of the random generator
+        config (dict, optional): Project config (default: get_project_config())
+        **sizes: Number of objects, overriding DEFAULT_SIZES (e.g. jobs=1000)
+
+    Returns:
+        proj.Project: Generated project
+    """
+    sizes = {**DEFAULT_SIZES, **sizes}
+    project = proj.Project(
+        identifier=f"generated-{seed}",
+        config=config if config is not None else get_project_config(),
+        construction_scheme="Generated project",
+    )
+    generator = ProjectGenerator(project, seed=seed)
+    project.address = generator.random_address()
+    project.client = generator.random_person()
+    generator.add_cost_groups(sizes["cost_groups"])
+    generator.add_trades(sizes["trades"])
+    generator.add_companies(sizes["companies"])
+    generator.add_contact_people()
+    generator.add_jobs(sizes["jobs"])
+    generator.add_invoices(sizes["invoices"])
+    generator.add_psds(sizes["psds"])
+    generator.add_job_additions(sizes["job_additions"])
+    generator.add_cost_calculations(sizes["pccs"], sizes["inventory_items"])
+    #   last, so the objects above stay the same as in earlier versions
+    project.project_data = generator.random_project_data()
+    return project
+
+
+class ProjectGenerator:
+
+    """Adds random objects to a project.
+
+    Attributes:
+        project (proj.Project): Project to add the objects to
+        random (random.Random): Random generator, seeded if a seed is given
+    """
+
+    def __init__(self, project, seed=None):
+        """Initialize ProjectGenerator.
+
+        Args:
+            project (proj.Project): Project to add the objects to
+            seed (int, optional): Seed of the random generator
+        """
+        self.project = project
+        self.random = random.Random(seed)
+
+    """
+    #
+    #   RANDOM VALUES
+    #
+    #
+    """
+
+    def id_generator(
+        self,
+        size=10,
+        chars=string.ascii_lowercase + string.ascii_uppercase + string.digits,
+    ):
+        """Return a random string of the given size."""
+        return "".join(self.random.choice(chars) for _ in range(size))
+
+    def name_generator(self, size=10):
+        """Return a random capitalized name of the given size."""
+        return self.id_generator(
+            size=1, chars=string.ascii_uppercase
+        ) + self.id_generator(size=size - 1, chars=string.ascii_lowercase)
+
+    def random_date(self):
+        """Return a random date within the date range of the project."""
+        return START_DATE.addDays(self.random.randint(0, DATE_RANGE_DAYS))
+
+    def random_address(self):
+        """Return a random corp.Address."""
+        return corp.Address(
+            street=self.name_generator(13),
+            house_number=self.random.randint(1, 200),
+            city=self.name_generator(6),
+            state=self.name_generator(9),
+            zipcode=self.id_generator(size=5, chars=string.digits),
+            country=self.name_generator(9),
+        )
+
+    def random_person(self, company=None):
+        """Return a random corp.Person."""
+        return corp.Person(
+            first_name=self.name_generator(self.random.randint(2, 10)),
+            last_name=self.name_generator(self.random.randint(2, 10)),
+            address=self.random_address(),
+            telephone=self.id_generator(size=8, chars=string.digits),
+            mobile=self.id_generator(size=10, chars=string.digits),
+            fax=self.id_generator(size=8, chars=string.digits),
+            email=f"{self.id_generator(9)}@example.com",
+            company=company,
+        )
+
+    def random_project_data(self):
+        """Return a random proj.ProjectData."""
+        start_date = self.random_date()
+        usable_floor_space_nuf = rnd(self.random.uniform(500, 20000))
+        return proj.ProjectData(
+            commissioned_services="LPH 1-9",
+            property_size=rnd(self.random.uniform(1000, 50000)),
+            usable_floor_space_nuf=usable_floor_space_nuf,
+            usable_floor_space_bgf=rnd(usable_floor_space_nuf * 1.25),
+            rental_space=rnd(usable_floor_space_nuf * 0.9),
+            building_class=self.random.choice(["GK 1a", "GK 1b", "GK 2", "GK 3"]),
+            construction_costs_kg300_400=rnd(self.random.uniform(1e6, 5e7)),
+            production_costs=rnd(self.random.uniform(1e6, 6e7)),
+            contract_fee=rnd(self.random.uniform(1e5, 5e6)),
+            execution_period=(start_date, start_date.addDays(2 * 365)),
+        )
+
+    def random_inventory_item(self, trades=None, cost_groups=None):
+        """Return a random proj.InventoryItem of a random trade and cost group.
+
+        Args:
+            trades (list, optional): Trades to choose from, default: project.trades
+            cost_groups (list, optional): Cost groups to choose from,
+                                          default: project.cost_groups
+        """
+        if trades is None:
+            trades = self.project.trades
+        if cost_groups is None:
+            cost_groups = self.project.cost_groups
+        return proj.InventoryItem(
+            name=self.id_generator(self.random.randint(1, 10)),
+            description=self.id_generator(self.random.randint(0, 350)),
+            unit_price=rnd(self.random.random() * 15),
+            units=self.random.randint(1, 1500),
+            unit_type=self.random.choice(proj.InventoryItem.DEFAULT_UNIT_TYPES),
+            is_active=bool(self.random.getrandbits(1)),
+            trade=self.random.choice(trades),
+            cost_group=self.random.choice(cost_groups),
+        )
+
+    """
+    #
+    #   ADD OBJECTS
+    #
+    #
+    """
+
+    @debug.log
+    def add_cost_groups(self, number_of_cost_groups):
+        """Add a tree of cost groups, i.e. 100, 110, 111, ..., 900, 910, ...
+
+        Main groups come first, then their children level by level.
+        """
+        new_cost_groups = list()
+        parents = [None]
+        while len(new_cost_groups) < number_of_cost_groups and parents:
+            children = list()
+            for parent in parents:
+                for k in range(1, 10):
+                    if len(new_cost_groups) + len(children) >= number_of_cost_groups:
+                        break
+                    children.append(
+                        arch.CostGroup(
+                            self.get_child_cost_group_id(parent, k),
+                            name=self.name_generator(self.random.randint(4, 15)),
+                            description=self.id_generator(self.random.randint(0, 50)),
+                            budget=rnd(self.random.random() * 500000),
+                            parent=parent,
+                        )
+                    )
+            new_cost_groups.extend(children)
+            parents = children
+        for cost_group in new_cost_groups:
+            self.project.add_cost_group(cost_group)
+        return new_cost_groups
+
+    def get_child_cost_group_id(self, parent, k):
+        """Return the id of the k-th child of parent (k in 1..9)."""
+        if parent is None:
+            return f"{k}00"
+        if len(parent.id) == 3 and parent.id.endswith("00"):
+            return f"{parent.id[0]}{k}0"
+        if len(parent.id) == 3 and parent.id.endswith("0"):
+            return f"{parent.id[:2]}{k}"
+        return f"{parent.id}.{k}"
+
+    @debug.log
+    def add_trades(self, number_of_trades):
+        new_trades = list()
+        cost_groups = self.project.cost_groups
+        for i in range(number_of_trades):
+            trade = arch.Trade(
+                name=f"{self.name_generator(self.random.randint(4, 15))} {i+1}",
+                budget=rnd(self.random.random() * 500000),
+                comment=self.id_generator(self.random.randint(0, 50)),
+                cost_group=self.random.choice(cost_groups + [None]),
+            )
+            self.project.add_trade(trade)
+            new_trades.append(trade)
+        return new_trades
+
+    @debug.log
+    def add_companies(self, number_of_companies):
+        new_companies = list()
+        for i in range(number_of_companies):
+            company = corp.Company(
+                name=f"{self.name_generator(self.random.randint(4, 15))} {i+1}",
+                service=self.name_generator(self.random.randint(4, 15)),
+                service_type=self.name_generator(self.random.randint(4, 15)),
+                budget=rnd(self.random.random() * 500000),
+            )
+            self.project.add_company(company)
+            new_companies.append(company)
+        return new_companies
+
+    @debug.log
+    def add_contact_people(self):
+        """Add a contact person to every company without one."""
+        for company in self.project.companies:
+            if company.contact_person is None:
+                company.add_contact_person(self.random_person())
+
+    @debug.log
+    def add_jobs(self, number_of_jobs):
+        new_jobs = list()
+        companies = self.project.companies
+        trades = self.project.trades
+        cost_groups = self.project.cost_groups
+        for i in range(number_of_jobs):
+            company = self.random.choice(companies)
+            job = arch.ArchJob(
+                id=self.project.get_max_job_number(company) + 1,
+                company=company,
+                trade=self.random.choice(trades),
+                cost_group=self.random.choice(cost_groups),
+                job_sum=rnd(self.random.random() * 150000),
+            )
+            self.project.add_job(job)
+            new_jobs.append(job)
+        return new_jobs
+
+    @debug.log
+    def add_invoices(self, number_of_invoices):
+        new_invoices = list()
+        jobs = self.project.jobs
+        for i in range(number_of_invoices):
+            job = self.random.choice(jobs)
+            company = job.company
+            cumulative = bool(self.random.getrandbits(1))
+            w_discount = bool(self.random.getrandbits(1))
+            invoice_date = self.random_date()
+            amount = rnd(self.random.random() * 100000)
+            if cumulative:
+                prev_invoices = self.project.get_prev_invoices(
+                    company=company,
+                    job=job,
+                    invoice_date=invoice_date,
+                    invoice_created_date=datetime.datetime.now(),
+                )
+                if prev_invoices:
+                    amount += prev_invoices[-1].amount
+            invoice_args = {
+                "id": self.id_generator(self.random.randint(5, 15)),
+                "job": job,
+                "cumulative": cumulative,
+                "company": company,
+                "invoice_date": invoice_date,
+                "inbox_date": invoice_date.addDays(self.random.randint(0, 5)),
+                "checked_date": invoice_date.addDays(self.random.randint(5, 15)),
+                "amount": amount,
+                "verified_amount": amount
+                + rnd(self.random.random() * 100)
+                - rnd(self.random.random() * 100),
+                "rebate": rnd(self.random.random() * 0.15),
+                "safety_deposit": rnd(self.random.random() * 0.05),
+                "discount": rnd(self.random.random() * 0.05) if w_discount else 0,
+                "due_date": invoice_date.addDays(30),
+                "due_date_discount": invoice_date.addDays(14) if w_discount else None,
+            }
+            new_invoices.append(self.project.input_new_invoice(invoice_args))
+        return new_invoices
+
+    @debug.log
+    def add_psds(self, number_of_psds):
+        """Add paid safety deposits to random jobs."""
+        jobs = self.project.jobs
+        for i in range(number_of_psds):
+            job = self.random.choice(jobs)
+            job.pay_safety_deposit(
+                self.random_date(),
+                rnd(self.random.random() * 500),
+                self.id_generator(self.random.randint(0, 350)),
+            )
+            self.project.refresh_job(job)
+
+    @debug.log
+    def add_job_additions(self, number_of_job_additions):
+        """Add job additions to random jobs."""
+        jobs = self.project.jobs
+        for i in range(number_of_job_additions):
+            job = self.random.choice(jobs)
+            job.add_job_addition(
+                self.random_date(),
+                self.id_generator(self.random.randint(0, 15)),
+                rnd(self.random.random() * 100000),
+                self.id_generator(self.random.randint(0, 350)),
+            )
+            self.project.refresh_job(job)
+
+    @debug.log
+    def add_cost_calculations(self, number_of_pccs, number_of_inventory_items):
+        """Add project cost calculations, sharing the inventory items between them."""
+        new_pccs = list()
+        for i in range(number_of_pccs):
+            pcc = proj.ProjectCostCalculation(
+                name=self.id_generator(self.random.randint(1, 12)),
+                type=self.random.choice(proj.ProjectCostCalculation.PCC_TYPES),
+                date=self.random_date(),
+            )
+            self.project.add_pcc(pcc)
+            new_pccs.append(pcc)
+        trades = self.project.trades
+        cost_groups = self.project.cost_groups
+        for i in range(number_of_inventory_items if new_pccs else 0):
+            pcc = new_pccs[i % len(new_pccs)]
+            pcc.add_inventory_item(self.random_inventory_item(trades, cost_groups))
+        return new_pccs
@@ -0,0 +1,287 @@
+"""
+#
+#   JOURNALR
+#   Append-only journal of the objects edited since the last full autosave
+#   (checkpoint), so an autosave only writes what has changed.
+#
+#   The journal of a checkpoint is written next to it: <checkpoint>.journal
+#   File layout (all integers little-endian):
+#       header:     MAGIC, format version (H), codec (B)
+#       entry:      payload length (Q), payload
+#   The payload of an entry is a dict with the datetime of the autosave and the
+#   encoded edited objects per member (see: packr.py).
+#   Loading a checkpoint replays its journal, compact() folds it back into the
+#   checkpoint.
+#
+"""
+import debug
+
+import copy
+import struct
+from pathlib import Path
+
+import zipr, packr, encoder
+
+MAGIC = b"SYPJRNL\x00"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sHB")
+ENTRY = struct.Struct("<Q")
+
+#   Members written with their deleted objects (see: zipr.MEMBERS), the
+#   deleted objects of the other members are removed when replaying
+MEMBERS_WITH_DELETED = ["invoices"]
+
+
+def get_journal_path(checkpoint_path):
+    """Return the path of the journal of a checkpoint."""
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(checkpoint_path.name + ".journal")
+
+
+"""
+#
+#   EDITED OBJECTS
+#
+"""
+
+
+def get_objects(project):
+    """Return the objects of the list members incl. the deleted ones.
+
+    Args:
+        project (proj.Project): Project
+
+    Returns:
+        dict: Member name -> list of objects
+    """
+    return {
+        "project_cost_calculations": project._project_cost_calculations,
+        "companies": project._companies,
+        "trades": project._trades,
+        "invoices": project._invoices,
+        "jobs": project._jobs,
+        "cost_groups": project._cost_groups,
+    }
+
+
+def get_nested_objects(o):
+    """Return the objects, that are encoded as part of the object."""
+    nested_objects = list()
+    if getattr(o, "contact_person", None):
+        nested_objects.append(o.contact_person)
+    #   incl. the deleted items, deleting an item changes the cost calculation
+    nested_objects += getattr(o, "_inventory", list())
+    return nested_objects
+
+
+def is_edited_since(o, since):
+    """Check whether the object (or an object encoded with it) has been created
+    or edited since the datetime.
+
+    Args:
+        o (uid.IdObject): Object
+        since (datetime): Datetime of the last autosave
+
+    Returns:
+        bool: True, if it has to be written to the journal
+    """
+    for obj in [o] + get_nested_objects(o):
+        uid = obj.uid
+        if uid.created_date >= since:
+            return True
+        if uid.edited_date and uid.edited_date >= since:
+            return True
+    return False
+
+
+@debug.log
+@debug.timed()
+def encode_changes(project, since):
+    """Encode the objects edited since the last autosave.
+
+    The small members (project and project config) are always written.
+
+    Args:
+        project (proj.Project): Project
+        since (datetime): Datetime of the last autosave
+
+    Returns:
+        dict: Member name -> encoded data (list members: the edited objects)
+    """
+    members = {
+        "project_config": copy.deepcopy(project.config),
+        "project": copy.deepcopy(encoder.ProjectEncoder().default(project)),
+    }
+    for name, objects in get_objects(project).items():
+        encoder_instance = zipr.MEMBERS[name].encoder()
+        members[name] = [
+            encoder_instance.default(o) for o in objects if is_edited_since(o, since)
+        ]
+    debug.count("journal.objects", sum(len(data) for data in members.values()))
+    return members
+
+
+"""
+#
+#   READ AND WRITE
+#
+"""
+
+
+@debug.log
+def append_entry(journal_path, members, datetime_str, codec=None):
+    """Append the encoded edited objects to the journal.
+
+    Args:
+        journal_path (Path): Path to the journal (created, if non-existing)
+        members (dict): Member name -> encoded data (see: encode_changes)
+        datetime_str (str): Datetime of the autosave
+        codec (int, optional): Codec of a new journal (default: msgpack)
+    """
+    journal_path = Path(journal_path)
+    if journal_path.is_file():
+        with open(journal_path, "rb") as file:
+            _, _, codec = read_header(file, journal_path)
+    else:
+        codec = packr.get_default_codec() if codec is None else codec
+        with open(journal_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, codec))
+    payload = packr.pack({"datetime": datetime_str, "members": members}, codec)
+    with open(journal_path, "ab") as file:
+        file.write(ENTRY.pack(len(payload)) + payload)
+
+
+def read_header(file, journal_path):
+    magic, version, codec = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise Exception(f"{journal_path} is not a journal.")
+    if version > FORMAT_VERSION:
+        raise Exception(
+            f"{journal_path} has the format version {version}, "
+            f"this version of the app can only open up to {FORMAT_VERSION}."
+        )
+    return magic, version, codec
+
+
+@debug.log
+def read_entries(journal_path):
+    """Read the entries of a journal.
+
+    An incomplete last entry (e.g. the app crashed while writing) is skipped.
+
+    Args:
+        journal_path (Path): Path to the journal
+
+    Returns:
+        list: Entries as dicts with "datetime" and "members"
+    """
+    entries = list()
+    with open(journal_path, "rb") as file:
+        _, _, codec = read_header(file, journal_path)
+        while True:
+            entry_header = file.read(ENTRY.size)
+            if not entry_header:
+                break
+            length = None
+            if len(entry_header) == ENTRY.size:
+                (length,) = ENTRY.unpack(entry_header)
+                payload = file.read(length)
+            if length is None or len(payload) < length:
+                debug.warning_msg(f"{journal_path}: skipping incomplete entry")
+                break
+            entries.append(packr.unpack(payload, codec))
+    return entries
+
+
+"""
+#
+#   REPLAY AND COMPACT
+#
+"""
+
+
+def replay(members, entries):
+    """Apply the journal entries to the members of a checkpoint (in place).
+
+    Args:
+        members (dict): Member name -> encoded data of the checkpoint
+        entries (list): Entries of the journal (see: read_entries)
+
+    Returns:
+        dict: The updated members
+    """
+    for entry in entries:
+        for name, data in entry["members"].items():
+            if not isinstance(members.get(name), list):
+                members[name] = data
+                continue
+            index = {dct["uid"]["uid"]: i for i, dct in enumerate(members[name])}
+            removed = set()
+            for dct in data:
+                i = index.get(dct["uid"]["uid"])
+                if dct["deleted"] and name not in MEMBERS_WITH_DELETED:
+                    if i is not None:
+                        removed.add(i)
+                elif i is not None:
+                    members[name][i] = dct
+                else:
+                    index[dct["uid"]["uid"]] = len(members[name])
+                    members[name].append(dct)
+            if removed:
+                members[name] = [
+                    dct for i, dct in enumerate(members[name]) if i not in removed
+                ]
+    return members
+
+
+@debug.log
+@debug.timed()
+def open_project(checkpoint_path):
+    """Open a checkpoint and replay its journal.
+
+    Args:
+        checkpoint_path (Path): Path to the checkpoint (zipped JSON or binary)
+
+    Returns:
+        dict: Project as a dict (same as zipr.open_project)
+    """
+    return packr.decode_members(read_project_members(checkpoint_path))
+
+
+def read_project_members(checkpoint_path):
+    """Read the encoded data of the members of a checkpoint and replay its journal.
+
+    Args:
+        checkpoint_path (Path): Path to the checkpoint (zipped JSON or binary)
+
+    Returns:
+        dict: Member name -> encoded data
+    """
+    members = packr.read_project_members(checkpoint_path)
+    journal_path = get_journal_path(checkpoint_path)
+    if journal_path.is_file():
+        replay(members, read_entries(journal_path))
+    return members
+
+
+@debug.log
+@debug.timed()
+def compact(checkpoint_path):
+    """Fold the journal back into its checkpoint and delete the journal.
+
+    The checkpoint keeps its format.
+
+    Args:
+        checkpoint_path (Path): Path to the checkpoint
+    """
+    journal_path = get_journal_path(checkpoint_path)
+    if not journal_path.is_file():
+        return
+    members = packr.read_project_members(checkpoint_path)
+    replay(members, read_entries(journal_path))
+    if packr.is_packed_project(checkpoint_path):
+        packr.write_members(checkpoint_path, members)
+    else:
+        packr.write_zip_members(checkpoint_path, members)
+    journal_path.unlink()
@@ -12,12 +12,15 @@ import debug
 import sys
 import os
 import traceback
+import multiprocessing
 import logging
 import logging.config
 import logging.handlers
 
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt5 import QtWidgets
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 
 from ui import mainwindow
 
@@ -25,11 +28,55 @@ APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
 from core import api
 
 
+class AutosaveWorker(QObject):
+    """Encode and write autosave snapshots on a worker thread.
+
+    The signals are emitted from the worker thread and delivered on the GUI
+    thread (queued connection).
+
+    Attributes:
+        app_data (api.AppData): Application data writing the autosave
+        executor (ThreadPoolExecutor): Single worker thread, so autosaves don't overlap
+        finished (pyqtSignal): Emitted with the snapshot after it has been written
+        failed (pyqtSignal): Emitted with the traceback, if writing failed
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, app_data):
+        super(AutosaveWorker, self).__init__()
+        self.app_data = app_data
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+
+    def is_busy(self):
+        """Check whether an autosave is still being written."""
+        return self._future is not None and not self._future.done()
+
+    def write(self, autosave):
+        """Write the snapshot in the background (see: AppData.write_autosave)."""
+        self._future = self.executor.submit(self._write, autosave)
+
+    def _write(self, autosave):
+        try:
+            self.app_data.write_autosave(autosave)
+        except Exception:
+            self.failed.emit(traceback.format_exc())
+        else:
+            self.finished.emit(autosave)
+
+    def shutdown(self):
+        """Wait for a running autosave, so no half-written file is left."""
+        self.executor.shutdown(wait=True)
+
+
 class Application(QtWidgets.QApplication):
     """Application widget.
 
     Attributes:
         app_data (api.AppData): Application data containing config and project
+        autosave_worker (AutosaveWorker): Writes the autosaves in the background
         autosave_timer (PyQt5.QtCore.QTimer): Timer for repetetive autosaving
         logger (TYPE): Logger
         window (mainwindow.MainWindow): Main window of the application
@@ -46,6 +93,7 @@ class Application(QtWidgets.QApplication):
         self.initialize_logger()
 
         self.app_data = api.AppData()
+        self.initialize_profiling()
 
         self.window = mainwindow.MainWindow(self.app_data)
 
@@ -85,9 +133,13 @@ class Application(QtWidgets.QApplication):
 
     @debug.log_info
     def initialize_autosaver(self):
-        """Initilize autosave timer."""
+        """Initilize autosave timer and the worker writing the autosaves."""
         self.autosave_timer = QTimer()
         self.autosave_timer.timeout.connect(self.autosave_project)
+        self.autosave_worker = AutosaveWorker(self.app_data)
+        self.autosave_worker.finished.connect(self.finish_autosave)
+        self.autosave_worker.failed.connect(self.fail_autosave)
+        self.aboutToQuit.connect(self.autosave_worker.shutdown)
 
     @debug.log_info
     def start_autosaving(self):
@@ -97,19 +149,38 @@ class Application(QtWidgets.QApplication):
 
     @debug.log_info
     def autosave_project(self):
-        """Save project with autosave name including a timestamp."""
+        """Save project with autosave name including a timestamp.
+
+        Only the snapshot is taken on the GUI thread, it is encoded and written in
+        the background (see: AutosaveWorker).
+        """
         debug.info_msg("Checking whether the file has already been saved...")
-        if self.app_data.project and self.app_data.project.has_been_saved():
+        if self.autosave_worker.is_busy():
+            debug.info_msg("The last autosave is still running, skipping autosave...")
+        elif not (self.app_data.project and self.app_data.project.has_been_saved()):
+            debug.info_msg("Not saved yet, skipping autosave...")
+        elif not self.app_data.has_unsaved_changes():
+            debug.info_msg("No changes since the last save, skipping autosave...")
+        else:
             debug.info_msg("Yes! Autosaving...")
             # activate visual indicator, that autosaving is in progress
             self.window.start_autosaving()
-            self.app_data.autosave_project()
-            self.app_data.delete_old_autosaves()
-            # deactivate visual indicator
-            self.window.stop_autosaving()
-            debug.info_msg("Saved!")
-        else:
-            debug.info_msg("Not saved yet, skipping autosave...")
+            autosave = self.app_data.take_autosave_snapshot()
+            self.autosave_worker.write(autosave)
+
+    @debug.log_info
+    def finish_autosave(self, autosave):
+        """Update the configs after the autosave has been written."""
+        self.app_data.finish_autosave(autosave)
+        # deactivate visual indicator
+        self.window.stop_autosaving()
+        debug.info_msg("Saved!")
+
+    @debug.log_error
+    def fail_autosave(self, traceback_string):
+        """Log an autosave, that could not be written."""
+        self.window.stop_autosaving(failed=True)
+        debug.error_msg(f"Autosave failed:\n{traceback_string}")
 
     """
     #
@@ -156,8 +227,31 @@ class Application(QtWidgets.QApplication):
         # create logger
         self.logger = logging.getLogger()
 
+    @debug.log
+    def initialize_profiling(self):
+        """Start a cProfile capture, if "profile" is set in the app config.
+
+        On quitting, the profile and (if "instrumentation" is set) the report of
+        the timers and counters (see: debug.get_report) are written next to the
+        log file.
+        """
+        if self.app_data.config.get("profile", False):
+            debug.start_profiling()
+        if debug.PROFILER is not None or debug.INSTRUMENTED:
+            self.aboutToQuit.connect(self.write_profiling_report)
+
+    @debug.log
+    def write_profiling_report(self):
+        """Write the cProfile capture and the instrumentation report."""
+        debug.stop_profiling(os.path.join("logs", "profile.prof"))
+        if debug.INSTRUMENTED:
+            debug.export_report(os.path.join("logs", "instrumentation.json"))
+            debug.export_report(os.path.join("logs", "instrumentation.csv"))
+
 
 if __name__ == "__main__":
+    #   the worker processes (see: catalogr.py) of the frozen app start here, too
+    multiprocessing.freeze_support()
     app = Application(sys.argv)
     app.window.show()
     sys.exit(app.exec_())
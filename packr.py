@@ -0,0 +1,459 @@
+"""
+#
+#   PACKR
+#   Compact binary save files, an alternative to the zipped JSON files of zipr.
+#
+#   File layout (all integers little-endian):
+#       header:     MAGIC, format version (H), codec (B), number of members (H)
+#       member:     name length (H), name (utf-8), layout (B),
+#                   payload length (Q), payload
+#   The payload is the encoded data of the member, packed with the codec.
+#   Lists of objects (invoices, jobs, ...) are stored as a table: the keys once
+#   as columns and a row of values for every object.
+#
+#   Usage as converter between *.project files with zipped JSON and binary:
+#       python packr.py input.project output.project --format binary
+#       python packr.py input.project output.project --format zip --compression lzma
+#
+"""
+import debug
+
+import gc
+import json
+import struct
+import argparse
+from datetime import datetime
+
+#   MESSAGEPACK
+#   Binary codec, JSON is used if it is not installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from PyQt5.QtCore import QDate
+
+import zipr, decoder
+from core.obj import corp, proj, uid
+
+MAGIC = b"SYPPROJ\x00"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sHBH")
+MEMBER_NAME = struct.Struct("<H")
+MEMBER_PAYLOAD = struct.Struct("<BQ")
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+LAYOUT_DATA = 0
+LAYOUT_TABLE = 1
+
+
+def get_default_codec():
+    """Return the codec used for writing (MessagePack, if installed)."""
+    return CODEC_MSGPACK if msgpack else CODEC_JSON
+
+
+def is_packed_project(path):
+    """Check whether the file is a binary save file (instead of a zip archive).
+
+    Args:
+        path (Path): Path to the file
+
+    Returns:
+        bool: True, if the file starts with the MAGIC bytes
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+"""
+#
+#   CODEC AND LAYOUT
+#
+"""
+
+
+def pack(data, codec):
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def unpack(payload, codec):
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise Exception(
+                "Cannot open the project: it is saved with MessagePack, "
+                "which is not installed (pip install msgpack)."
+            )
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(str(payload, "utf-8"))
+
+
+def to_table(data):
+    """Return a list of dicts with the same keys as a table, else None.
+
+    Args:
+        data: Encoded data of a member
+
+    Returns:
+        list: [columns, rows] or None, if the data is no list of similar dicts
+    """
+    if not isinstance(data, list) or not data:
+        return None
+    if not all(isinstance(dct, dict) for dct in data):
+        return None
+    columns = list(data[0])
+    if not all(len(dct) == len(columns) and list(dct) == columns for dct in data):
+        return None
+    return [columns, [list(dct.values()) for dct in data]]
+
+
+def from_table(table):
+    columns, rows = table
+    return [dict(zip(columns, row)) for row in rows]
+
+
+"""
+#
+#   READ AND WRITE
+#   Members as plain (encoded) data, used for saving, opening and converting.
+#
+"""
+
+
+@debug.log
+def write_members(path, members, codec=None):
+    """Write the encoded data of the members to a binary save file.
+
+    Args:
+        path (Path): Path to save to
+        members (dict): Member name -> encoded data
+        codec (int, optional): CODEC_JSON or CODEC_MSGPACK (default: msgpack)
+    """
+    codec = get_default_codec() if codec is None else codec
+
+    def pack_member(item):
+        name, data = item
+        table = to_table(data)
+        layout = LAYOUT_TABLE if table else LAYOUT_DATA
+        return name.encode(), layout, pack(table if table else data, codec)
+
+    with zipr.open_atomic(path) as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, codec, len(members)))
+        for name, layout, payload in zipr.iter_concurrently(
+            pack_member, members.items()
+        ):
+            file.write(MEMBER_NAME.pack(len(name)))
+            file.write(name)
+            file.write(MEMBER_PAYLOAD.pack(layout, len(payload)))
+            file.write(payload)
+
+
+@debug.log
+def read_members(path):
+    """Read the encoded data of the members of a binary save file.
+
+    Args:
+        path (Path): Path to the file
+
+    Returns:
+        dict: Member name -> encoded data
+    """
+    members = dict()
+    with zipr.map_file(path) as buffer, memoryview(buffer) as view:
+        magic, version, codec, number_of_members = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise Exception(f"{path} is not a binary project file.")
+        if version > FORMAT_VERSION:
+            raise Exception(
+                f"{path} has the format version {version}, "
+                f"this version of the app can only open up to {FORMAT_VERSION}."
+            )
+        offset = HEADER.size
+        for i in range(number_of_members):
+            (name_length,) = MEMBER_NAME.unpack_from(view, offset)
+            offset += MEMBER_NAME.size
+            name = str(view[offset : offset + name_length], "utf-8")
+            offset += name_length
+            layout, payload_length = MEMBER_PAYLOAD.unpack_from(view, offset)
+            offset += MEMBER_PAYLOAD.size
+            #   parsed from the memory map without copying the payload
+            data = unpack(view[offset : offset + payload_length], codec)
+            offset += payload_length
+            members[name] = from_table(data) if layout == LAYOUT_TABLE else data
+    return members
+
+
+def read_zip_members(path):
+    """Read the encoded data of the members of a zipped JSON save file."""
+    file_names = [member.file_name for member in zipr.MEMBERS.values()]
+    return dict(zip(zipr.MEMBERS, zipr.read_json_members(path, file_names)))
+
+
+def read_project_members(path):
+    """Read the encoded data of the members of a save file of either format."""
+    if is_packed_project(path):
+        return read_members(path)
+    return read_zip_members(path)
+
+
+def write_zip_members(path, members, **archive_options):
+    """Write the encoded data of the members to a zipped JSON save file.
+
+    Args:
+        path (Path): Path to save to
+        members (dict): Member name -> encoded data
+        **archive_options: compression, compresslevel and indent
+            (see: zipr.write_json_members)
+    """
+    zipr.write_json_members(
+        path,
+        [
+            (member.file_name, members[name], None)
+            for name, member in zipr.MEMBERS.items()
+        ],
+        **archive_options,
+    )
+
+
+"""
+#
+#   SAVE, OPEN AND CONVERT
+#
+"""
+
+
+def encode_member_objects(objects):
+    """Encode the objects of the members (see: zipr.get_member_objects).
+
+    Returns:
+        dict: Member name -> encoded data
+    """
+    members = dict()
+    for name, member in zipr.MEMBERS.items():
+        data = objects[name]
+        if member.encoder is None:
+            members[name] = data
+        elif isinstance(data, list):
+            encoder_instance = member.encoder()
+            members[name] = [encoder_instance.default(o) for o in data]
+        else:
+            members[name] = member.encoder().default(data)
+    return members
+
+
+def encode_members(project):
+    """Encode the project into the members of a save file.
+
+    Args:
+        project (proj.Project): Project to encode
+
+    Returns:
+        dict: Member name -> encoded data
+    """
+    return encode_member_objects(zipr.get_member_objects(project))
+
+
+"""
+#
+#   SNAPSHOT
+#   Copies of the objects of the members, that later edits of the project don't
+#   change, so they can be encoded on another thread (see: AppData.write_autosave).
+#   Every object is copied shallowly once and the links between them point to
+#   the copies, which is much cheaper than encoding them.
+#
+"""
+
+#   objects encoded inline as part of the object referencing them
+SNAPSHOT_COMPONENTS = (
+    corp.Person,
+    corp.Address,
+    proj.ProjectData,
+    proj.InventoryItem,
+)
+#   values shared with the snapshot, since they are replaced, not changed in place
+SNAPSHOT_SHARED_TYPES = {str, int, float, bool, type(None), datetime, QDate}
+
+
+def copy_object(o):
+    snapshot = o.__class__.__new__(o.__class__)
+    snapshot.__dict__ = o.__dict__.copy()
+    return snapshot
+
+
+def snapshot_attributes(snapshot, copies):
+    """Replace the attributes of a shallow copy, that could still change."""
+    attributes = snapshot.__dict__
+    for name, value in attributes.items():
+        if type(value) not in SNAPSHOT_SHARED_TYPES:
+            attributes[name] = snapshot_value(value, copies)
+
+
+def snapshot_value(value, copies):
+    if type(value) in SNAPSHOT_SHARED_TYPES:
+        return value
+    copied = copies.get(id(value))
+    if copied is not None:
+        return copied
+    if isinstance(value, uid.UID):
+        #   freezes the edited date
+        return uid.UID(
+            value.class_name, value.uid, value.created_date, value.edited_date
+        )
+    if isinstance(value, SNAPSHOT_COMPONENTS):
+        snapshot = copy_object(value)
+        snapshot_attributes(snapshot, copies)
+        return snapshot
+    if isinstance(value, list):
+        #   mostly links, e.g. the previous invoices of an invoice
+        return [
+            copies[id(item)] if id(item) in copies else snapshot_value(item, copies)
+            for item in value
+        ]
+    if isinstance(value, dict):
+        return {key: snapshot_value(item, copies) for key, item in value.items()}
+    return value
+
+
+@debug.timed()
+def snapshot_members(project):
+    """Return a snapshot of the objects of the members.
+
+    See: zipr.get_member_objects
+
+    Args:
+        project (proj.Project): Project to take the snapshot of
+
+    Returns:
+        dict: Member name -> copy of the object or list of copies
+    """
+    objects = zipr.get_member_objects(project)
+    #   only new objects are created, the passes of the garbage collector over
+    #   the whole project would take as long as copying it
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        #   id(object) -> copy, for the project and all objects linked to
+        copies = {id(project): copy_object(project)}
+        for objects_name in [
+            "_project_cost_calculations",
+            "_companies",
+            "_trades",
+            "_invoices",
+            "_jobs",
+            "_cost_groups",
+        ]:
+            for o in getattr(project, objects_name):
+                copies[id(o)] = copy_object(o)
+        for snapshot in list(copies.values()):
+            snapshot_attributes(snapshot, copies)
+        return {name: snapshot_value(data, copies) for name, data in objects.items()}
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+@debug.log
+@debug.timed()
+def save_project(path, app_data, codec=None):
+    """Save a project to a binary *.project file.
+
+    Args:
+        path (Path): Path to save to
+        app_data (api.AppData): Application data containing the project data
+        codec (int, optional): CODEC_JSON or CODEC_MSGPACK (default: msgpack)
+    """
+    write_members(path, encode_members(app_data.project), codec)
+
+
+@debug.log
+@debug.timed()
+def open_project(path):
+    """Open a binary *.project file.
+
+    Args:
+        path (Path): Path to saved project
+
+    Returns:
+        dict: Project as a dict (same as zipr.open_project)
+    """
+    return decode_members(read_members(path))
+
+
+def decode_members(members, names=None):
+    """Decode the members of a save file into the loaded args.
+
+    Args:
+        members (dict): Member name -> encoded data
+        names (list, optional): Names of the members to decode, default: all
+
+    Returns:
+        dict: Project as a dict (same as zipr.open_project)
+    """
+    loaded_args = dict()
+    for name, member in zipr.MEMBERS.items():
+        if names is not None and name not in names:
+            continue
+        data = members[name]
+        if member.encoder is None:
+            loaded_args[name] = data
+        elif isinstance(data, list):
+            loaded_args[name] = [decoder.decode(None, dct) for dct in data]
+        else:
+            loaded_args[name] = decoder.decode(None, data)
+    return loaded_args
+
+
+@debug.log
+@debug.timed()
+def convert_project(
+    input_path, output_path, save_format="binary", codec=None, **archive_options
+):
+    """Convert a save file between zipped JSON and binary, without decoding it.
+
+    Also converts zipped JSON files to other archive options.
+
+    Args:
+        input_path (Path): Path to the file to convert (format is detected)
+        output_path (Path): Path to write to
+        save_format (str, optional): "binary" or "zip"
+        codec (int, optional): Codec of a binary file, default: msgpack if installed
+        **archive_options: Options of a zipped JSON file (see: write_zip_members)
+    """
+    members = read_project_members(input_path)
+    if save_format == "binary":
+        write_members(output_path, members, codec)
+    elif save_format == "zip":
+        write_zip_members(output_path, members, **archive_options)
+    else:
+        raise Exception(f"Unknown save format: {save_format}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert *.project files between zipped JSON and binary."
+    )
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", default="binary", choices=["binary", "zip"])
+    parser.add_argument(
+        "--compression", default=zipr.DEFAULT_COMPRESSION, choices=zipr.COMPRESSIONS
+    )
+    parser.add_argument("--compresslevel", type=int, default=zipr.DEFAULT_COMPRESSLEVEL)
+    parser.add_argument("--indent", type=int, default=zipr.DEFAULT_INDENT)
+    args = parser.parse_args(argv)
+    convert_project(
+        args.input,
+        args.output,
+        save_format=args.format,
+        compression=args.compression,
+        compresslevel=args.compresslevel,
+        indent=args.indent,
+    )
+
+
+if __name__ == "__main__":
+    main()
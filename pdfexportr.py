@@ -3,11 +3,200 @@
 #   PDF Export
 #   The class writes a PDF file from a xlsx-Excel template
 #
+#   Backends (see: BACKENDS):
+#       excel:          Excel via COM (only windows, one file at a time)
+#       libreoffice:    LibreOffice headless as a subprocess (windows and linux),
+#                       several files are converted in parallel
+#   "auto" uses Excel if it is available, else LibreOffice.
+#
 """
 import debug
 
+import os
+import shutil
+import tempfile
+import threading
+import subprocess
+import contextlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
 #   only works on windows !
-import win32com.client
+try:
+    import win32com.client
+    import pythoncom
+except ImportError:
+    win32com = None
+
+DEFAULT_BACKEND = "auto"
+
+#   executables of LibreOffice, the first one found is used
+LIBREOFFICE_EXECUTABLES = [
+    "soffice",
+    "libreoffice",
+    "C:/Program Files/LibreOffice/program/soffice.exe",
+    "C:/Program Files (x86)/LibreOffice/program/soffice.exe",
+]
+#   seconds until a conversion of LibreOffice is aborted
+LIBREOFFICE_TIMEOUT = 120
+
+
+"""
+#
+#   BACKENDS
+#
+"""
+
+
+class ExcelBackend:
+
+    """Export with Excel via COM (the original export)."""
+
+    name = "excel"
+    #   COM is bound to a thread, Excel converts one file at a time
+    parallel = False
+
+    @staticmethod
+    def is_available():
+        return win32com is not None
+
+    def create_pdf(self, input_file_path, output_file_path):
+        #   also called from other threads than the main thread (see: batchr.py)
+        pythoncom.CoInitialize()
+        try:
+            o = win32com.client.Dispatch("Excel.Application")
+            o.Visible = False
+            wb = o.Workbooks.Open(input_file_path)
+            ws_index_list = [1]  # say you want to print these sheets
+            wb.WorkSheets(ws_index_list).Select()
+            wb.ActiveSheet.ExportAsFixedFormat(0, output_file_path)
+            wb.Close(True)
+        finally:
+            pythoncom.CoUninitialize()
+
+    def close(self):
+        pass
+
+
+class LibreOfficeBackend:
+
+    """Export with LibreOffice headless, started as a subprocess per file.
+
+    A LibreOffice instance locks its user profile, so every running conversion
+    borrows a profile of its own (see: borrow_profile_dir). The later conversions
+    reuse the profiles (they start faster), until the backend is closed.
+    """
+
+    name = "libreoffice"
+    parallel = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        #   all profile directories of the backend and the ones not borrowed
+        self._profile_dirs = list()
+        self._free_profile_dirs = list()
+
+    @staticmethod
+    def get_executable():
+        for executable in LIBREOFFICE_EXECUTABLES:
+            path = shutil.which(executable)
+            if path:
+                return path
+        return None
+
+    @staticmethod
+    def is_available():
+        return LibreOfficeBackend.get_executable() is not None
+
+    @contextlib.contextmanager
+    def borrow_profile_dir(self):
+        """Borrow a profile directory for one conversion.
+
+        Yields:
+            str: Path to the profile directory, no other conversion uses it meanwhile
+        """
+        with self._lock:
+            if self._free_profile_dirs:
+                profile_dir = self._free_profile_dirs.pop()
+            else:
+                profile_dir = tempfile.mkdtemp(prefix="syp-libreoffice-")
+                self._profile_dirs.append(profile_dir)
+        try:
+            yield profile_dir
+        finally:
+            with self._lock:
+                self._free_profile_dirs.append(profile_dir)
+
+    def close(self):
+        """Remove the profile directories (after the conversions are finished)."""
+        with self._lock:
+            for profile_dir in self._profile_dirs:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+            self._profile_dirs = list()
+            self._free_profile_dirs = list()
+
+    def create_pdf(self, input_file_path, output_file_path):
+        executable = self.get_executable()
+        if executable is None:
+            raise Exception("Cannot export the PDF: LibreOffice is not installed.")
+        #   converted into an empty --outdir, the name of the output is fixed
+        with self.borrow_profile_dir() as profile_dir:
+            with tempfile.TemporaryDirectory() as out_dir:
+                command = [
+                    executable,
+                    f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                    "--headless",
+                    "--norestore",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    out_dir,
+                    str(input_file_path),
+                ]
+                process = subprocess.run(
+                    command, capture_output=True, timeout=LIBREOFFICE_TIMEOUT
+                )
+                pdf_path = Path(out_dir, Path(input_file_path).stem + ".pdf")
+                if process.returncode != 0 or not pdf_path.is_file():
+                    stderr = process.stderr.decode(errors="replace").strip()
+                    raise Exception(
+                        f"LibreOffice could not convert {input_file_path} "
+                        f"(exit code {process.returncode}): {stderr}"
+                    )
+                shutil.move(str(pdf_path), str(output_file_path))
+
+
+BACKENDS = {
+    ExcelBackend.name: ExcelBackend,
+    LibreOfficeBackend.name: LibreOfficeBackend,
+}
+
+
+def get_backend(name=None):
+    """Return the backend to export with.
+
+    Args:
+        name (str, optional): Key of BACKENDS or "auto" (default)
+
+    Returns:
+        ExcelBackend or LibreOfficeBackend: Backend
+    """
+    return get_backend_class(name)()
+
+
+def get_backend_class(name=None):
+    """Return the class of the backend to export with (see: get_backend)."""
+    name = name if name else DEFAULT_BACKEND
+    if name == "auto":
+        for backend_class in BACKENDS.values():
+            if backend_class.is_available():
+                return backend_class
+        raise Exception(
+            "Cannot export PDFs: neither Excel (pywin32) nor LibreOffice is installed."
+        )
+    if name not in BACKENDS:
+        raise Exception(f"Unknown PDF backend: {name}")
+    return BACKENDS[name]
 
 
 class PDFExportr:
@@ -16,6 +205,16 @@ class PDFExportr:
     usage.
     """
 
+    def __init__(self, backend=None):
+        """Initialize PDFExportr.
+
+        Args:
+            backend (str, optional): Name of the backend (see: get_backend)
+        """
+        self.backend = get_backend(backend)
+
+    @debug.log
+    @debug.timed()
     def create_pdf(self, input_file_path, output_file_path):
         """Create a PDF.
 
@@ -23,10 +222,87 @@ class PDFExportr:
             input_file_path (Path): Path to input *.xlxs-file
             output_file_path (Path): Path to output *.pdf-file
         """
-        o = win32com.client.Dispatch("Excel.Application")
-        o.Visible = False
-        wb = o.Workbooks.Open(input_file_path)
-        ws_index_list = [1]  # say you want to print these sheets
-        wb.WorkSheets(ws_index_list).Select()
-        wb.ActiveSheet.ExportAsFixedFormat(0, output_file_path)
-        wb.Close(True)
+        try:
+            self.convert(input_file_path, output_file_path)
+        finally:
+            self.backend.close()
+
+    @debug.log
+    @debug.timed()
+    def create_pdfs(self, file_paths, max_workers=None):
+        """Create several PDFs, in parallel if the backend supports it.
+
+        Args:
+            file_paths (list): (input *.xlsx-file, output *.pdf-file) paths
+            max_workers (int, optional): Number of parallel conversions,
+                default: number of CPUs
+        """
+        try:
+            if not self.backend.parallel or len(file_paths) < 2 or max_workers == 1:
+                for input_file_path, output_file_path in file_paths:
+                    self.convert(input_file_path, output_file_path)
+                return
+            max_workers = min(len(file_paths), max_workers or os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                #   list() raises the first error of the conversions
+                list(pool.map(lambda paths: self.convert(*paths), file_paths))
+        finally:
+            #   also in the worker processes of the batch export, that exit
+            #   without running atexit
+            self.backend.close()
+
+    @debug.timed()
+    def convert(self, input_file_path, output_file_path):
+        self.backend.create_pdf(str(input_file_path), str(output_file_path))
+
+
+"""
+#
+#   XLSX FILES
+#   The PDF of a xlsx-file is written next to it.
+#
+"""
+
+
+def get_pdf_path(input_path, filename):
+    """Get the path of the PDF of a xlsx-file (in the same directory).
+
+    Returns:
+        (Path, Path): Save path, filename
+    """
+    dir_path = os.path.dirname(input_path)
+    pdf_filename = f"{filename}.pdf"
+    return os.path.join(dir_path, pdf_filename), pdf_filename
+
+
+def xlsx2pdf(input_path, filename, backend=None):
+    """Export PDF from xlsx-file.
+
+    Args:
+        input_path (Path): path of xlsx-file
+        filename (str): Filename of the PDF
+        backend (str, optional): PDF backend (see: get_backend)
+
+    Returns:
+        (Path, Path): Save path, filename
+    """
+    pdf_save_path, pdf_filename = get_pdf_path(input_path, filename)
+    PDFExportr(backend).create_pdf(input_path, pdf_save_path)
+    return pdf_save_path, pdf_filename
+
+
+def xlsx2pdfs(xlsx_files, backend=None):
+    """Export PDFs from xlsx-files, in parallel if the backend supports it.
+
+    Args:
+        xlsx_files (list): (path of xlsx-file, filename of the PDF)
+        backend (str, optional): PDF backend (see: get_backend)
+
+    Returns:
+        list: (save path, filename) of the PDFs
+    """
+    pdf_files = [get_pdf_path(*file) for file in xlsx_files]
+    PDFExportr(backend).create_pdfs(
+        [(file[0], pdf_file[0]) for file, pdf_file in zip(xlsx_files, pdf_files)]
+    )
+    return pdf_files
@@ -0,0 +1,214 @@
+"""
+#
+#   PORTFOLR
+#   Cost rollups across many saved projects (the portfolio): budgets, job sums,
+#   approved amounts and paid safety deposits (see: core.obj.aggregate) per
+#   company, trade and cost group and in total.
+#
+#   Every project is opened and aggregated in a spawned worker process (see:
+#   catalogr.MP_CONTEXT), that only sends back the small rollup of the project.
+#   The rollups are merged as they come in, so a project is only in memory
+#   while its worker aggregates it.
+#   Companies and trades are matched across the projects by their name, cost
+#   groups by their id (e.g. "300").
+#
+#   Usage (headless, e.g. for a scheduled report):
+#       python portfolr.py projects/ --output portfolio.json
+#
+"""
+import debug
+
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import catalogr
+from core.obj import aggregate
+
+#   Amounts of every entry of a rollup
+ROLLUP_FIELDS = ["budget"] + aggregate.AGGREGATE_FIELDS
+#   Groups of a rollup (entries keyed by name/id)
+ROLLUP_GROUPS = ["companies", "trades", "cost_groups"]
+
+
+def get_empty_rollup():
+    rollup = {"projects": list(), "errors": dict(), "total": get_empty_entry()}
+    for group in ROLLUP_GROUPS:
+        rollup[group] = dict()
+    return rollup
+
+
+def get_empty_entry():
+    return {field: 0 for field in ROLLUP_FIELDS}
+
+
+def is_active(project):
+    """Check whether a project is active (not billed yet)."""
+    return project.billed_date is None
+
+
+"""
+#
+#   ROLLUP OF A PROJECT
+#   Runs in the worker processes.
+#
+"""
+
+
+def add_entry(entries, key, budget, aggregates):
+    entry = entries.setdefault(key, get_empty_entry())
+    entry["budget"] += budget or 0
+    for field in aggregate.AGGREGATE_FIELDS:
+        entry[field] += aggregates[field]
+
+
+def get_project_rollup(project):
+    """Aggregate a restored project.
+
+    Args:
+        project (proj.Project): Restored project
+
+    Returns:
+        dict: Rollup with "projects", "total" and an entry per company, trade
+            and cost group
+    """
+    rollup = get_empty_rollup()
+    rollup["projects"].append(project.identifier)
+    add_entry(
+        rollup,
+        "total",
+        project.get_cost_group_budget_total(),
+        project.get_aggregates_total(),
+    )
+    for company in project.companies:
+        add_entry(
+            rollup["companies"],
+            company.name,
+            company.budget,
+            project.get_aggregates_of_jobs(project.get_jobs_of_company(company)),
+        )
+    for trade in project.trades:
+        add_entry(
+            rollup["trades"],
+            trade.name,
+            trade.budget,
+            project.get_aggregates_of_trade(trade),
+        )
+    for cost_group in project.cost_groups:
+        add_entry(
+            rollup["cost_groups"],
+            cost_group.id,
+            cost_group.budget,
+            project.get_aggregates_of_cost_group(cost_group),
+        )
+    return rollup
+
+
+def get_project_file_rollup(path, only_active=True):
+    """Open a project file and aggregate it (in a worker process).
+
+    Args:
+        path (str): Path to the *.project file
+        only_active (bool, optional): Skip billed projects
+
+    Returns:
+        dict: Rollup of the project (empty, if it is skipped or cannot be opened)
+    """
+    try:
+        project = catalogr.open_project_file(path)
+        if only_active and not is_active(project):
+            return get_empty_rollup()
+        return get_project_rollup(project)
+    except Exception as error:
+        rollup = get_empty_rollup()
+        rollup["errors"][str(path)] = f"{type(error).__name__}: {error}"
+        return rollup
+
+
+"""
+#
+#   PORTFOLIO
+#
+"""
+
+
+def merge_rollup(rollup, other):
+    """Add the other rollup to the rollup (in place)."""
+    rollup["projects"] += other["projects"]
+    rollup["errors"].update(other["errors"])
+    for field in ROLLUP_FIELDS:
+        rollup["total"][field] += other["total"][field]
+    for group in ROLLUP_GROUPS:
+        for key, entry in other[group].items():
+            add_entry(rollup[group], key, entry["budget"], entry)
+    return rollup
+
+
+@debug.log
+@debug.timed()
+def get_portfolio_rollup(project_paths, only_active=True, max_workers=None):
+    """Aggregate the projects in parallel worker processes.
+
+    Args:
+        project_paths (list): Paths to the *.project files
+        only_active (bool, optional): Skip billed projects
+        max_workers (int, optional): Number of processes, default: number of CPUs
+
+    Returns:
+        dict: Merged rollup (see: get_project_rollup), "errors" maps the paths
+            of the files, that could not be opened, to the error
+    """
+    project_paths = [str(path) for path in project_paths]
+    rollup = get_empty_rollup()
+    if len(project_paths) < 2 or max_workers == 1:
+        for path in project_paths:
+            merge_rollup(rollup, get_project_file_rollup(path, only_active))
+    else:
+        max_workers = min(len(project_paths), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=catalogr.MP_CONTEXT
+        ) as pool:
+            futures = [
+                pool.submit(get_project_file_rollup, path, only_active)
+                for path in project_paths
+            ]
+            for future in as_completed(futures):
+                merge_rollup(rollup, future.result())
+    rollup["projects"].sort()
+    return rollup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Aggregate the costs of the saved projects in a directory."
+    )
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--all", action="store_true", help="include billed projects as well"
+    )
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--output", help="write the rollup to this *.json file")
+    args = parser.parse_args(argv)
+
+    project_paths = [
+        path
+        for path in sorted(Path(args.directory).rglob("*.project"))
+        if "autosave-" not in path.name
+    ]
+    rollup = get_portfolio_rollup(
+        project_paths, only_active=not args.all, max_workers=args.workers
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(rollup, file, indent=4)
+    else:
+        json.dump(rollup, sys.stdout, indent=4)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
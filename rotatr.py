@@ -0,0 +1,187 @@
+"""
+#
+#   ROTATR
+#   Index (manifest) of the autosaves of a project and their rotation.
+#
+#   Every project has a manifest next to its autosaves, listing the names and
+#   datetimes of its autosaves (oldest first):
+#       <autosave dir>/autosave-<identifier>.manifest.json
+#   Rotating only reads the manifest and unlinks the files of the project, the
+#   autosave directory (shared by all projects) is not listed. A missing or
+#   broken manifest is rebuilt once from the directory.
+#
+#   Retention: the newest max_autosaves are kept, and optionally the newest
+#   autosave of every hour of the last "hourly" hours and of every day of the
+#   last "daily" days.
+#
+"""
+import debug
+
+import os
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import zipr, journalr
+
+MANIFEST_SUFFIX = ".manifest.json"
+#   see: formatr.now_str, the datetime is the prefix of the autosave's name
+DATETIME_FORMAT = "%Y-%m-%d_%H%M%S"
+
+
+def get_manifest_path(autosave_dir_path, file_suffix):
+    """Return the path of the manifest of the autosaves ending with file_suffix."""
+    name, _ = os.path.splitext(file_suffix)
+    return Path(autosave_dir_path, name + MANIFEST_SUFFIX)
+
+
+def parse_datetime(datetime_str):
+    try:
+        return datetime.strptime(datetime_str, DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+"""
+#
+#   MANIFEST
+#
+"""
+
+
+def scan_autosaves(autosave_dir_path, file_suffix):
+    """Build the entries of a manifest from the autosave directory (slow)."""
+    debug.info_msg(f"building the autosave manifest of {file_suffix}...")
+    entries = [
+        {"name": f.name, "datetime": f.name[: -len(file_suffix)].rstrip("-")}
+        for f in autosave_dir_path.iterdir()
+        if f.name.endswith(file_suffix) and f.is_file()
+    ]
+    return sorted(entries, key=lambda entry: entry["name"])
+
+
+def read_manifest(autosave_dir_path, file_suffix):
+    """Read the entries of the manifest, rebuild it if it is missing or broken.
+
+    Args:
+        autosave_dir_path (Path): Directory of the autosaves
+        file_suffix (str): End of the filenames, see: get_autosave_filename_suffix
+
+    Returns:
+        list: Entries (dicts with "name" and "datetime"), oldest first
+    """
+    manifest_path = get_manifest_path(autosave_dir_path, file_suffix)
+    try:
+        with open(manifest_path, "r") as file:
+            return json.load(file)["autosaves"]
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, TypeError):
+        debug.warning_msg(f"{manifest_path} not valid, rebuilding it...")
+    if not autosave_dir_path.is_dir():
+        return list()
+    return scan_autosaves(autosave_dir_path, file_suffix)
+
+
+def write_manifest(autosave_dir_path, file_suffix, entries):
+    manifest_path = get_manifest_path(autosave_dir_path, file_suffix)
+    data = json.dumps({"autosaves": entries}, indent=4).encode("utf-8")
+    zipr.write_atomic(manifest_path, data)
+
+
+"""
+#
+#   RETENTION
+#
+"""
+
+
+def get_autosaves_to_keep(entries, max_autosaves, retention=None, now=None):
+    """Select the autosaves to keep.
+
+    Args:
+        entries (list): Entries of the manifest, oldest first
+        max_autosaves (int): Number of newest autosaves to keep
+        retention (dict, optional): "hourly" and "daily": number of hours/days
+            to keep the newest autosave of
+        now (datetime, optional): Reference for the retention, default: now
+
+    Returns:
+        set: Names of the autosaves to keep
+    """
+    retention = retention if retention else dict()
+    now = now if now else datetime.now()
+    newest_first = list(reversed(entries))
+    keep = {entry["name"] for entry in newest_first[:max_autosaves]}
+    periods = [
+        (retention.get("hourly", 0), timedelta(hours=1), "%Y-%m-%d %H"),
+        (retention.get("daily", 0), timedelta(days=1), "%Y-%m-%d"),
+    ]
+    for number, period, bucket_format in periods:
+        if not number:
+            continue
+        since = now - number * period
+        buckets = set()
+        for entry in newest_first:
+            entry_datetime = parse_datetime(entry["datetime"])
+            if entry_datetime is None or entry_datetime < since:
+                continue
+            bucket = entry_datetime.strftime(bucket_format)
+            if bucket not in buckets:
+                buckets.add(bucket)
+                keep.add(entry["name"])
+    return keep
+
+
+def delete_autosave(autosave_path):
+    """Delete an autosave and its journal (missing files are ignored)."""
+    autosave_path.unlink(missing_ok=True)
+    journalr.get_journal_path(autosave_path).unlink(missing_ok=True)
+
+
+"""
+#
+#   ROTATION
+#
+"""
+
+
+@debug.log
+@debug.timed()
+def rotate(
+    autosave_dir_path,
+    file_suffix,
+    max_autosaves,
+    retention=None,
+    autosave_path=None,
+    datetime_str=None,
+):
+    """Add a written autosave to the manifest and delete the ones not retained.
+
+    Args:
+        autosave_dir_path (Path): Directory of the autosaves
+        file_suffix (str): End of the filenames, see: get_autosave_filename_suffix
+        max_autosaves (int): Number of newest autosaves to keep
+        retention (dict, optional): See: get_autosaves_to_keep
+        autosave_path (Path, optional): Autosave written just now
+        datetime_str (str, optional): Datetime of the autosave written just now
+    """
+    autosave_dir_path = Path(autosave_dir_path)
+    entries = read_manifest(autosave_dir_path, file_suffix)
+    if autosave_path is not None:
+        #   autosaves within the same second have the same name
+        entries = [entry for entry in entries if entry["name"] != autosave_path.name]
+        entries.append({"name": autosave_path.name, "datetime": datetime_str})
+    if not entries and not autosave_dir_path.is_dir():
+        debug.debug_msg("autosave dir does not exist. Nothing to delete...")
+        return
+    keep = get_autosaves_to_keep(entries, max_autosaves, retention)
+    for entry in entries:
+        if entry["name"] not in keep:
+            delete_autosave(Path(autosave_dir_path, entry["name"]))
+    write_manifest(
+        autosave_dir_path,
+        file_suffix,
+        [entry for entry in entries if entry["name"] in keep],
+    )
+    debug.debug_msg(f"...{len(entries) - len(keep)} autosave(s) deleted...")
@@ -9,14 +9,165 @@
 import debug
 
 import openpyxl
+from openpyxl.worksheet.dimensions import DimensionHolder
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
 from openpyxl.styles import Font, Alignment
 from openpyxl.styles.borders import Border, Side
 
+import io
 import os
+import pickle
+import copyreg
+import threading
 from os.path import expanduser
 
-from ui import helper
+import formatr
+
+"""
+#
+#   TEMPLATE CACHE
+#   Every template is parsed once per process. The parsed workbook is kept as a
+#   pickled snapshot, unpickling a fresh copy for every output is a lot faster
+#   than parsing the xlsx again (copy.deepcopy of a workbook breaks its styles).
+#   Workbooks that cannot be pickled are kept as the bytes of their file.
+#   An entry is replaced, when the modification time or size of the file change.
+#
+"""
+
+#   template file path -> (mtime_ns, size, kind ("pickle" or "xlsx"), data)
+TEMPLATE_CACHE = dict()
+TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def reduce_dimension_holder(holder):
+    #   the default pickling of a defaultdict passes the default_factory as the
+    #   first argument, which is the worksheet of a DimensionHolder
+    return (
+        DimensionHolder,
+        (None, holder.reference, holder.default_factory),
+        holder.__dict__,
+        None,
+        iter(holder.items()),
+    )
+
+
+class WorkbookPickler(pickle.Pickler):
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[DimensionHolder] = reduce_dimension_holder
+
+
+def pickle_workbook(wb):
+    buffer = io.BytesIO()
+    WorkbookPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(wb)
+    return buffer.getvalue()
+
+
+def load_template_workbook(template_file_path):
+    """Load the workbook of a template (from the template cache).
+
+    Args:
+        template_file_path (Path): Path to the template-file
+
+    Returns:
+        openpyxl.Workbook: Workbook, that is not shared with other callers
+    """
+    stat = os.stat(template_file_path)
+    with TEMPLATE_CACHE_LOCK:
+        entry = TEMPLATE_CACHE.get(template_file_path)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            debug.count("templatr.cache.hit")
+            _, _, kind, data = entry
+        else:
+            debug.count("templatr.cache.miss")
+            with open(template_file_path, "rb") as file:
+                data = file.read()
+            wb = openpyxl.load_workbook(io.BytesIO(data))
+            try:
+                TEMPLATE_CACHE[template_file_path] = (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    "pickle",
+                    pickle_workbook(wb),
+                )
+            except Exception:
+                TEMPLATE_CACHE[template_file_path] = (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    "xlsx",
+                    data,
+                )
+            return wb
+    if kind == "pickle":
+        return pickle.loads(data)
+    return openpyxl.load_workbook(io.BytesIO(data))
+
+
+def clear_template_cache():
+    """Drop all cached templates (e.g. after the template directory changed)."""
+    with TEMPLATE_CACHE_LOCK:
+        TEMPLATE_CACHE.clear()
+
+
+"""
+#
+#   CELL STYLES
+#   key of the excel data -> (styles of the workbook, field of the style of a
+#   cell), see: openpyxl.styles.cell_style.StyleArray
+#
+"""
+CELL_STYLES = {
+    "font": ("_fonts", "fontId"),
+    "border": ("_borders", "borderId"),
+    "number_format": ("_number_formats", "numFmtId"),
+    "alignment": ("_alignments", "alignmentId"),
+}
+
+"""
+#
+#   STREAMING
+#   A streamed file is written row by row into a write-only workbook, that
+#   takes over the stylesheet of the template (so the styles of its cells stay
+#   valid) and the layout of the worksheet "TEMPLATE".
+#
+"""
+#   attributes of the workbook holding its styles (see: openpyxl.styles.stylesheet)
+STYLESHEET_ATTRIBUTES = [
+    "_fonts",
+    "_fills",
+    "_borders",
+    "_differential_styles",
+    "_number_formats",
+    "_protections",
+    "_alignments",
+    "_table_styles",
+    "_cell_styles",
+    "_named_styles",
+    "_date_formats",
+    "_timedelta_formats",
+    "_colors",
+    "loaded_theme",
+]
+#   attributes of the worksheet written around its rows
+SHEET_ATTRIBUTES = [
+    "sheet_properties",
+    "sheet_format",
+    "views",
+    "column_dimensions",
+    "merged_cells",
+    "conditional_formatting",
+    "data_validations",
+    "protection",
+    "print_options",
+    "page_margins",
+    "page_setup",
+    "HeaderFooter",
+    "row_breaks",
+    "col_breaks",
+]
 
 
 class Template:
@@ -29,10 +180,15 @@ class Template:
         amount_format (str): Format of the amount-cells
         bold_font_header (openpyxl.styles): Header font
         bold_font_table_header (openpyxl.styles.Border): Table header font
+        border_header (openpyxl.styles.Border): Border below a header
+        border_table_header (openpyxl.styles.Border): Border below a table header
+        border_total (openpyxl.styles.Border): Border above a total
+        cell_styles (dict): Interned styles of the cells (see: make_cells)
         date_format (str): Format of the date-cells
         normal_font (openpyxl.styles.Font): Standard font style
         number_format (str): Format of the number-cells
         percent_format (str): Format of the percent-cells
+        style_ids (dict): Indices of the styles in the workbook (see: make_cells)
         template_dir (Path): Path to template-directory
         template_file_path (Path): Path to template-file
         wb (TYPE): The workbook of the template
@@ -50,7 +206,8 @@ class Template:
         self.template_dir = template_dir
         self.template_file_path = os.path.join(self.template_dir, template_filename)
 
-        self.wb = openpyxl.load_workbook(self.template_file_path)
+        with debug.timer("templatr.Template.load_workbook"):
+            self.wb = load_template_workbook(self.template_file_path)
         self.ws = self.wb["TEMPLATE"]
 
         self.date_format = "DD.MM.YYYY"
@@ -66,6 +223,15 @@ class Template:
         self.align_center = Alignment(horizontal="center")
         self.align_left = Alignment(horizontal="left")
 
+        self.border_header = Border(bottom=Side(style="medium"))
+        self.border_table_header = Border(bottom=Side(style="thin", color="999999"))
+        self.border_total = Border(top=Side(style="double", color="999999"))
+
+        #   style object (by id) -> (style object, index in the workbook)
+        self.style_ids = dict()
+        #   (style of a cell, changed style indices) -> new style of the cell
+        self.cell_styles = dict()
+
     @debug.log
     def add_rows(self, before_row, number_of_rows):
         """Add rows in a template before some row.
@@ -80,30 +246,163 @@ class Template:
             f"A{before_row}:AA{99+before_row}", rows=number_of_rows, cols=0
         )
 
+    def get_style_id(self, key, style):
+        """Return the index of a style in the workbook (added once).
+
+        Args:
+            key (str): "font", "alignment", "border" or "number_format"
+            style: Style object or number format
+
+        Returns:
+            int: Index of the style, as stored in the style of a cell
+        """
+        style_key = style if key == "number_format" else id(style)
+        if style_key not in self.style_ids:
+            if key == "number_format":
+                if style in BUILTIN_FORMATS_REVERSE:
+                    index = BUILTIN_FORMATS_REVERSE[style]
+                else:
+                    index = self.wb._number_formats.add(style)
+                    index += BUILTIN_FORMATS_MAX_SIZE
+            else:
+                index = getattr(self.wb, CELL_STYLES[key][0]).add(style)
+            #   the style is kept, so its id is not reused
+            self.style_ids[style_key] = (style, index)
+        return self.style_ids[style_key][1]
+
+    def get_cell_style(self, cell_style, style_ids):
+        """Return the style of a cell with the changed style indices."""
+        key = (tuple(cell_style) if cell_style else None, style_ids)
+        if key not in self.cell_styles:
+            new_style = StyleArray(cell_style) if cell_style else StyleArray()
+            for field, index in style_ids:
+                setattr(new_style, field, index)
+            self.cell_styles[key] = new_style
+        #   every cell needs its own array, openpyxl changes it in place
+        return StyleArray(self.cell_styles[key])
+
     @debug.log
+    @debug.timed()
     def make_cells(self, excel_data):
         """Write data in the cells.
 
+        A cell can be a range (e.g. "B9:I9") to style a whole row, the styles
+        are looked up in the workbook once (see: get_style_id) and the cells
+        are addressed by their row and column.
+
         Args:
             excel_data (dict): Data to write
         """
         for write_cell in excel_data:
-            # Data can be assigned directly to cells
-            if "data" in write_cell.keys():
-                self.ws[write_cell["cell"]] = write_cell["data"]
-            if "font" in write_cell.keys():
-                self.ws[write_cell["cell"]].font = write_cell["font"]
-            if "alignment" in write_cell.keys():
-                self.ws[write_cell["cell"]].alignment = write_cell["alignment"]
-            if "number_format" in write_cell.keys():
-                self.ws[write_cell["cell"]].number_format = write_cell["number_format"]
-            if "border" in write_cell.keys():
-                self.ws[write_cell["cell"]].border = write_cell["border"]
-            if "row_height" in write_cell.keys():
-                cell = self.ws[write_cell["cell"]]
-                self.ws.row_dimensions[cell.row].height = write_cell["row_height"]
+            min_col, min_row, max_col, max_row = range_boundaries(write_cell["cell"])
+            style_ids = tuple(
+                (CELL_STYLES[key][1], self.get_style_id(key, write_cell[key]))
+                for key in CELL_STYLES
+                if key in write_cell
+            )
+            for row in range(min_row, max_row + 1):
+                for column in range(min_col, max_col + 1):
+                    cell = self.ws.cell(row=row, column=column)
+                    # Data can be assigned directly to cells
+                    if "data" in write_cell:
+                        cell.value = write_cell["data"]
+                    if style_ids:
+                        cell._style = self.get_cell_style(cell._style, style_ids)
+                if "row_height" in write_cell:
+                    self.ws.row_dimensions[row].height = write_cell["row_height"]
+
+    def start_stream(self):
+        """Replace the workbook by a write-only copy of the template.
+
+        Only the worksheet "TEMPLATE" is copied (with its images), the cells
+        of the template are written together with the streamed rows.
+        """
+        template_ws = self.ws
+        self.wb = openpyxl.Workbook(write_only=True)
+        for name in STYLESHEET_ATTRIBUTES:
+            setattr(self.wb, name, getattr(template_ws.parent, name))
+        for named_style in self.wb._named_styles:
+            named_style.bind(self.wb)
+        self.ws = self.wb.create_sheet(template_ws.title)
+        for name in SHEET_ATTRIBUTES:
+            setattr(self.ws, name, getattr(template_ws, name))
+        for image in template_ws._images:
+            self.ws.add_image(image)
+
+        #   row -> column -> cell of the template, written with the row
+        self.template_rows = dict()
+        for (row, column), cell in template_ws._cells.items():
+            self.template_rows.setdefault(row, dict())[column] = cell
+        self.template_row_dimensions = template_ws.row_dimensions
+        self.stream_row = 0
+        self.stream_row_cells = dict()
+
+    def write_stream_rows(self, until_row):
+        """Write the rows before until_row (missing ones from the template)."""
+        while self.stream_row < until_row:
+            if self.stream_row_cells:
+                max_column = max(self.stream_row_cells)
+                self.ws.append(
+                    [self.stream_row_cells.get(c) for c in range(1, max_column + 1)]
+                )
+            elif self.stream_row > 0:
+                self.ws.append([])
+            #   written rows are dropped, so the memory stays the same
+            self.ws.row_dimensions.pop(self.stream_row, None)
+            self.stream_row += 1
+            self.stream_row_cells = self.template_rows.pop(self.stream_row, dict())
+            if self.stream_row in self.template_row_dimensions:
+                self.ws.row_dimensions[
+                    self.stream_row
+                ] = self.template_row_dimensions.pop(self.stream_row)
+
+    def get_stream_cell(self, row, column):
+        if row < self.stream_row:
+            raise Exception(
+                f"Cannot write to row {row}, the rows up to {self.stream_row - 1} "
+                "are already written (stream the data in the order of the rows)."
+            )
+        self.write_stream_rows(row)
+        if column not in self.stream_row_cells:
+            self.stream_row_cells[column] = WriteOnlyCell(self.ws)
+        return self.stream_row_cells[column]
 
     @debug.log
+    @debug.timed()
+    def stream_cells(self, excel_data):
+        """Write data in the cells of a write-only copy of the template.
+
+        Same as make_cells, but every row is written to the file as soon as the
+        data reaches the next row. So the excel data has to be in the order of
+        the rows (a generator works best) and big overviews need about the same
+        memory as small ones.
+
+        Args:
+            excel_data (iterable): Data to write, in the order of the rows
+        """
+        self.start_stream()
+        for write_cell in excel_data:
+            min_col, min_row, max_col, max_row = range_boundaries(write_cell["cell"])
+            style_ids = tuple(
+                (CELL_STYLES[key][1], self.get_style_id(key, write_cell[key]))
+                for key in CELL_STYLES
+                if key in write_cell
+            )
+            for row in range(min_row, max_row + 1):
+                for column in range(min_col, max_col + 1):
+                    cell = self.get_stream_cell(row, column)
+                    if "data" in write_cell:
+                        cell.value = write_cell["data"]
+                    if style_ids:
+                        cell._style = self.get_cell_style(cell._style, style_ids)
+                if "row_height" in write_cell:
+                    self.ws.row_dimensions[row].height = write_cell["row_height"]
+        #   the rest of the template
+        last_row = max(self.template_rows, default=0)
+        self.write_stream_rows(max(last_row, self.stream_row) + 1)
+
+    @debug.log
+    @debug.timed()
     def save_file(self):
         """Save to a file at save_path."""
         # create directory if non-existing
@@ -139,7 +438,7 @@ class InvoiceCheckExcelTemplate(Template):
         self.filename = (
             filename
             if filename
-            else f"{helper.today_str()}-invoice_check-{invoice.id.replace(' ', '_')}"
+            else f"{formatr.today_str()}-invoice_check-{invoice.id.replace(' ', '_')}"
         )
         self.save_dir = save_dir
         self.save_path = os.path.join(
@@ -170,7 +469,7 @@ class InvoiceCheckExcelTemplate(Template):
         #   it to the cells.
         #
         """
-        date = helper.today_str("%d.%m.%Y")
+        date = formatr.today_str("%d.%m.%Y")
         self.excel_data = [
             {"cell": "D7", "data": invoice.company.name},
             {"cell": "H8", "data": invoice.invoice_date.toPyDate()},
@@ -290,7 +589,7 @@ class CompanyOVExcelTemplate(Template):
         self.filename = (
             filename
             if filename
-            else f"{helper.today_str()}-company_ov-{company.name.replace(' ', '_')}{job_str}"
+            else f"{formatr.today_str()}-company_ov-{company.name.replace(' ', '_')}{job_str}"
         )
         self.save_dir = save_dir
         self.save_path = os.path.join(
@@ -311,13 +610,13 @@ class CompanyOVExcelTemplate(Template):
         #   it to the cells.
         #
         """
-        date = helper.today_str("%d.%m.%Y")
+        date = formatr.today_str("%d.%m.%Y")
         self.excel_data = [
             {"cell": "B3", "data": date, "number_format": self.date_format},
             {"cell": "B4", "data": app_data.project.identifier},
             {
                 "cell": "B5",
-                "data": app_data.project.client if app_data.project.client else "",
+                "data": str(app_data.project.client) if app_data.project.client else "",
             },
             {"cell": "B7", "data": company.name},
         ]
@@ -338,14 +637,11 @@ class CompanyOVExcelTemplate(Template):
                 {
                     "cell": f"A{9+j}",
                     "data": f"Auftrag {job.id}",
-                    "border": Border(bottom=Side(style="medium")),
+                    "border": self.border_header,
                     "font": self.bold_font_header,
                     "row_height": header_height,
                 },
-                {"cell": f"B{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"C{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"D{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"E{9+j}", "border": Border(bottom=Side(style="medium"))},
+                {"cell": f"B{9+j}:E{9+j}", "border": self.border_header},
                 {
                     "cell": f"B{10+j}",
                     "data": titles["trade"],
@@ -394,26 +690,11 @@ class CompanyOVExcelTemplate(Template):
                 {
                     "cell": f"A{12+j}",
                     "data": titles["invoices"],
-                    "border": Border(bottom=Side(style="thin", color="999999")),
+                    "border": self.border_table_header,
                     "font": self.normal_font,
                     "row_height": header_height,
                 },
-                {
-                    "cell": f"B{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"C{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"D{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"E{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
+                {"cell": f"B{12+j}:E{12+j}", "border": self.border_table_header},
                 {
                     "cell": f"B{13+j}",
                     "data": titles["id"],
@@ -479,7 +760,7 @@ class CompanyOVExcelTemplate(Template):
                     "cell": f"B{9+j}",
                     "data": titles["total"],
                     "font": self.normal_font,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"C{9+j}",
@@ -487,7 +768,7 @@ class CompanyOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"D{9+j}",
@@ -495,7 +776,7 @@ class CompanyOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"E{9+j}",
@@ -503,7 +784,7 @@ class CompanyOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
             ]
             self.excel_data.extend(sum_line)
@@ -523,7 +804,8 @@ class TradesOVExcelTemplate(Template):
     """Template for an overview of the trades.
 
     Attributes:
-        excel_data (dict): Data to write
+        app_data (api.AppData): Application data containing the project data
+        excel_data (dict): Data to write (header, see: iter_excel_data)
         filename (str): Filename for output
         last_row_index (int): Index of the last used row
         save_dir (Path): Path to save directory
@@ -542,7 +824,7 @@ class TradesOVExcelTemplate(Template):
         """
         self.template_filename = "trades_ov.xlsx"
 
-        self.filename = filename if filename else f"{helper.today_str()}-trades_ov"
+        self.filename = filename if filename else f"{formatr.today_str()}-trades_ov"
         self.save_dir = save_dir
         self.save_path = os.path.join(
             app_data.get_dir(), self.save_dir, f"{self.filename}.xlsx"
@@ -562,21 +844,25 @@ class TradesOVExcelTemplate(Template):
         #   it to the cells.
         #
         """
-        date = helper.today_str("%d.%m.%Y")
+        date = formatr.today_str("%d.%m.%Y")
         self.excel_data = [
             {"cell": "B3", "data": date, "number_format": self.date_format},
             {"cell": "B4", "data": app_data.project.identifier},
             {
                 "cell": "B5",
-                "data": app_data.project.client if app_data.project.client else "",
+                "data": str(app_data.project.client) if app_data.project.client else "",
             },
         ]
+        self.app_data = app_data
 
+    def iter_excel_data(self):
+        """Yield the data to write, trade by trade in the order of the rows.
+
+        The rows of the jobs are only gathered while they are written, so a
+        streamed file (see: make_file) does not keep all of them in memory.
         """
-        #   new_rows
-        #   We need one row for each job and each invoice
-        #
-        """
+        app_data = self.app_data
+        yield from self.excel_data
         titles = app_data.get_titles()
         j = 0
         header_height = 30
@@ -590,18 +876,11 @@ class TradesOVExcelTemplate(Template):
                 {
                     "cell": f"A{9+j}",
                     "data": f"{trade.name}",
-                    "border": Border(bottom=Side(style="medium")),
+                    "border": self.border_header,
                     "font": self.bold_font_header,
                     "row_height": header_height,
                 },
-                {"cell": f"B{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"C{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"D{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"E{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"F{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"G{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"H{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"I{9+j}", "border": Border(bottom=Side(style="medium"))},
+                {"cell": f"B{9+j}:I{9+j}", "border": self.border_header},
                 {
                     "cell": f"H{10+j}",
                     "data": titles["budget"],
@@ -635,47 +914,16 @@ class TradesOVExcelTemplate(Template):
                 },
                 {"cell": f"B{11+j}", "data": trade.comment, "font": self.normal_font},
             ]
-            self.excel_data.extend(trade_lines)
+            yield from trade_lines
             jobs_header_lines = [
                 {
                     "cell": f"A{12+j}",
                     "data": titles["jobs"],
-                    "border": Border(bottom=Side(style="thin", color="999999")),
+                    "border": self.border_table_header,
                     "font": self.normal_font,
                     "row_height": header_height,
                 },
-                {
-                    "cell": f"B{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"C{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"D{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"E{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"F{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"G{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"H{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"I{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
+                {"cell": f"B{12+j}:I{12+j}", "border": self.border_table_header},
                 {
                     "cell": f"B{13+j}",
                     "data": titles["company"],
@@ -723,7 +971,7 @@ class TradesOVExcelTemplate(Template):
                     "alignment": self.align_right,
                 },
             ]
-            self.excel_data.extend(jobs_header_lines)
+            yield from jobs_header_lines
             j += 5
 
             jobs = app_data.project.get_jobs_of_trade(trade)
@@ -792,7 +1040,7 @@ class TradesOVExcelTemplate(Template):
                         "alignment": self.align_right,
                     },
                 ]
-                self.excel_data.extend(job_line)
+                yield from job_line
                 j += 1
             """ write trade summary line """
             sum_line = [
@@ -800,23 +1048,16 @@ class TradesOVExcelTemplate(Template):
                     "cell": f"B{9+j}",
                     "data": titles["total"],
                     "font": self.normal_font,
-                    "border": Border(top=Side(style="double", color="999999")),
-                },
-                {
-                    "cell": f"C{9+j}",
-                    "border": Border(top=Side(style="double", color="999999")),
-                },
-                {
-                    "cell": f"D{9+j}",
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
+                {"cell": f"C{9+j}:D{9+j}", "border": self.border_total},
                 {
                     "cell": f"E{9+j}",
                     "data": job_sum_w_VAT_sum,
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"F{9+j}",
@@ -824,7 +1065,7 @@ class TradesOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"G{9+j}",
@@ -832,7 +1073,7 @@ class TradesOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"H{9+j}",
@@ -840,7 +1081,7 @@ class TradesOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"I{9+j}",
@@ -851,18 +1092,26 @@ class TradesOVExcelTemplate(Template):
                     "number_format": self.percent_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
             ]
-            self.excel_data.extend(sum_line)
+            yield from sum_line
             j += 2
 
         self.last_row_index += j
 
     @debug.log
-    def make_file(self):
-        """Make the file."""
-        self.make_cells(self.excel_data)
+    def make_file(self, streaming=False):
+        """Make the file.
+
+        Args:
+            streaming (bool, optional): Write the rows in order into a
+                write-only workbook (see: Template.stream_cells)
+        """
+        if streaming:
+            self.stream_cells(self.iter_excel_data())
+        else:
+            self.make_cells(self.iter_excel_data())
         self.ws.print_area = f"A1:I{self.last_row_index}"
         self.save_file()
 
@@ -871,7 +1120,8 @@ class CostGroupsOVExcelTemplate(Template):
     """Template for an overview of the cost groups.
 
     Attributes:
-        excel_data (dict): Data to write
+        app_data (api.AppData): Application data containing the project data
+        excel_data (dict): Data to write (header, see: iter_excel_data)
         filename (str): Filename for output
         last_row_index (int): Index of the last used row
         save_dir (Path): Path to save directory
@@ -889,7 +1139,9 @@ class CostGroupsOVExcelTemplate(Template):
         """
         self.template_filename = "cost_groups_ov.xlsx"
 
-        self.filename = filename if filename else f"{helper.today_str()}-cost_groups_ov"
+        self.filename = (
+            filename if filename else f"{formatr.today_str()}-cost_groups_ov"
+        )
         self.save_dir = save_dir
         self.save_path = os.path.join(
             app_data.get_dir(), self.save_dir, f"{self.filename}.xlsx"
@@ -909,21 +1161,25 @@ class CostGroupsOVExcelTemplate(Template):
         #   it to the cells.
         #
         """
-        date = helper.today_str("%d.%m.%Y")
+        date = formatr.today_str("%d.%m.%Y")
         self.excel_data = [
             {"cell": "B3", "data": date, "number_format": self.date_format},
             {"cell": "B4", "data": app_data.project.identifier},
             {
                 "cell": "B5",
-                "data": app_data.project.client if app_data.project.client else "",
+                "data": str(app_data.project.client) if app_data.project.client else "",
             },
         ]
+        self.app_data = app_data
 
+    def iter_excel_data(self):
+        """Yield the data to write, cost group by cost group in the order of the rows.
+
+        The rows of the jobs are only gathered while they are written, so a
+        streamed file (see: make_file) does not keep all of them in memory.
         """
-        #   new_rows
-        #   We need one row for each job and each invoice
-        #
-        """
+        app_data = self.app_data
+        yield from self.excel_data
         titles = app_data.get_titles()
         j = 0
         header_height = 30
@@ -937,18 +1193,11 @@ class CostGroupsOVExcelTemplate(Template):
                 {
                     "cell": f"A{9+j}",
                     "data": f"{cost_group.id} {cost_group.name}",
-                    "border": Border(bottom=Side(style="medium")),
+                    "border": self.border_header,
                     "font": self.bold_font_header,
                     "row_height": header_height,
                 },
-                {"cell": f"B{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"C{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"D{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"E{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"F{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"G{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"H{9+j}", "border": Border(bottom=Side(style="medium"))},
-                {"cell": f"I{9+j}", "border": Border(bottom=Side(style="medium"))},
+                {"cell": f"B{9+j}:I{9+j}", "border": self.border_header},
                 {
                     "cell": f"H{10+j}",
                     "data": titles["budget"],
@@ -986,47 +1235,16 @@ class CostGroupsOVExcelTemplate(Template):
                     "font": self.normal_font,
                 },
             ]
-            self.excel_data.extend(cost_group_lines)
+            yield from cost_group_lines
             jobs_header_lines = [
                 {
                     "cell": f"A{12+j}",
                     "data": titles["jobs"],
-                    "border": Border(bottom=Side(style="thin", color="999999")),
+                    "border": self.border_table_header,
                     "font": self.normal_font,
                     "row_height": header_height,
                 },
-                {
-                    "cell": f"B{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"C{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"D{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"E{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"F{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"G{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"H{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
-                {
-                    "cell": f"I{12+j}",
-                    "border": Border(bottom=Side(style="thin", color="999999")),
-                },
+                {"cell": f"B{12+j}:I{12+j}", "border": self.border_table_header},
                 {
                     "cell": f"B{13+j}",
                     "data": titles["company"],
@@ -1074,7 +1292,7 @@ class CostGroupsOVExcelTemplate(Template):
                     "alignment": self.align_right,
                 },
             ]
-            self.excel_data.extend(jobs_header_lines)
+            yield from jobs_header_lines
             j += 5
 
             jobs = app_data.project.get_jobs_of_cost_group(cost_group)
@@ -1143,7 +1361,7 @@ class CostGroupsOVExcelTemplate(Template):
                         "alignment": self.align_right,
                     },
                 ]
-                self.excel_data.extend(job_line)
+                yield from job_line
                 j += 1
             """ write cost_group summary line """
             sum_line = [
@@ -1151,23 +1369,16 @@ class CostGroupsOVExcelTemplate(Template):
                     "cell": f"B{9+j}",
                     "data": titles["total"],
                     "font": self.normal_font,
-                    "border": Border(top=Side(style="double", color="999999")),
-                },
-                {
-                    "cell": f"C{9+j}",
-                    "border": Border(top=Side(style="double", color="999999")),
-                },
-                {
-                    "cell": f"D{9+j}",
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
+                {"cell": f"C{9+j}:D{9+j}", "border": self.border_total},
                 {
                     "cell": f"E{9+j}",
                     "data": job_sum_w_VAT_sum,
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"F{9+j}",
@@ -1175,7 +1386,7 @@ class CostGroupsOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"G{9+j}",
@@ -1183,7 +1394,7 @@ class CostGroupsOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"H{9+j}",
@@ -1191,7 +1402,7 @@ class CostGroupsOVExcelTemplate(Template):
                     "number_format": self.amount_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
                 {
                     "cell": f"I{9+j}",
@@ -1202,18 +1413,26 @@ class CostGroupsOVExcelTemplate(Template):
                     "number_format": self.percent_format,
                     "alignment": self.align_right,
                     "font": self.bold_font_table_header,
-                    "border": Border(top=Side(style="double", color="999999")),
+                    "border": self.border_total,
                 },
             ]
-            self.excel_data.extend(sum_line)
+            yield from sum_line
             j += 2
 
         self.last_row_index += j
 
     @debug.log
-    def make_file(self):
-        """Make the file."""
-        self.make_cells(self.excel_data)
+    def make_file(self, streaming=False):
+        """Make the file.
+
+        Args:
+            streaming (bool, optional): Write the rows in order into a
+                write-only workbook (see: Template.stream_cells)
+        """
+        if streaming:
+            self.stream_cells(self.iter_excel_data())
+        else:
+            self.make_cells(self.iter_excel_data())
         self.ws.print_area = f"A1:I{self.last_row_index}"
         self.save_file()
 
@@ -1246,7 +1465,7 @@ class PCCCostGroupsOVExcelTemplate(Template):
         self.filename = (
             filename
             if filename
-            else f"{helper.today_str()}-pcc_cost_groups_ov-{app_data.project.identifier}-{pcc.name}"
+            else f"{formatr.today_str()}-pcc_cost_groups_ov-{app_data.project.identifier}-{pcc.name}"
         )
         self.save_dir = save_dir
         self.save_path = os.path.join(
@@ -1295,7 +1514,7 @@ class PCCCostGroupsOVExcelTemplate(Template):
             {"cell": "A4", "data": pcc.type.split()[0]},
             {"cell": "A5", "data": pcc.name},
             {"cell": "B6", "data": app_data.project.identifier},
-            {"cell": "B7", "data": helper.qdate_to_str(pcc.date)},
+            {"cell": "B7", "data": formatr.qdate_to_str(pcc.date)},
             {
                 "cell": f"C{15+self.new_rows}",
                 "data": app_data.project.get_vat(),
@@ -1421,7 +1640,7 @@ class PCCTradesOVExcelTemplate(Template):
         self.filename = (
             filename
             if filename
-            else f"{helper.today_str()}-pcc_trades_ov-{app_data.project.identifier}-{pcc.name}"
+            else f"{formatr.today_str()}-pcc_trades_ov-{app_data.project.identifier}-{pcc.name}"
         )
         self.save_dir = save_dir
         self.save_path = os.path.join(
@@ -1459,7 +1678,7 @@ class PCCTradesOVExcelTemplate(Template):
             {"cell": "A4", "data": pcc.type.split()[0]},
             {"cell": "A5", "data": pcc.name},
             {"cell": "B6", "data": app_data.project.identifier},
-            {"cell": "B7", "data": helper.qdate_to_str(pcc.date)},
+            {"cell": "B7", "data": formatr.qdate_to_str(pcc.date)},
         ]
 
         i = 0
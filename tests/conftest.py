@@ -0,0 +1,27 @@
+"""
+#
+#   FIXTURES
+#   Run the tests from the directory of main.py: python -m pytest
+#
+"""
+import pytest
+
+import generatr
+from core import api
+
+
+@pytest.fixture
+def app_data(tmp_path, monkeypatch):
+    """AppData with a small generated project, saving into tmp_path."""
+    app_config_path = tmp_path / "app_config.json"
+    #   not valid, so it is reset to the default app config
+    app_config_path.write_text("")
+    monkeypatch.setattr(
+        api.AppData, "get_app_config_path", lambda self: app_config_path
+    )
+    app_data = api.AppData()
+    app_data.config["save_dir"] = str(tmp_path)
+    app_data.project = generatr.generate_project(
+        seed=1, **generatr.SIZE_PRESETS["small"]
+    )
+    return app_data
@@ -0,0 +1,41 @@
+"""
+#
+#   BUDGETS
+#   Applied budgets have to be saved like any other edit.
+#
+"""
+from core import api
+
+
+def apply_budgets(project):
+    pcc = project.project_cost_calculations[0]
+    budgets = [o.budget for o in project.cost_groups + project.trades]
+    project.apply_budgets(pcc)
+    assert budgets != [o.budget for o in project.cost_groups + project.trades]
+
+
+def test_applied_budgets_are_unsaved_changes(app_data, tmp_path):
+    save_path = tmp_path / "budgets.project"
+    app_data.save_project(save_path)
+    assert not app_data.has_unsaved_changes()
+
+    apply_budgets(app_data.project)
+
+    assert app_data.has_unsaved_changes()
+    assert not app_data.is_saved_to(save_path, app_data.project.get_fingerprint())
+
+
+def test_applied_budgets_are_saved(app_data, tmp_path):
+    save_path = tmp_path / "budgets.project"
+    app_data.save_project(save_path)
+    apply_budgets(app_data.project)
+    app_data.save_project(save_path)
+
+    loaded = api.AppData()
+    loaded.load_project(save_path, lazy=False)
+    assert [cost_group.budget for cost_group in loaded.project.cost_groups] == [
+        cost_group.budget for cost_group in app_data.project.cost_groups
+    ]
+    assert [trade.budget for trade in loaded.project.trades] == [
+        trade.budget for trade in app_data.project.trades
+    ]
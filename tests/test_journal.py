@@ -0,0 +1,68 @@
+"""
+#
+#   JOURNAL
+#   Autosaves are a checkpoint and a journal of the edits since (see: journalr.py).
+#
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core import api
+import journalr
+from test_budgets import apply_budgets
+
+
+def autosave(app_data):
+    autosave = app_data.take_autosave_snapshot()
+    app_data.write_autosave(autosave)
+    app_data.finish_autosave(autosave)
+    return autosave
+
+
+def get_budgets(project):
+    return [o.budget for o in project.cost_groups + project.trades]
+
+
+def test_applied_budgets_are_replayed(app_data):
+    checkpoint = autosave(app_data)
+    apply_budgets(app_data.project)
+    journal = autosave(app_data)
+    assert checkpoint["kind"] == "checkpoint"
+    assert journal["kind"] == "journal"
+
+    loaded = api.AppData()
+    loaded.load_project(checkpoint["path"], lazy=False)
+    assert get_budgets(loaded.project) == get_budgets(app_data.project)
+
+
+def test_previous_checkpoint_is_compacted(app_data, monkeypatch):
+    #   a new autosave path every time, like one autosave per second
+    seconds = iter(range(10))
+
+    def get_autosave_path_datetime(self):
+        now = datetime.now() + timedelta(seconds=next(seconds))
+        autosave_datetime = now.strftime("%Y-%m-%d_%H%M%S")
+        autosave_filename = f"{autosave_datetime}-{self.get_autosave_filename_suffix()}"
+        autosave_path = Path(self.get_dir(), self.get_autosave_dir(), autosave_filename)
+        return autosave_path, autosave_datetime
+
+    monkeypatch.setattr(
+        api.AppData, "get_autosave_path_datetime", get_autosave_path_datetime
+    )
+    app_data.config["max_journal_entries"] = 1
+    first = autosave(app_data)
+    apply_budgets(app_data.project)
+    autosave(app_data)
+    applied_budgets = get_budgets(app_data.project)
+    assert journalr.get_journal_path(first["path"]).is_file()
+
+    app_data.project.trades[0].budget += 1
+    app_data.project.trades[0].edited()
+    second = autosave(app_data)
+
+    assert second["kind"] == "checkpoint"
+    assert second["path"] != first["path"]
+    assert not journalr.get_journal_path(first["path"]).is_file()
+    loaded = api.AppData()
+    loaded.load_project(first["path"], lazy=False)
+    assert get_budgets(loaded.project) == applied_budgets
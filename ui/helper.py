@@ -9,7 +9,6 @@ import debug
 
 import os
 from pathlib import Path
-import datetime
 import json
 import shutil
 
@@ -18,7 +17,9 @@ from ui import customqt
 
 from PyQt5 import QtWidgets, QtCore
 
-import pdfexportr
+#   defined outside of the UI for the worker processes (see: batchr.py)
+from pdfexportr import xlsx2pdfs
+from formatr import qdate_to_str, today_str
 from core.obj import proj
 
 """
@@ -545,10 +546,13 @@ def edit_job(app_data, job):
             """ logging """
             debug.log(f"Job deleted: {company_name}, {job.id}, {job.uid}")
         else:
-            job.update(**job_args)
+            # need the api function, because the registries of the project need an update
+            app_data.project.update_job(job, job_args)
             """ logging """
             debug.log(f"Existing Job edited: {company_name}, {job.id}, {job.uid}")
         return job
+    # the dialog edits the paid safety deposits of the job in place, even if canceled
+    app_data.project.refresh_job(job)
 
 
 @debug.log
@@ -734,7 +738,8 @@ def edit_cost_group(app_data, cost_group):
                 f"CostGroup deleted: {cost_group.id}, {cost_group.name}, description {cost_group.description}, budget {cost_group_budget} {app_data.get_currency()}"
             )
         else:
-            cost_group.update(**cost_group_args)
+            # need the api function, because the cached sums of the project need an update
+            app_data.project.update_cost_group(cost_group, cost_group_args)
             """ logging """
             debug.log(
                 f"Existing CostGroup edited: {cost_group.id}, {cost_group.name}, description {cost_group.description}, budget {cost_group_budget} {app_data.get_currency()}"
@@ -834,7 +839,7 @@ def invoice_check(app_data, invoice, curr_job_only):
     #   Convert to PDF
     #
     """
-    pdf_files = [xlsx2pdf(*file) for file in xlsx_files]
+    pdf_files = xlsx2pdfs(xlsx_files, backend=app_data.get_pdf_backend())
     """
     #
     #   Copy to Folders
@@ -891,7 +896,7 @@ def trades_ov(app_data):
     #   Convert to PDF
     #
     """
-    pdf_files = [xlsx2pdf(*file) for file in xlsx_files]
+    pdf_files = xlsx2pdfs(xlsx_files, backend=app_data.get_pdf_backend())
     """
     #    log
     """
@@ -924,7 +929,7 @@ def cost_groups_ov(app_data):
     #   Convert to PDF
     #
     """
-    pdf_files = [xlsx2pdf(*file) for file in xlsx_files]
+    pdf_files = xlsx2pdfs(xlsx_files, backend=app_data.get_pdf_backend())
     """
     #    log
     """
@@ -963,7 +968,7 @@ def company_ov(app_data, company, selected_job=None):
     #   Convert to PDF
     #
     """
-    pdf_files = [xlsx2pdf(*file) for file in xlsx_files]
+    pdf_files = xlsx2pdfs(xlsx_files, backend=app_data.get_pdf_backend())
     """
     #    log
     """
@@ -1014,7 +1019,7 @@ def pcc_overviews(app_data, pcc):
     #   Convert to PDF
     #
     """
-    pdf_files = [xlsx2pdf(*file) for file in xlsx_files]
+    pdf_files = xlsx2pdfs(xlsx_files, backend=app_data.get_pdf_backend())
 
     """
     #    log
@@ -1349,23 +1354,6 @@ def to_json_file(data, save_path, *, encoder=json.JSONEncoder):
         json.dump(data, file, cls=encoder, indent=4)
 
 
-def xlsx2pdf(input_path, filename):
-    """Export PDF from xlsx-file.
-
-    Args:
-        input_path (Path): path of xlsx-file
-        filename (str): Filename of the PDF
-
-    Returns:
-        (Path, Path): Save path, filename
-    """
-    dir_path = os.path.dirname(input_path)
-    pdf_filename = f"{filename}.pdf"
-    pdf_save_path = os.path.join(dir_path, pdf_filename)
-    pdfexportr.PDFExportr().create_pdf(input_path, pdf_save_path)
-    return pdf_save_path, pdf_filename
-
-
 """
 #
 #   INPUT MANAGEMENT
@@ -1514,50 +1502,3 @@ def rnd(amount):
         float: rounded number
     """
     return float(round(amount, 2))
-
-
-"""
-#   QDate to String
-"""
-
-
-def qdate_to_str(qdate, format="%d.%m.%Y"):
-    """Convert a QDate to a datetime.Date.
-
-    Args:
-        qdate (QDate): Date to convert
-        format (str, optional): format of the target date
-
-    Returns:
-        datetime.Date: Converted date
-    """
-    return qdate.toPyDate().strftime(format)
-
-
-"""
-#   datetime.now() string
-"""
-
-
-def now_str(format="%Y-%m-%d_%H%M%S"):
-    """Get a string of the current timestamp.
-
-    Args:
-        format (str, optional): Format of the string
-
-    Returns:
-        str: String of the timestamp
-    """
-    return datetime.datetime.now().strftime(format)
-
-
-def today_str(format="%Y-%m-%d"):
-    """Get a string of the current date.
-
-    Args:
-        format (str, optional): Format of the string
-
-    Returns:
-        str: String of the date today
-    """
-    return datetime.datetime.today().strftime(format)
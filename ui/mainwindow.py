@@ -4,25 +4,24 @@
 #
 #
 """
-import string
 import random
 
 import debug
 
 import os
-import datetime
 
 import json, uuid
 
 from PyQt5 import QtWidgets, QtCore, QtGui, uic
 from PyQt5.QtWidgets import QDialog, QInputDialog, QFileDialog, QGraphicsColorizeEffect
-from PyQt5.QtCore import QEvent, QDate, QPropertyAnimation
+from PyQt5.QtCore import QEvent, QPropertyAnimation
 from PyQt5.QtCore import pyqtSlot, QObject
 from ui import customqt
 
 from core.obj import proj, corp, arch
 from ui import dlg, helper
-from ui.helper import rnd, amount_str, percent_str, percent_str_w_sign, qdate_to_str
+import generatr
+from ui.helper import amount_str, percent_str, percent_str_w_sign, qdate_to_str
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -35,6 +34,8 @@ class MainWindow(QtWidgets.QMainWindow):
         cost_group_cols (dict): Columns to render in the cost group tab
         cost_stand_cost_group_cols (dict): Columns to render in the cost group view of the stand tab
         cost_stand_trade_cols (dict): Columns to render in the trade view of the cost stand tab
+        deferred_members_loaded (pyqtSignal): Emitted with a lazily loaded project,
+            once its jobs and invoices are loaded (see: show_loading_project)
         invoice_cols (dict): Columns to render in the invoice tab
         job_cols (dict): Columns to render in the job tab
         person_cols (TYPE): Columns to render in the people tab
@@ -42,6 +43,9 @@ class MainWindow(QtWidgets.QMainWindow):
         trade_cols (TYPE): Columns to render in the trade tab
     """
 
+    #   emitted from the loading thread and delivered on the GUI thread (queued)
+    deferred_members_loaded = QtCore.pyqtSignal(object)
+
     def __init__(self, app_data):
         """Summary
 
@@ -61,6 +65,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.load_widget_signals()
         self.load_action_signals()
         self.load_line_edit_signals()
+        self.deferred_members_loaded.connect(self.finish_loading_project)
 
         if self.app_data.project is None:
             self.disable_ui()
@@ -338,6 +343,7 @@ class MainWindow(QtWidgets.QMainWindow):
         qr.moveCenter(cp)
         self.move(qr.topLeft())
 
+    @debug.timed()
     def update_ui(self):
         """Update the UI.
 
@@ -998,6 +1004,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if item:
             sel_job = item.data(1)
             helper.pay_safety_deposit(sel_job)
+            self.app_data.project.refresh_job(sel_job)
             self.render_job_info(sel_job)
             self.update_ui()
         else:
@@ -1019,6 +1026,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 if reply:
                     sel_psd = psd_items[0].data(1, QtCore.Qt.UserRole)
                     sel_job.remove_psd(sel_psd)
+                    self.app_data.project.refresh_job(sel_job)
                     self.render_job_info(sel_job)
                     self.update_ui()
             else:
@@ -1038,6 +1046,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if item:
             sel_job = item.data(1)
             helper.add_job_addition(sel_job)
+            self.app_data.project.refresh_job(sel_job)
             self.render_job_info(sel_job)
             self.update_ui()
         else:
@@ -1059,6 +1068,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 if reply:
                     sel_job_addition = job_addition_items[0].data(1, QtCore.Qt.UserRole)
                     sel_job.remove_job_addition(sel_job_addition)
+                    self.app_data.project.refresh_job(sel_job)
                     self.render_job_info(sel_job)
                     self.update_ui()
             else:
@@ -1315,6 +1325,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_cost_stand(self, set_width=False):
         """Summary
 
@@ -1325,6 +1336,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.render_cost_stand_trades(set_width=set_width)
 
     @debug.log
+    @debug.timed()
     def render_cost_stand_cost_groups(self, set_width=False):
         """Summary
 
@@ -1435,6 +1447,7 @@ class MainWindow(QtWidgets.QMainWindow):
         )  # enable sorting once the table is filled
 
     @debug.log
+    @debug.timed()
     def render_cost_stand_trades(self, set_width=False):
         """Summary
 
@@ -1669,6 +1682,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_invoice_view(self, set_width=False):
         """Summary
 
@@ -1935,6 +1949,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_job_view(self, set_width=False):
         """Summary
 
@@ -2208,6 +2223,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_company_view(self, set_width=False):
         """Summary
 
@@ -2348,6 +2364,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_trades(self, set_width=False):
         """Summary
 
@@ -2465,6 +2482,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_cost_groups(self, set_width=False):
         """Summary
 
@@ -2685,6 +2703,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_project_cost_calculations(self, set_width=False):
         """Summary
 
@@ -2856,6 +2875,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     @debug.log
+    @debug.timed()
     def render_people(self, set_width=False):
         """Summary
 
@@ -3031,8 +3051,51 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             helper.load_project(self, self.app_data)
         if self.app_data.project_loaded():
-            self.update_ui()
-            self.init_table_header()
+            if self.app_data.project.has_deferred_members():
+                self.show_loading_project()
+            else:
+                self.update_ui()
+                self.init_table_header()
+
+    def show_loading_project(self):
+        """Show the loaded part of a lazily loaded project right away and the
+        rest, once its jobs and invoices are loaded in the background.
+
+        The UI stays disabled until then (see: finish_loading_project).
+        """
+        self.disable_ui()
+        self.setWindowTitle(
+            f"Scharmer-Yu + Partner | Kostenfortschreibung | {self.app_data.project.identifier}"
+        )
+        self.update_labels()
+        self.render_company_view(set_width=True)
+        self.render_trades(set_width=True)
+        self.render_cost_groups(set_width=True)
+        self.render_people(set_width=True)
+        self.statusBar.showMessage("Loading jobs and invoices...")
+        project = self.app_data.project
+        project.call_when_loaded(lambda: self.deferred_members_loaded.emit(project))
+
+    @debug.log_info
+    def finish_loading_project(self, project):
+        """Attach the loaded jobs and invoices of a project (see: show_loading_project).
+
+        Args:
+            project (proj.Project): Lazily loaded project
+        """
+        if project is not self.app_data.project:
+            #   another project was loaded meanwhile
+            return
+        try:
+            self.app_data.load_deferred_members(project)
+        except proj.ProjectLoadingError:
+            #   the UI stays disabled, the project has to be opened again
+            self.statusBar.showMessage("Loading jobs and invoices failed!")
+            raise
+        self.enable_ui()
+        self.update_ui()
+        self.init_table_header()
+        self.statusBar.clearMessage()
 
     @debug.log_info
     def save_project(self):
@@ -3332,12 +3395,19 @@ class MainWindow(QtWidgets.QMainWindow):
     """
 
     def start_autosaving(self):
-        """Summary"""
-        pass
+        """Show that an autosave is being written in the background."""
+        self.statusBar.showMessage("Autosaving...")
 
-    def stop_autosaving(self):
-        """Summary"""
-        pass
+    def stop_autosaving(self, failed=False):
+        """Show that the autosave has been written (or failed).
+
+        Args:
+            failed (bool, optional): True, if the autosave could not be written
+        """
+        if failed:
+            self.statusBar.showMessage("Autosave failed! See the log for details.")
+        else:
+            self.statusBar.showMessage("Autosaved.", 5000)
 
     """
     #
@@ -3370,200 +3440,62 @@ class MainWindow(QtWidgets.QMainWindow):
             self.add_random_psds()
             self.update_ui()
 
-    #       TODO: Move all the testfunctions to the API file
+    #   The random objects are made by the headless generator (see: generatr.py)
+    def get_project_generator(self):
+        """Return a generator adding random objects to the loaded project.
+
+        Returns:
+            generatr.ProjectGenerator: Generator (not seeded)
+        """
+        return generatr.ProjectGenerator(self.app_data.project)
+
     def add_random_jobs(self, max_jobs=50):
-        """Summary
+        """Add a random number of random jobs.
 
         Args:
-            max_jobs (int, optional): Description
+            max_jobs (int, optional): Maximal number of jobs
         """
-        number_of_jobs = random.randint(1, max_jobs)
-        for i in range(number_of_jobs):
-            company = random.choice(self.app_data.project.companies)
-            id = self.app_data.project.get_max_job_number(company) + 1
-            trade = random.choice(self.app_data.project.trades)
-            cost_group = random.choice(self.app_data.project.cost_groups)
-            job_sum = rnd(random.random() * 150000)
-
-            input_job_args = {
-                "company": company,
-                "id": id,
-                "trade": trade,
-                "cost_group": cost_group,
-                "job_sum": job_sum,
-            }
-            self.app_data.project.input_new_job(input_job_args)
+        self.get_project_generator().add_jobs(random.randint(1, max_jobs))
 
     def add_random_invoices(self, max_invoices=150):
-        """Summary
+        """Add a random number of random invoices.
 
         Args:
-            max_invoices (int, optional): Description
-        """
-        number_of_invoices = random.randint(1, max_invoices)
-        for i in range(number_of_invoices):
-            invoice_id_length = random.randint(5, 15)
-            invoice_id = id_generator(invoice_id_length)
-            job = random.choice(self.app_data.project.jobs)
-            company = job.company
-            cumulative = bool(random.getrandbits(1))
-            w_discount = bool(random.getrandbits(1))
-            invoice_date = QDate.currentDate()
-            amount = rnd(random.random() * 100000)
-            if cumulative == 1:
-                prev_invoices = self.app_data.project.get_prev_invoices(
-                    company=company,
-                    job=job,
-                    invoice_date=invoice_date,
-                    invoice_created_date=datetime.datetime.now(),
-                )
-                if len(prev_invoices) > 0:
-                    amount += prev_invoices[0].amount
-            input_invoice_args = {
-                "id": invoice_id,
-                "job": job,
-                "cumulative": cumulative,
-                "company": company,
-                "invoice_date": invoice_date,
-                "amount": amount,
-                "verified_amount": amount
-                + rnd(random.random() * 100)
-                - rnd(random.random() * 100),
-                "rebate": rnd(random.random() * 0.15),
-                # "reduction_insurance_costs": rnd(random.random()*0.5),
-                # "reduction_usage_costs": rnd(random.random()*0.5),
-                "safety_deposit": rnd(random.random() * 0.05),
-                "discount": rnd(random.random() * 0.05) if w_discount else 0,
-                "due_date": QDate.currentDate(),
-                "due_date_discount": QDate.currentDate() if w_discount else None,
-            }
-            self.app_data.project.input_new_invoice(input_invoice_args)
+            max_invoices (int, optional): Maximal number of invoices
+        """
+        self.get_project_generator().add_invoices(random.randint(1, max_invoices))
 
     def add_random_psds(self, max_psds=600):
-        """Summary
+        """Add a random number of random paid safety deposits.
 
         Args:
-            max_psds (int, optional): Description
+            max_psds (int, optional): Maximal number of paid safety deposits
         """
-        number_of_psds = random.randint(1, max_psds)
-        for i in range(number_of_psds):
-            job = random.choice(self.app_data.project.jobs)
-            date = QDate.currentDate()
-            amount = rnd(random.random() * 500)
-            comment_length = random.randint(0, 350)
-            comment = id_generator(comment_length)
-            job.pay_safety_deposit(date, amount, comment)
+        self.get_project_generator().add_psds(random.randint(1, max_psds))
 
     def add_random_job_additions(self, max_job_additions=600):
-        """Summary
+        """Add a random number of random job additions.
 
         Args:
-            max_job_additions (int, optional): Description
+            max_job_additions (int, optional): Maximal number of job additions
         """
-        number_of_job_additions = random.randint(1, max_job_additions)
-        for i in range(number_of_job_additions):
-            job = random.choice(self.app_data.project.jobs)
-            date = QDate.currentDate()
-            amount = rnd(random.random() * 100000)
-            name_length = random.randint(0, 15)
-            name = id_generator(name_length)
-            comment_length = random.randint(0, 350)
-            comment = id_generator(comment_length)
-            job.add_job_addition(date, name, amount, comment)
+        self.get_project_generator().add_job_additions(
+            random.randint(1, max_job_additions)
+        )
 
     def add_random_cost_calculations(self, max_cost_calculations=50):
-        """Summary
+        """Add a random number of random cost calculations (up to 150 items each).
 
         Args:
-            max_cost_calculations (int, optional): Description
+            max_cost_calculations (int, optional): Maximal number of cost calculations
         """
-        number_of_cost_calculations = random.randint(1, max_cost_calculations)
-        for i in range(number_of_cost_calculations):
-
-            name_length = random.randint(0, 12)
-            name = id_generator(name_length)
-            type = random.choice(proj.ProjectCostCalculation.PCC_TYPES)
-            pcc = proj.ProjectCostCalculation(
-                name=name, date=QDate.currentDate(), type=type
-            )
-            self.app_data.project.add_pcc(pcc)
-            number_of_inventory_items = random.randint(1, 150)
-            for j in range(number_of_inventory_items):
-                item = self.random_inventory_item()
-                pcc.add_inventory_item(item)
-
-    def random_inventory_item(self):
-        """Summary
-
-        Returns:
-            TYPE: Description
-        """
-        name_length = random.randint(1, 10)
-        description_length = random.randint(0, 350)
-        trade = random.choice(self.app_data.project.trades)
-        cost_group = random.choice(self.app_data.project.cost_groups)
-        inventory_item_args = {
-            "name": id_generator(name_length),
-            "description": id_generator(description_length),
-            "price_per_unit": rnd(random.random() * 15),
-            "units": random.randint(1, 1500),
-            "unit_type": random.choice(["m", "m²", "m³", "kg"]),
-            "is_active": bool(random.getrandbits(1)),
-            "trade": trade,
-            "cost_group": cost_group,
-        }
-        return proj.InventoryItem(**inventory_item_args)
+        n_pccs = random.randint(1, max_cost_calculations)
+        n_items = random.randint(n_pccs, 150 * n_pccs)
+        self.get_project_generator().add_cost_calculations(n_pccs, n_items)
 
     def add_contact_people(self):
-        """Summary"""
-        for company in self.app_data.project.companies:
-            if company.contact_person is None:
-                random_person = self.random_person()
-                company.add_contact_person(random_person)
-
-    def random_person(self, company=None):
-        """Summary
-
-        Args:
-            company (None, optional): Description
-
-        Returns:
-            TYPE: Description
-        """
-        first_name_length = random.randint(1, 10)
-        last_name_length = random.randint(1, 10)
-
-        person_args = {
-            "first_name": id_generator(first_name_length),
-            "last_name": id_generator(last_name_length),
-            "address": self.random_address(),
-            "telephone": id_generator(size=8, chars=string.digits),
-            "mobile": id_generator(size=10, chars=string.digits),
-            "fax": id_generator(size=8, chars=string.digits),
-            "email": id_generator(9),
-            "company": company,
-        }
-        return corp.Person(**person_args)
-
-    def random_address(self):
-        """Summary
-
-        Returns:
-            TYPE: Description
-        """
-        address_args = {
-            "street": id_generator(size=1, chars=string.ascii_uppercase)
-            + id_generator(size=12, chars=string.ascii_lowercase),
-            "house_number": random.randint(1, 200),
-            "city": id_generator(size=1, chars=string.ascii_uppercase)
-            + id_generator(size=5, chars=string.ascii_lowercase),
-            "state": id_generator(size=1, chars=string.ascii_uppercase)
-            + id_generator(size=8, chars=string.ascii_lowercase),
-            "zipcode": id_generator(size=6, chars=string.digits),
-            "country": id_generator(size=1, chars=string.ascii_uppercase)
-            + id_generator(size=8, chars=string.ascii_lowercase),
-        }
-        return corp.Address(**address_args)
+        """Add a random contact person to every company without one."""
+        self.get_project_generator().add_contact_people()
 
     def print_project_info(self):
         """Summary"""
@@ -3577,25 +3509,3 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.app_data.project.invoices:
             for invoice in self.app_data.project.invoices:
                 debug.log(vars(invoice))
-
-
-"""
-#
-#   DEBUG FUNCTIONS
-#
-"""
-
-
-def id_generator(
-    size=10, chars=string.ascii_lowercase + string.ascii_uppercase + string.digits
-):
-    """Summary
-
-    Args:
-        size (int, optional): Description
-        chars (TYPE, optional): Description
-
-    Returns:
-        TYPE: Description
-    """
-    return "".join(random.choice(chars) for _ in range(size))
@@ -1,112 +1,376 @@
 """
 #
 #   ZIPR
-#   Modified version of the zip-creation class from https://bbengfort.github.io/
-#   used to save and load multiple files from one zip-file.
+#   Save and load a project as multiple JSON files in one zip-file.
 #
 """
 import debug
 
 import os
+import mmap
 import json
+import struct
 import zipfile
+import functools
+import contextlib
+import collections
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
 import encoder, decoder
 
 
-class Zipr(object):
-    def __enter__(self):
-        # Makes this thing a context manager
-        return self
+"""
+#
+#   ARCHIVE OPTIONS
+#   Compression of the members and indentation of their JSON, set in the app
+#   config (see: AppData.get_archive_options). The compression is detected per
+#   member when opening, so files written with any options can be opened.
+#
+"""
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        # Makes this thing a context manager
-        self.close()
+#   compression name -> zipfile compression (zstd needs Python 3.14+)
+COMPRESSIONS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+    COMPRESSIONS["zstd"] = zipfile.ZIP_ZSTANDARD
+
+#   Chosen with the "compression" benchmark (see: benchmark.py): on a large
+#   generated project, deflate level 1 without indentation writes 6.1 MB in
+#   0.7 s instead of 39 MB in 1.4 s (stored, indent 4), opening takes the same
+#   time. Higher levels, bzip2 and lzma save little more space for up to ten
+#   times the saving time.
+DEFAULT_COMPRESSION = "deflate"
+DEFAULT_COMPRESSLEVEL = 1
+DEFAULT_INDENT = None
+
+
+def get_compression(name):
+    """Return the zipfile compression of a compression name (see: COMPRESSIONS)."""
+    if name not in COMPRESSIONS:
+        raise Exception(
+            f"Unknown archive compression: {name}, "
+            f"available: {', '.join(COMPRESSIONS)}"
+        )
+    return COMPRESSIONS[name]
 
-    def close(self):
-        self.zobj.close()
 
+"""
+#
+#   MEMBERS
+#   The members of a save file, the only place they are defined: the binary
+#   save files (packr.py), the journal (journalr.py) and the lazy loading
+#   (see: AppData.load_project) use this table, too.
+#
+#   member name -> Member:
+#       file_name:  name of the JSON file in the archive
+#       encoder:    encoder class of the objects, None for plain data
+#       attribute:  attribute of the project holding the saved objects,
+#                   None for the project itself
+#       deferred:   decoded in the background, when loading lazily
+#   The member names are the keys of the loaded args (see: open_project).
+#
+"""
 
-class ZipArchive(Zipr):
-    def __init__(self, path, mode="r"):
-        self.zobj = zipfile.ZipFile(
-            path,
-            mode,
-            compression=zipfile.ZIP_STORED,
-            allowZip64=True,
-            compresslevel=None,
+Member = collections.namedtuple(
+    "Member", ["file_name", "encoder", "attribute", "deferred"]
+)
+
+MEMBERS = {
+    "project_config": Member("proj_config.json", None, "config", False),
+    "project": Member("project.json", encoder.ProjectEncoder, None, False),
+    "project_cost_calculations": Member(
+        "project_cost_calculations.json",
+        encoder.ProjectCostCalculationEncoder,
+        "project_cost_calculations",
+        True,
+    ),
+    "companies": Member("companies.json", encoder.CompanyEncoder, "companies", False),
+    "trades": Member("trades.json", encoder.TradeEncoder, "trades", False),
+    #   incl. the deleted invoices
+    "invoices": Member("invoices.json", encoder.InvoiceEncoder, "_invoices", True),
+    "jobs": Member("jobs.json", encoder.ArchJobEncoder, "jobs", True),
+    "cost_groups": Member(
+        "cost_groups.json", encoder.CostGroupEncoder, "cost_groups", False
+    ),
+}
+
+
+def get_member_objects(project):
+    """Return the objects of the members of a save file.
+
+    Args:
+        project (proj.Project): Project to save
+
+    Returns:
+        dict: Member name -> object or list of objects
+    """
+    if project.has_deferred_members():
+        #   saving it now would drop them (see: Project.defer_members)
+        raise Exception(
+            f"Cannot save {project.identifier}, its jobs and invoices are not loaded."
         )
-        self.root, _ = os.path.splitext(os.path.basename(path))
+    return {
+        name: getattr(project, member.attribute) if member.attribute else project
+        for name, member in MEMBERS.items()
+    }
+
+
+@debug.log
+@debug.timed()
+def save_project(path, app_data, **archive_options):
+    """Save a project to a *.project file.
+
+    Args:
+        path (Path): Path to save to
+        app_data (api.AppData): Application data containing the project data
+        **archive_options: compression, compresslevel and indent
+            (see: write_json_members)
+    """
+    objects = get_member_objects(app_data.project)
+    members = [
+        (member.file_name, objects[name], member.encoder)
+        for name, member in MEMBERS.items()
+    ]
+    write_json_members(path, members, **archive_options)
+
+
+"""
+#
+#   SAVE PIPELINE
+#   The members are encoded concurrently and the archive is written straight
+#   into a temporary file, that replaces the save file only after it is
+#   completely on the disk. A crash while saving leaves the last save intact.
+#
+"""
 
-    def open(self, path, mode="r"):
-        # Write into a directory instead of the root of the zip file
-        path = os.path.join(self.root, path)
-        return ZipArchiveFile(self.zobj.open(path, mode))
 
+def iter_concurrently(function, items):
+    """Yield function(item) for every item (in order), computed in a thread pool."""
+    items = list(items)
+    if len(items) < 2:
+        yield from (function(item) for item in items)
+        return
+    with ThreadPoolExecutor(max_workers=min(len(items), os.cpu_count() or 1)) as pool:
+        yield from pool.map(function, items)
 
-class ZipArchiveFile(Zipr):
-    def __init__(self, zobj, encoding="utf-8"):
-        self.zobj = zobj
-        self.encoding = encoding
 
-    def write(self, data):
-        if isinstance(data, str):
-            data = data.encode(self.encoding)
-        self.zobj.write(data)
+def map_concurrently(function, items):
+    """Return [function(item) for item in items], computed in a thread pool."""
+    return list(iter_concurrently(function, items))
+
+
+def encode_json(member, indent=DEFAULT_INDENT):
+    _, data, encoder_class = member
+    return json.dumps(data, cls=encoder_class, indent=indent).encode("utf-8")
 
 
 @debug.log
-def save_project(path, app_data):
-    """Save a project to a *.project file.
+@debug.timed()
+def write_json_members(
+    path,
+    members,
+    compression=DEFAULT_COMPRESSION,
+    compresslevel=DEFAULT_COMPRESSLEVEL,
+    indent=DEFAULT_INDENT,
+):
+    """Write a *.project file containing a JSON file for every member.
 
     Args:
         path (Path): Path to save to
-        app_data (api.AppData): Application data containing the project data
+        members (list): (file name, data, encoder class or None) of every member
+        compression (str, optional): Key of COMPRESSIONS
+        compresslevel (int, optional): Level of the compression, None for its default
+        indent (int, optional): Indentation of the JSON, None for no line breaks
+    """
+    compression = get_compression(compression)
+    encoded_members = iter_concurrently(
+        functools.partial(encode_json, indent=indent), members
+    )
+    root, _ = os.path.splitext(os.path.basename(path))
+    with open_atomic(path) as file:
+        with zipfile.ZipFile(
+            file,
+            "w",
+            compression=compression,
+            compresslevel=compresslevel,
+            allowZip64=True,
+        ) as z:
+            #   every member is written as soon as it is encoded
+            for (file_name, _, _), encoded_member in zip(members, encoded_members):
+                z.writestr(root + "/" + file_name, encoded_member)
+
+
+@contextlib.contextmanager
+def open_atomic(path):
+    """Open a temporary file next to path for writing, flush it to the disk and
+    rename it to path (atomic, also on Windows and network drives supporting it).
+
+    If writing fails, the temporary file is deleted and path is left untouched.
+    The directory is synced as well, so the rename survives a crash (not on
+    Windows, where directories can't be opened).
+
+    Usage:
+        with zipr.open_atomic(path) as file:
+            file.write(data)
+
+    Args:
+        path (Path): Path to write to
+
+    Yields:
+        file: Temporary file opened in binary mode
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    if os.name != "nt":
+        fsync_dir(path.parent)
+
+
+def fsync_dir(dir):
+    """Flush the entries of a directory (e.g. a rename) to the disk.
+
+    Args:
+        dir (Path): Path of the directory
+    """
+    fd = os.open(dir, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@debug.log
+@debug.timed()
+def write_atomic(path, data):
+    """Write the data atomically to path (see: open_atomic).
+
+    Args:
+        path (Path): Path to write to
+        data (bytes): Content of the file
+    """
+    with open_atomic(path) as file:
+        file.write(data)
+
+
+"""
+#
+#   READ PIPELINE
+#   Uncompressed members are parsed straight from a memory map of the archive
+#   instead of being buffered through zipfile.
+#
+"""
+
+LOCAL_FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """Memory map a file for reading.
+
+    Yields the content of the file instead, if it cannot be mapped (e.g. it is
+    empty or the file system does not support it).
+
+    Args:
+        path (Path): Path to the file
+
+    Yields:
+        mmap.mmap: Read-only map of the file (or bytes)
+    """
+    with open(path, "rb") as file, map_open_file(file) as buffer:
+        yield buffer
+
+
+@contextlib.contextmanager
+def map_open_file(file):
+    """Memory map a file opened for reading in binary mode (see: map_file).
+
+    Args:
+        file (file): Opened file
+
+    Yields:
+        mmap.mmap: Read-only map of the file (or bytes)
     """
-    # Less annoying make archive with workaround classes
-    with ZipArchive(path, "w") as z:
-
-        # project config
-        with z.open("proj_config.json", "w") as file:
-            data = app_data.project.config
-            json.dump(data, file, indent=4)
-
-        # project info
-        with z.open("project.json", "w") as file:
-            data = app_data.project
-            json.dump(data, file, cls=encoder.ProjectEncoder, indent=4)
-
-        # project cost calculations
-        with z.open("project_cost_calculations.json", "w") as file:
-            data = app_data.project.project_cost_calculations
-            json.dump(data, file, cls=encoder.ProjectCostCalculationEncoder, indent=4)
-
-        # companies
-        with z.open("companies.json", "w") as file:
-            data = app_data.project.companies
-            json.dump(data, file, cls=encoder.CompanyEncoder, indent=4)
-
-        # trades
-        with z.open("trades.json", "w") as file:
-            data = app_data.project.trades
-            json.dump(data, file, cls=encoder.TradeEncoder, indent=4)
-
-        # invoices
-        with z.open("invoices.json", "w") as file:
-            data = app_data.project._invoices
-            json.dump(data, file, cls=encoder.InvoiceEncoder, indent=4)
-
-        # jobs
-        with z.open("jobs.json", "w") as file:
-            data = app_data.project.jobs
-            json.dump(data, file, cls=encoder.ArchJobEncoder, indent=4)
-
-        # cost groups
-        with z.open("cost_groups.json", "w") as file:
-            data = app_data.project.cost_groups
-            json.dump(data, file, cls=encoder.CostGroupEncoder, indent=4)
+    try:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        buffer = None
+    if buffer is None:
+        yield file.read()
+    else:
+        with buffer:
+            yield buffer
+
+
+def get_data_offset(buffer, zip_info):
+    """Return the offset of the data of a member in the buffer of the archive."""
+    header = LOCAL_FILE_HEADER.unpack_from(buffer, zip_info.header_offset)
+    if header[0] != LOCAL_FILE_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header of {zip_info.filename}")
+    file_name_length, extra_field_length = header[10], header[11]
+    return (
+        zip_info.header_offset
+        + LOCAL_FILE_HEADER.size
+        + file_name_length
+        + extra_field_length
+    )
 
 
 @debug.log
+@debug.timed()
+def read_json_members(path, file_names, loads=json.loads):
+    """Parse the JSON files of the members of a *.project file.
+
+    The archive is opened once. Uncompressed members are decoded straight from a
+    memory map of it, the others are read (and decompressed) through zipfile.
+
+    Args:
+        path (Path): Path to the *.project file
+        file_names (list): File names of the members in the archive
+        loads (callable, optional): Parses the bytes of a member
+
+    Returns:
+        list: Parsed data of the members (in the order of file_names)
+    """
+    root, _ = os.path.splitext(os.path.basename(path))
+    parsed_members = list()
+    with open(path, "rb") as file, map_open_file(file) as buffer:
+        with zipfile.ZipFile(file, "r") as z, memoryview(buffer) as view:
+            for file_name in file_names:
+                zip_info = z.getinfo(root + "/" + file_name)
+                if zip_info.compress_type not in COMPRESSIONS.values():
+                    raise Exception(
+                        f"Cannot open {path}: {file_name} is compressed with a "
+                        "method, that this version of Python does not support."
+                    )
+                if zip_info.compress_type == zipfile.ZIP_STORED:
+                    offset = get_data_offset(view, zip_info)
+                    #   the text is the only copy (json parses str), the bytes
+                    #   are not read into memory first
+                    data = str(view[offset : offset + zip_info.file_size], "utf-8")
+                else:
+                    data = z.read(zip_info)
+                parsed_members.append(loads(data))
+                del data
+    return parsed_members
+
+
+@debug.log
+@debug.timed()
 def open_project(path):
     """Open a *.project file.
 
@@ -116,55 +380,12 @@ def open_project(path):
     Returns:
         dict: Project as a dict
     """
-    loaded_args = dict()
-    with zipfile.ZipFile(path, "r") as z:
-
-        root, _ = os.path.splitext(os.path.basename(path))
-
-        # project config
-        with z.open(root + "/proj_config.json", "r") as file:
-            loaded_args["project_config"] = json.load(file)
-
-        # project
-        with z.open(root + "/project.json", "r") as file:
-            loaded_args["project"] = json.load(
-                file, object_hook=decoder.ProjectDecoder().object_hook
-            )
-
-        # cost groups
-        with z.open(root + "/project_cost_calculations.json", "r") as file:
-            loaded_args["project_cost_calculations"] = json.load(
-                file, object_hook=decoder.ProjectCostCalculationDecoder().object_hook
-            )
-
-        # companies
-        with z.open(root + "/companies.json", "r") as file:
-            loaded_args["companies"] = json.load(
-                file, object_hook=decoder.CompanyDecoder().object_hook
-            )
-
-        # trades
-        with z.open(root + "/trades.json", "r") as file:
-            loaded_args["trades"] = json.load(
-                file, object_hook=decoder.TradeDecoder().object_hook
-            )
-
-        # invoices
-        with z.open(root + "/invoices.json", "r") as file:
-            loaded_args["invoices"] = json.load(
-                file, object_hook=decoder.InvoiceDecoder().object_hook
-            )
-
-        # jobs
-        with z.open(root + "/jobs.json", "r") as file:
-            loaded_args["jobs"] = json.load(
-                file, object_hook=decoder.ArchJobDecoder().object_hook
-            )
-
-        # cost groups
-        with z.open(root + "/cost_groups.json", "r") as file:
-            loaded_args["cost_groups"] = json.load(
-                file, object_hook=decoder.CostGroupDecoder().object_hook
-            )
-
+    parsed_members = read_json_members(
+        path, [member.file_name for member in MEMBERS.values()], decoder.parse
+    )
+    loaded_args = dict(zip(MEMBERS, parsed_members))
+    for name in loaded_args:
+        #   the project config is a plain dict
+        if name != "project_config":
+            loaded_args[name] = decoder.decode_data(loaded_args[name])
     return loaded_args